@@ -1,16 +1,34 @@
 import os
+import time
+import signal
 import argparse
+import asyncio
+import functools
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 
 from utils.logging import setup_logging, get_logger
 from utils.config import config_manager
-from utils.errors import ConfigurationException, ScrapingException
+from utils.errors import ConfigurationException, ScrapingException, NotModifiedException, RobotsDisallowedException
 from utils.health import health_monitor
 from utils.resilience import run_startup_checks, db_resilience, network_resilience, process_resilience
-
-from database import init_db, get_job_by_hash, add_job, get_jobs_for_digest, mark_jobs_digest_sent, mark_job_alert_sent, cleanup_old_jobs
-from sources import greenhouse, lever, workday, generic_js
-from matchers.rules import score_job
+from utils.scraping import rate_limiter, web_scraper, AdaptiveSemaphore
+from utils.browser import browser_pool
+from utils.fetcher import adaptive_fetcher
+from utils.http_cache import http_validators
+from utils.description_cache import description_cache
+from utils.llm_cache import llm_cache
+from utils.robots import robots_cache
+from utils.scheduler import Scheduler
+
+from database import (
+    init_db, transaction, get_existing_hashes, upsert_jobs, get_jobs_for_digest, mark_jobs_digest_sent,
+    mark_jobs_alert_sent, cleanup_old_jobs, cleanup_old_listings, get_seen_listing_hashes, touch_seen_listings,
+    record_seen_listings, iter_jobs_to_rescore, count_jobs_to_rescore, update_job_scores
+)
+from sources import greenhouse, lever, workday, ashby, smartrecruiters, generic_js
+from matchers.rules import score_jobs, prefilter_job, prefs_version, rescore_rows
 from notify import slack, emailer
 
 # Load environment variables
@@ -35,73 +53,231 @@ def load_user_prefs():
 
 def poll_sources(prefs):
     """Scrapes all configured sources for new jobs."""
+    return asyncio.run(_poll_sources_async(prefs))
+
+
+async def _poll_sources_async(prefs):
+    """
+    Scrape companies concurrently.
+
+    Scrapers are blocking, so each one runs in a worker thread. A global
+    semaphore caps the total number of companies in flight and a per-domain
+    semaphore (sized from the domain's adaptive concurrency, which shrinks
+    on 429s and grows while responses stay healthy) keeps hosts such as
+    boards-api.greenhouse.io from being hit by more workers than they tolerate.
+    Results are handled on the event loop thread, so database access and the
+    run totals stay serialized exactly as in a sequential run.
+    """
     main_logger.info("Starting polling cycle")
-    all_new_jobs = []
-    total_jobs_found = 0
-    errors = 0
+    totals = {"found": 0, "errors": 0, "prefiltered": 0, "unchanged": 0}
 
-    # Map board types to scraper functions
+    # Map board types to source modules (each provides list_jobs and enrich_jobs)
     scrapers = {
-        "greenhouse": greenhouse.scrape,
-        "lever": lever.scrape,
-        "workday": workday.scrape,
-        "generic_js": generic_js.scrape
+        "greenhouse": greenhouse,
+        "lever": lever,
+        "workday": workday,
+        "ashby": ashby,
+        "smartrecruiters": smartrecruiters,
+        "generic_js": generic_js
     }
 
     companies = config_manager.get_companies()
     scraping_config = config_manager.get_scraping_config()
 
+    # Chromium is launched lazily on first render and shared by every company
+    browser_pool.max_pages = scraping_config.max_browser_pages
+    web_scraper.timeout_seconds = scraping_config.timeout_seconds
+    web_scraper.max_response_bytes = scraping_config.max_response_mb * 1024 * 1024
+    robots_cache.enabled = scraping_config.respect_robots_txt
+
+    global_limit = asyncio.Semaphore(max(1, scraping_config.max_concurrent_companies))
+    domain_limits = {}
+    tasks = []
+
     for company in companies[:scraping_config.max_companies_per_run]:
-        scraper_func = scrapers.get(company.board_type)
-        if not scraper_func:
+        source = scrapers.get(company.board_type)
+        if not source:
             main_logger.warning(f"No scraper found for board type '{company.board_type}' for {company.id}")
             continue
 
         # Check if domain should be skipped due to network failures
-        from urllib.parse import urlparse
         domain = urlparse(company.url).netloc
         if network_resilience.should_skip_domain(domain):
             failure_count = network_resilience.get_failure_count(domain)
             main_logger.warning(f"Skipping {company.id} due to {failure_count} consecutive failures")
             continue
 
+        # Boards served by an API are limited by the API host, where 429s are seen
+        limit_domain = getattr(source, 'API_DOMAIN', None) or domain.lower()
+        if limit_domain not in domain_limits:
+            domain_limits[limit_domain] = AdaptiveSemaphore(limit_domain)
+
+        tasks.append(_poll_company(
+            company, source, domain, prefs, scraping_config,
+            global_limit, domain_limits[limit_domain], totals
+        ))
+
+    # Gather keeps configuration order, so new jobs come out as they did sequentially
+    results = await asyncio.gather(*tasks)
+    all_new_jobs = [job for company_jobs in results for job in company_jobs]
+
+    main_logger.info(
+        f"Polling completed: {totals['found']} jobs found, {len(all_new_jobs)} new, "
+        f"{totals['prefiltered']} prefiltered by title, {totals['unchanged']} boards unchanged, "
+        f"{totals['errors']} errors"
+    )
+
+    wait_metrics = rate_limiter.get_wait_metrics()
+    if wait_metrics:
+        main_logger.info("Rate limiter waits since start: " + ", ".join(
+            f"{domain} {m['wait_seconds_total']:.1f}s over {m['waits']} requests"
+            for domain, m in sorted(wait_metrics.items())
+        ))
+
+    adapted = {
+        domain: limits for domain, limits in rate_limiter.get_adaptive_limits().items()
+        if limits['rate_factor'] != 1.0 or limits['blocked_seconds']
+    }
+    if adapted:
+        main_logger.info("Adaptive rate limits: " + ", ".join(
+            f"{domain} {limits['requests_per_minute']} req/min x{limits['concurrency']}"
+            + (f" (blocked {limits['blocked_seconds']:.0f}s)" if limits['blocked_seconds'] else "")
+            for domain, limits in sorted(adapted.items())
+        ))
+    main_logger.info(
+        f"Pages fetched over HTTP: {adaptive_fetcher.static_pages}, "
+        f"rendered in browser: {adaptive_fetcher.rendered_pages}"
+    )
+
+    cache_stats = description_cache.get_stats()
+    main_logger.info(
+        f"Description cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.0%} hit rate)"
+    )
+    description_cache.prune()
+    return all_new_jobs
+
+
+def _store_known_listings(seen, known_jobs, rejected):
+    """
+    One transaction per company: bump known listings and jobs, remember
+    changed listings and those rejected on title. Blocking; run off the
+    event loop.
+    """
+    with transaction() as session:
+        touch_seen_listings(list(seen), session=session)
+        upsert_jobs(known_jobs, session=session)
+        record_seen_listings(known_jobs + rejected, session=session)
+
+
+def _list_jobs_tracked(source, board_url, list_options, version):
+    """List a board's jobs, collecting the HTTP validators of its conditional fetches."""
+    with http_validators.track(version) as validators:
+        listings = source.list_jobs(board_url, **list_options)
+    return listings, validators
+
+
+async def _poll_company(company, source, domain, prefs, scraping_config, global_limit, domain_limit, totals):
+    """
+    Scrape one company under the concurrency limits and return its new jobs.
+
+    Listings are fetched first and checked against the database in bulk, then
+    run through the title-only rules, so full descriptions are only fetched for
+    unseen or changed postings that can still score above 0.
+    """
+    new_jobs = []
+    # Listings rejected under other preferences are not "seen": they are scored again
+    version = prefs_version(prefs)
+    seen_lookup = functools.partial(get_seen_listing_hashes, prefs_version=version)
+
+    async with global_limit, domain_limit:
         try:
             main_logger.info(f"Scraping {company.id} ({company.board_type})...")
-
-            # Call scraper with enhanced parameters
-            jobs = scraper_func(
-                company.url,
-                fetch_descriptions=company.fetch_descriptions and scraping_config.fetch_descriptions
+            list_options = {}
+            if getattr(source, "SUPPORTS_SEEN_LOOKUP", False):
+                # Paged sources stop listing once they reach postings we already know
+                list_options["seen_lookup"] = seen_lookup
+            if company.custom_selectors and getattr(source, "SUPPORTS_CUSTOM_SELECTORS", False):
+                list_options["custom_config"] = company.custom_selectors
+            listings, validators = await asyncio.to_thread(
+                _list_jobs_tracked, source, company.url, list_options, version
             )
 
-            # Record successful scraping
-            network_resilience.record_success(domain)
-
-            new_jobs_count = 0
-            for job in jobs:
-                total_jobs_found += 1
-                existing_job = get_job_by_hash(job['hash'])
-                if not existing_job:
-                    all_new_jobs.append(job)
-                    new_jobs_count += 1
-                    main_logger.info(f"  New job: {job['title']} at {job['location']}")
-                else:
-                    # Update existing job's last_seen timestamp
-                    add_job(job)  # This will update the existing job
+            # Known postings only get their last_seen/times_seen bumped (below)
+            seen = await asyncio.to_thread(seen_lookup, [listing['listing_hash'] for listing in listings])
+            unseen = [listing for listing in listings if listing['listing_hash'] not in seen]
 
-            main_logger.info(f"Completed {company.id}: {len(jobs)} total, {new_jobs_count} new")
+            # Listings rejected on title alone are never enriched; they are remembered as
+            # rejected under these preferences, so paged sources can stop at them too
+            candidates, rejected = [], []
+            for listing in unseen:
+                if prefilter_job(listing, prefs)[0]:
+                    candidates.append(listing)
+                else:
+                    rejected.append(dict(listing, score=0.0, prefs_version=version))
+            prefiltered = len(rejected)
 
+            jobs = await asyncio.to_thread(
+                source.enrich_jobs,
+                candidates,
+                fetch_descriptions=company.fetch_descriptions and scraping_config.fetch_descriptions
+            )
+        except NotModifiedException:
+            totals["unchanged"] += 1
+            await asyncio.to_thread(network_resilience.record_success, domain)
+            main_logger.info(f"Skipping {company.id}: board unchanged since the last poll")
+            return new_jobs
+        except RobotsDisallowedException as e:
+            # A policy skip, not a failure: the domain is not backed off
+            main_logger.info(f"Skipping {company.id}: {e}")
+            return new_jobs
         except ScrapingException as e:
-            errors += 1
-            network_resilience.record_failure(domain)
+            totals["errors"] += 1
+            await asyncio.to_thread(network_resilience.record_failure, domain)
             main_logger.error(f"Scraping failed for {company.id}: {e}")
+            return new_jobs
         except Exception as e:
-            errors += 1
-            network_resilience.record_failure(domain)
+            totals["errors"] += 1
+            await asyncio.to_thread(network_resilience.record_failure, domain)
             main_logger.error(f"Unexpected error scraping {company.id}: {e}")
+            return new_jobs
 
-    main_logger.info(f"Polling completed: {total_jobs_found} jobs found, {len(all_new_jobs)} new, {errors} errors")
-    return all_new_jobs
+    # Record successful scraping
+    await asyncio.to_thread(network_resilience.record_success, domain)
+
+    try:
+        totals["found"] += len(listings)
+        totals["prefiltered"] += prefiltered
+        existing_hashes = await asyncio.to_thread(get_existing_hashes, [job['hash'] for job in jobs])
+        known_jobs = []
+        for job in jobs:
+            if job['hash'] not in existing_hashes:
+                new_jobs.append(job)
+                main_logger.info(f"  New job: {job['title']} at {job['location']}")
+            else:
+                known_jobs.append(job)
+
+        # New jobs are recorded once they have been scored in process_jobs
+        await asyncio.to_thread(_store_known_listings, seen, known_jobs, rejected)
+
+        # Unchanged next time means nothing to do, so validators are only stored
+        # once this board's jobs are all in the database
+        if new_jobs:
+            http_validators.defer(validators)
+        else:
+            http_validators.commit(validators)
+
+        main_logger.info(
+            f"Completed {company.id}: {len(listings)} total, {len(new_jobs)} new, "
+            f"{len(seen)} already known, {prefiltered} prefiltered "
+            f"({len(seen) + prefiltered} description fetches saved)"
+        )
+    except Exception as e:
+        totals["errors"] += 1
+        await asyncio.to_thread(network_resilience.record_failure, domain)
+        main_logger.error(f"Unexpected error scraping {company.id}: {e}")
+
+    return new_jobs
 
 
 def process_jobs(jobs, prefs):
@@ -115,32 +291,23 @@ def process_jobs(jobs, prefs):
 
     main_logger.info(f"Processing {len(jobs)} jobs...")
 
-    for job in jobs:
-        try:
-            # Get enhanced scoring with metadata
-            result = score_job(job, prefs)
-
-            # Handle both old and new scoring formats
-            if len(result) == 3:
-                score, reasons, metadata = result
-                job['score_metadata'] = metadata
-            else:
-                # Backward compatibility
-                score, reasons = result
-                job['score_metadata'] = {"scoring_method": "legacy"}
+    # Rules for the whole batch at once; LLM calls only for the jobs the rules keep
+    results = score_jobs(jobs, prefs)
+    version = prefs_version(prefs)
 
+    kept_jobs = []
+    for job, (score, reasons, metadata) in zip(jobs, results):
+        try:
+            job['score_metadata'] = metadata
             job['score'] = score
             job['score_reasons'] = reasons
+            job['prefs_version'] = version
 
             if score > 0:
-                # Add to database
-                db_job = add_job(job)
-                processed_count += 1
+                kept_jobs.append(job)
 
                 if score >= filter_config.immediate_alert_threshold:
                     immediate_alerts.append(job)
-                    # Mark as alert sent
-                    mark_job_alert_sent(db_job.id)
                 else:
                     digest_jobs.append(job)
 
@@ -158,6 +325,30 @@ def process_jobs(jobs, prefs):
         except Exception as e:
             main_logger.error(f"Error processing job {job.get('title', 'Unknown')}: {e}")
 
+    # Add kept jobs to the database in one transaction and mark alerts as sent
+    stored = True
+    try:
+        job_ids = upsert_jobs(kept_jobs)
+        processed_count = len(kept_jobs)
+        mark_jobs_alert_sent([job_ids[job['hash']] for job in immediate_alerts if job['hash'] in job_ids])
+    except Exception as e:
+        stored = False
+        main_logger.error(f"Failed to store {len(kept_jobs)} processed jobs: {e}")
+
+    # Remember every scored listing so it is not enriched again; filtered ones only
+    # until the preferences change
+    try:
+        record_seen_listings(jobs)
+    except Exception as e:
+        stored = False
+        main_logger.error(f"Failed to record seen listings: {e}")
+
+    # Boards whose new jobs are now stored can be skipped while unchanged
+    if stored:
+        http_validators.commit_deferred()
+    else:
+        http_validators.discard_deferred()
+
     # Send immediate Slack alerts
     if immediate_alerts and notification_config.validate_slack():
         try:
@@ -170,6 +361,14 @@ def process_jobs(jobs, prefs):
 
     main_logger.info(f"Job processing completed: {processed_count} jobs added to database")
 
+    llm_stats = llm_cache.get_stats()
+    if llm_stats['hits'] or llm_stats['misses']:
+        main_logger.info(
+            f"LLM cache: {llm_stats['hits']} hits, {llm_stats['misses']} misses "
+            f"({llm_stats['hit_rate']:.0%} hit rate), {llm_stats['tokens_saved']} tokens saved"
+        )
+    llm_cache.prune()
+
 
 def send_digest():
     """Sends the daily email digest."""
@@ -267,11 +466,121 @@ def cleanup():
         # Clean up old jobs (configurable, default 90 days)
         cleanup_days = int(os.getenv('CLEANUP_DAYS', '90'))
         deleted_count = cleanup_old_jobs(cleanup_days)
+        cleanup_old_listings(cleanup_days)
+        description_cache.prune()
+        llm_cache.prune()
         main_logger.info(f"Cleanup completed: removed {deleted_count} old jobs")
     except Exception as e:
         main_logger.error(f"Cleanup failed: {e}")
 
 
+def rescore(prefs):
+    """
+    Recompute stored job scores after the scoring preferences changed.
+
+    Only jobs scored under another prefs version are touched. They are read
+    in chunks, scored by the rules engine in worker processes and written
+    back in batched UPDATEs, with a bounded number of chunks in flight, so
+    memory stays flat however large the database is. The LLM is not called:
+    rescored jobs get rules-only scores.
+    """
+    version = prefs_version(prefs)
+    total = count_jobs_to_rescore(version)
+    if not total:
+        main_logger.info(f"All stored jobs are already scored with the current preferences ({version})")
+        return
+
+    workers = int(os.getenv('RESCORE_WORKERS', '0')) or os.cpu_count() or 1
+    chunk_size = int(os.getenv('RESCORE_CHUNK_SIZE', '2000'))
+    main_logger.info(f"Rescoring {total} stored jobs with preferences {version} using {workers} workers...")
+
+    started = last_report = time.monotonic()
+    rescored = 0
+
+    def write(done):
+        nonlocal rescored, last_report
+        for future in done:
+            rescored += update_job_scores(future.result())
+        now = time.monotonic()
+        if now - last_report >= 5:
+            last_report = now
+            main_logger.info(f"Rescored {rescored}/{total} jobs ({rescored / (now - started):,.0f} jobs/sec)")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for rows in iter_jobs_to_rescore(version, chunk_size):
+            pending.add(pool.submit(rescore_rows, rows, prefs))
+            # Keep every worker busy without reading ahead of the writes
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                write(done)
+        if pending:
+            write(wait(pending).done)
+
+    main_logger.info(f"Rescore completed: {rescored} jobs in {time.monotonic() - started:.1f}s")
+
+
+def run_daemon(prefs):
+    """
+    Stay resident and run poll, digest and cleanup on their own intervals.
+
+    Startup checks run once. The database engine, HTTP session, browser pool
+    and loaded preferences are reused across cycles; preferences are only
+    reloaded when user_prefs.json changes on disk. SIGTERM/SIGINT let the
+    task in progress finish before shutting down.
+    """
+    poll_minutes = float(os.getenv('POLL_INTERVAL_MINUTES', '15'))
+    digest_hours = float(os.getenv('DIGEST_INTERVAL_HOURS', '24'))
+    cleanup_hours = float(os.getenv('CLEANUP_INTERVAL_HOURS', '24'))
+
+    state = {"prefs": prefs, "prefs_mtime": _prefs_mtime()}
+
+    def current_prefs():
+        mtime = _prefs_mtime()
+        if mtime != state["prefs_mtime"]:
+            state["prefs_mtime"] = mtime
+            try:
+                state["prefs"] = load_user_prefs()
+                main_logger.info("Preferences changed on disk, reloaded")
+            except Exception:
+                main_logger.error("Keeping previous preferences until the file is fixed")
+        return state["prefs"]
+
+    def poll_cycle():
+        cycle_prefs = current_prefs()
+        new_jobs = poll_sources(cycle_prefs)
+        process_jobs(new_jobs, cycle_prefs)
+
+    def maintenance():
+        cleanup()
+        db_resilience.auto_backup_if_needed()
+
+    scheduler = Scheduler()
+    scheduler.add_task("poll", poll_minutes * 60, poll_cycle)
+    scheduler.add_task("digest", digest_hours * 3600, send_digest, run_immediately=False)
+    scheduler.add_task("cleanup", cleanup_hours * 3600, maintenance, run_immediately=False)
+
+    def handle_signal(signum, frame):
+        main_logger.info(f"Received signal {signum}, finishing current task and shutting down...")
+        scheduler.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, handle_signal)
+
+    main_logger.info("Daemon started")
+    scheduler.run_forever()
+    main_logger.info("Daemon stopped")
+
+
+def _prefs_mtime():
+    """Modification time of user_prefs.json, or None if it cannot be read."""
+    try:
+        return config_manager.config_path.stat().st_mtime
+    except OSError:
+        return None
+
+
 def health_check():
     """Perform an interactive system health check."""
     main_logger.info("Starting interactive health check...")
@@ -348,6 +657,8 @@ def main():
   %(prog)s --mode digest      # Send daily digest email
   %(prog)s --mode test        # Test notification channels
   %(prog)s --mode cleanup     # Clean up old database entries
+  %(prog)s --mode rescore     # Rescore stored jobs after changing preferences
+  %(prog)s --mode daemon      # Stay resident and run everything on a schedule
         """
     )
     parser.add_argument(
@@ -357,7 +668,7 @@ def main():
     )
     parser.add_argument(
         "--mode",
-        choices=["poll", "digest", "test", "cleanup", "health"],
+        choices=["poll", "digest", "test", "cleanup", "health", "daemon", "rescore"],
         required=True,
         help="The mode to run the agent in"
     )
@@ -406,6 +717,10 @@ def main():
             cleanup()
         elif args.mode == "health":
             health_check()
+        elif args.mode == "daemon":
+            run_daemon(prefs)
+        elif args.mode == "rescore":
+            rescore(prefs)
 
         main_logger.info(f"Job scraper completed successfully ({args.mode} mode)")
 
@@ -425,7 +740,10 @@ def main():
             pass
         exit(1)
     finally:
-        # Always release the process lock
+        # Shut down the shared browser (if one was launched), HTTP pool and process lock
+        browser_pool.close()
+        web_scraper.close()
+        robots_cache.close()
         process_resilience.release_lock()
 
 
@@ -0,0 +1,108 @@
+"""
+Scoring throughput on synthetic postings.
+
+Compares scoring one job at a time (score_job) with the batch entry point
+(score_jobs). The LLM is always off, so this measures the rules engine only.
+
+    python benchmarks/bench_scoring.py [--jobs 10000] [--seed 42]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from matchers.rules import score_job, score_jobs  # noqa: E402
+
+PREFS = {
+    "title_allowlist": [
+        "Security Engineer", "Product Security", "Application Security", "AppSec",
+        "Information Security", "Cybersecurity", "Cloud Security", "Detection Engineer"
+    ],
+    "title_blocklist": ["Director", "Manager", "VP", "Intern", "Contract", "Consultant"],
+    "keywords_exclude": ["recruiter", "sales", "marketing"],
+    "location_constraints": ["Remote", "US", "United States"],
+    "keywords_boost": [
+        "Zero Trust", "Kubernetes", "AWS", "IAM", "SIEM", "SOC", "Penetration Testing",
+        "Vulnerability", "OWASP", "DevSecOps", "Terraform", "GCP", "Azure", "Threat Modeling",
+        "Incident Response", "Python", "Go", "Rust", "SAST", "DAST", "SBOM", "Supply Chain",
+        "Container Security", "EDR", "Splunk", "Detection", "Cryptography", "PKI", "OAuth",
+        "SAML", "Identity", "Bug Bounty", "Red Team", "Blue Team", "Forensics", "Malware",
+        "Compliance", "SOC 2", "ISO 27001", "FedRAMP", "HIPAA", "PCI", "Data Loss Prevention",
+        "Secrets Management", "Vault", "CI/CD", "GitHub Actions", "Linux", "Networking", "Firewall"
+    ],
+    "salary_floor_usd": 150000,
+    "use_llm": False,
+}
+
+TITLE_PARTS = [
+    "Senior", "Staff", "Principal", "Lead", "Junior", "Security Engineer", "Software Engineer",
+    "Cloud Security", "Product Security", "Manager", "Director", "Sales", "Data Scientist",
+    "AppSec", "Platform Engineer", "Intern"
+]
+LOCATIONS = ["Remote - US", "San Francisco, CA", "London, UK", "United States", "Berlin", "New York, NY"]
+FILLER = (
+    "we are looking for a motivated engineer to join our team and help build secure reliable "
+    "systems at scale you will collaborate with partners across the company to design review "
+    "and ship features while mentoring others and improving our practices every day"
+).split()
+
+
+def make_jobs(count: int, rng: random.Random) -> list[dict]:
+    """Synthetic postings with ~5,000-character descriptions."""
+    terms = [term.lower() for term in PREFS["keywords_boost"]]
+    jobs = []
+    for index in range(count):
+        words, length = [], 0
+        while length < 5000:
+            words.append(rng.choice(terms) if rng.random() < 0.02 else rng.choice(FILLER))
+            length += len(words[-1]) + 1
+        if rng.random() < 0.3:
+            words.append(f"salary range ${rng.randint(90, 260)},000")
+        jobs.append({
+            "hash": f"job-{index}",
+            "title": " ".join(rng.sample(TITLE_PARTS, 2)),
+            "company": "acme",
+            "location": rng.choice(LOCATIONS),
+            "description": " ".join(words)[:5000],
+        })
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.jobs, random.Random(args.seed))
+
+    # Scoring caches the parsed salary on each job, so every pass gets fresh copies
+    fresh = [dict(job) for job in jobs]
+    started = time.perf_counter()
+    single = [score_job(job, PREFS, use_llm=False) for job in fresh]
+    single_seconds = time.perf_counter() - started
+
+    fresh = [dict(job) for job in jobs]
+    started = time.perf_counter()
+    batch = score_jobs(fresh, PREFS, use_llm=False)
+    batch_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    score_jobs(fresh, PREFS, use_llm=False)
+    rescore_seconds = time.perf_counter() - started
+
+    assert [result[:2] for result in single] == [result[:2] for result in batch], "batch results differ"
+    kept = sum(1 for score in batch.scores if score > 0)
+
+    print(f"{len(jobs)} synthetic postings, {kept} kept by rules")
+    print(f"score_job  (one at a time): {len(jobs) / single_seconds:10,.0f} jobs/sec")
+    print(f"score_jobs (batch):         {len(jobs) / batch_seconds:10,.0f} jobs/sec")
+    print(f"score_jobs (salary stored): {len(jobs) / rescore_seconds:10,.0f} jobs/sec")
+
+
+if __name__ == "__main__":
+    main()
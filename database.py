@@ -1,6 +1,9 @@
-from sqlmodel import Field, Session, SQLModel, create_engine, select
+from sqlmodel import Field, Session, SQLModel, create_engine, select, update, delete, func
+from sqlalchemy import or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from utils.logging import get_logger
 from utils.errors import DatabaseException
 
@@ -14,6 +17,15 @@ class Job(SQLModel, table=True):
     description: Optional[str] = None
     score: float
     score_reasons: Optional[str] = None  # JSON string of reasons
+    # matchers.rules.prefs_version() of the preferences the score was computed with
+    prefs_version: Optional[str] = Field(default=None, index=True)
+
+    # Parsed salary (see matchers.salary); salary_version is set once extraction ran
+    salary_min: Optional[float] = None
+    salary_max: Optional[float] = None
+    salary_currency: Optional[str] = None
+    salary_period: Optional[str] = None
+    salary_version: Optional[str] = None
 
     # Timestamps
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -31,15 +43,84 @@ class Job(SQLModel, table=True):
     immediate_alert_sent: bool = Field(default=False)
     alert_sent_at: Optional[datetime] = None
 
+class SeenListing(SQLModel, table=True):
+    """A board listing we have already enriched or rejected on title, whatever its score was."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    listing_hash: str = Field(index=True, unique=True)
+    company: str
+    url: str
+    job_hash: Optional[str] = Field(default=None, index=True)
+    # Prefs version the job was rejected under (score 0, so not stored in Job);
+    # None when the job was stored. Rejected listings count as seen only while
+    # that version is current, so preference or parser changes re-enrich them.
+    prefs_version: Optional[str] = None
+
+    first_seen: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_seen: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    times_seen: int = Field(default=1)
+
 # The path to the SQLite database file
 DB_FILE = "data/jobs.sqlite"
 engine = create_engine(f"sqlite:///{DB_FILE}", echo=False)
 logger = get_logger("database")
 
+# Stay well below SQLite's bound-parameter limit (999 on older builds)
+SQL_VARIABLE_LIMIT = 999
+SQL_CHUNK_SIZE = 500
+
+def _chunked(items: list, size: int = SQL_CHUNK_SIZE) -> Iterable[list]:
+    """Yield successive slices of at most `size` items."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _rows_per_statement(row: dict) -> int:
+    """How many rows of this shape fit in one multi-row INSERT."""
+    return max(1, SQL_VARIABLE_LIMIT // max(1, len(row)))
+
+@contextmanager
+def transaction() -> Iterator[Session]:
+    """Open a session whose writes are committed together on exit."""
+    with Session(engine) as session:
+        yield session
+        session.commit()
+
+@contextmanager
+def _session_scope(session: Session = None) -> Iterator[Session]:
+    """Use the caller's session (which commits later) or a fresh transaction."""
+    if session is not None:
+        yield session
+    else:
+        with transaction() as new_session:
+            yield new_session
+
+def _add_missing_columns():
+    """
+    Add nullable model columns (and their indexes) that older databases lack.
+
+    create_all() only creates missing tables, so columns added to a model
+    later (e.g. the salary fields on Job) are added here with ALTER TABLE.
+    """
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {
+                row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table.name}")')
+            }
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.exec_driver_sql(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                )
+                logger.info(f"Added column {table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
 def init_db():
     """Creates the database and tables if they don't exist."""
     try:
         SQLModel.metadata.create_all(engine)
+        _add_missing_columns()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
@@ -98,6 +179,142 @@ def add_job(job_data: dict) -> Job:
         raise DatabaseException("add_job", str(e), e)
 
 
+def get_existing_hashes(hashes: list[str]) -> set[str]:
+    """Return the subset of job hashes already stored, using chunked IN queries."""
+    if not hashes:
+        return set()
+    try:
+        existing = set()
+        with Session(engine) as session:
+            for chunk in _chunked(list(set(hashes))):
+                existing.update(session.exec(select(Job.hash).where(Job.hash.in_(chunk))).all())
+        return existing
+    except Exception as e:
+        logger.error(f"Failed to look up {len(hashes)} job hashes: {e}")
+        raise DatabaseException("get_existing_hashes", str(e), e)
+
+
+def upsert_jobs(jobs: list[dict], session: Session = None) -> dict[str, int]:
+    """
+    Insert jobs in bulk; jobs whose hash already exists only get their
+    last_seen, times_seen and updated_at bumped.
+
+    All rows are written in a single transaction (the caller's, if given).
+    Returns a mapping of job hash to row ID.
+    """
+    if not jobs:
+        return {}
+    try:
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                'hash': job['hash'],
+                'title': job['title'],
+                'url': job['url'],
+                'company': job['company'],
+                'location': job.get('location', 'N/A'),
+                'description': job.get('description'),
+                'score': job.get('score', 0.0),
+                'score_reasons': str(job.get('score_reasons', [])),
+                'prefs_version': job.get('prefs_version'),
+                'salary_min': job.get('salary_min'),
+                'salary_max': job.get('salary_max'),
+                'salary_currency': job.get('salary_currency'),
+                'salary_period': job.get('salary_period'),
+                'salary_version': job.get('salary_version'),
+                'created_at': now,
+                'updated_at': now,
+                'last_seen': now,
+                'times_seen': 1,
+                'included_in_digest': False,
+                'immediate_alert_sent': False
+            }
+            for job in jobs
+        ]
+        # The same posting can reach one batch twice (listed by two companies or
+        # URLs); a second copy would bump times_seen within its own insert
+        unique_rows = {}
+        for row in rows:
+            unique_rows.setdefault(row['hash'], row)
+        rows = list(unique_rows.values())
+
+        ids = {}
+        with _session_scope(session) as scope:
+            for chunk in _chunked(rows, _rows_per_statement(rows[0])):
+                statement = sqlite_insert(Job).values(chunk)
+                statement = statement.on_conflict_do_update(
+                    index_elements=['hash'],
+                    set_={'last_seen': now, 'updated_at': now, 'times_seen': Job.times_seen + 1}
+                ).returning(Job.hash, Job.id)
+                ids.update({job_hash: job_id for job_hash, job_id in scope.execute(statement)})
+
+        logger.debug(f"Upserted {len(rows)} jobs")
+        return ids
+    except Exception as e:
+        logger.error(f"Failed to upsert {len(jobs)} jobs: {e}")
+        raise DatabaseException("upsert_jobs", str(e), e)
+
+
+# Columns scoring reads, plus the stored salary fields it can reuse
+RESCORE_COLUMNS = (
+    Job.id, Job.title, Job.company, Job.location, Job.description,
+    Job.salary_min, Job.salary_max, Job.salary_currency, Job.salary_period, Job.salary_version
+)
+
+def iter_jobs_to_rescore(prefs_version: str, chunk_size: int = 2000) -> Iterator[list[dict]]:
+    """
+    Yield stored jobs not scored under `prefs_version`, as chunks of plain
+    dicts in id order.
+
+    Each chunk is a separate short query continuing after the last id seen,
+    so only one chunk is in memory and rows can be updated in between.
+    """
+    last_id = 0
+    while True:
+        try:
+            with Session(engine) as session:
+                rows = session.execute(
+                    select(*RESCORE_COLUMNS)
+                    .where(Job.id > last_id, or_(Job.prefs_version.is_(None), Job.prefs_version != prefs_version))
+                    .order_by(Job.id)
+                    .limit(chunk_size)
+                ).all()
+        except Exception as e:
+            logger.error(f"Failed to read jobs to rescore: {e}")
+            raise DatabaseException("iter_jobs_to_rescore", str(e), e)
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield [row._asdict() for row in rows]
+
+def count_jobs_to_rescore(prefs_version: str) -> int:
+    """Number of stored jobs not scored under `prefs_version`."""
+    try:
+        with Session(engine) as session:
+            return session.exec(
+                select(func.count(Job.id))
+                .where(or_(Job.prefs_version.is_(None), Job.prefs_version != prefs_version))
+            ).one()
+    except Exception as e:
+        logger.error(f"Failed to count jobs to rescore: {e}")
+        raise DatabaseException("count_jobs_to_rescore", str(e), e)
+
+def update_job_scores(updates: list[dict]) -> int:
+    """
+    Write recomputed scores back: each dict holds a job id and the columns
+    to set. Sent as executemany UPDATEs by primary key in one transaction.
+    """
+    if not updates:
+        return 0
+    try:
+        with transaction() as session:
+            for chunk in _chunked(updates):
+                session.execute(update(Job), chunk)
+        return len(updates)
+    except Exception as e:
+        logger.error(f"Failed to update scores of {len(updates)} jobs: {e}")
+        raise DatabaseException("update_job_scores", str(e), e)
+
 def get_jobs_for_digest(min_score: float = 0.0, hours_back: int = 24) -> list[Job]:
     """Get jobs that should be included in digest, with a minimum score."""
     try:
@@ -151,6 +368,22 @@ def mark_job_alert_sent(job_id: int):
         raise DatabaseException("mark_job_alert_sent", str(e), e)
 
 
+def mark_jobs_alert_sent(job_ids: list[int]):
+    """Mark several jobs as having sent an immediate alert in one UPDATE."""
+    if not job_ids:
+        return
+    try:
+        now = datetime.now(timezone.utc)
+        with transaction() as session:
+            for chunk in _chunked(job_ids):
+                session.execute(
+                    update(Job).where(Job.id.in_(chunk)).values(immediate_alert_sent=True, alert_sent_at=now)
+                )
+    except Exception as e:
+        logger.error(f"Failed to mark {len(job_ids)} jobs alert sent: {e}")
+        raise DatabaseException("mark_jobs_alert_sent", str(e), e)
+
+
 def get_database_stats() -> dict:
     """Get database statistics for monitoring."""
     try:
@@ -199,4 +432,113 @@ def cleanup_old_jobs(days_to_keep: int = 90):
             return count
     except Exception as e:
         logger.error(f"Failed to cleanup old jobs: {e}")
-        raise DatabaseException("cleanup_old_jobs", str(e), e)
\ No newline at end of file
+        raise DatabaseException("cleanup_old_jobs", str(e), e)
+
+
+def get_seen_listing_hashes(listing_hashes: list[str], prefs_version: str = None) -> set[str]:
+    """
+    Return the subset of listing hashes that have been enriched before.
+
+    With a prefs_version, listings whose job was rejected under other
+    preferences are left out, so they are enriched and scored again.
+    """
+    if not listing_hashes:
+        return set()
+    try:
+        seen = set()
+        with Session(engine) as session:
+            for chunk in _chunked(list(set(listing_hashes))):
+                statement = select(SeenListing.listing_hash).where(SeenListing.listing_hash.in_(chunk))
+                if prefs_version is not None:
+                    statement = statement.where(or_(
+                        SeenListing.prefs_version.is_(None), SeenListing.prefs_version == prefs_version
+                    ))
+                seen.update(session.exec(statement).all())
+        return seen
+    except Exception as e:
+        logger.error(f"Failed to look up {len(listing_hashes)} listing hashes: {e}")
+        raise DatabaseException("get_seen_listing_hashes", str(e), e)
+
+
+def touch_seen_listings(listing_hashes: list[str], session: Session = None) -> int:
+    """Bump last_seen/times_seen for known listings and the jobs stored for them."""
+    if not listing_hashes:
+        return 0
+    try:
+        now = datetime.now(timezone.utc)
+        touched = 0
+        with _session_scope(session) as scope:
+            for chunk in _chunked(list(set(listing_hashes))):
+                scope.execute(
+                    update(SeenListing)
+                    .where(SeenListing.listing_hash.in_(chunk))
+                    .values(last_seen=now, times_seen=SeenListing.times_seen + 1)
+                )
+                job_hashes = select(SeenListing.job_hash).where(SeenListing.listing_hash.in_(chunk))
+                result = scope.execute(
+                    update(Job)
+                    .where(Job.hash.in_(job_hashes))
+                    .values(last_seen=now, times_seen=Job.times_seen + 1, updated_at=now)
+                )
+                touched += result.rowcount or 0
+        return touched
+    except Exception as e:
+        logger.error(f"Failed to touch {len(listing_hashes)} seen listings: {e}")
+        raise DatabaseException("touch_seen_listings", str(e), e)
+
+
+def record_seen_listings(jobs: list[dict], session: Session = None):
+    """
+    Remember enriched listings so later polls can skip their description fetch.
+
+    Jobs scored 0 are remembered with the prefs_version they were rejected under;
+    listings rejected before enrichment have no job hash. Jobs flagged
+    description_missing are skipped, so their description fetch is retried.
+    """
+    rows = [
+        {
+            'listing_hash': job['listing_hash'],
+            'company': job['company'],
+            'url': job['url'],
+            'job_hash': job.get('hash'),
+            'prefs_version': None if (job.get('score') or 0) > 0 else job.get('prefs_version')
+        }
+        for job in jobs if job.get('listing_hash') and not job.get('description_missing')
+    ]
+    if not rows:
+        return
+    try:
+        now = datetime.now(timezone.utc)
+        rows = [dict(row, first_seen=now, last_seen=now, times_seen=1) for row in rows]
+        with _session_scope(session) as scope:
+            for chunk in _chunked(rows, _rows_per_statement(rows[0])):
+                statement = sqlite_insert(SeenListing).values(chunk)
+                statement = statement.on_conflict_do_update(
+                    index_elements=['listing_hash'],
+                    set_={
+                        'job_hash': statement.excluded.job_hash,
+                        'prefs_version': statement.excluded.prefs_version,
+                        'last_seen': now
+                    }
+                )
+                scope.execute(statement)
+    except Exception as e:
+        logger.error(f"Failed to record {len(rows)} seen listings: {e}")
+        raise DatabaseException("record_seen_listings", str(e), e)
+
+
+def cleanup_old_listings(days_to_keep: int = 90) -> int:
+    """Forget listings not seen for the given number of days."""
+    try:
+        from datetime import timedelta
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_to_keep)
+
+        with Session(engine) as session:
+            result = session.execute(delete(SeenListing).where(SeenListing.last_seen < cutoff_date))
+            session.commit()
+            count = result.rowcount or 0
+            logger.info(f"Cleaned up {count} listings not seen in {days_to_keep} days")
+            return count
+    except Exception as e:
+        logger.error(f"Failed to cleanup old listings: {e}")
+        raise DatabaseException("cleanup_old_listings", str(e), e)
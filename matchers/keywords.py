@@ -0,0 +1,67 @@
+"""
+Multi-term substring matching for the rules scorer.
+
+A KeywordMatcher is built once from several named term lists and finds every
+term that occurs in a text in a single pass, using an Aho-Corasick automaton
+(pyahocorasick) so the cost grows with the text, not the number of terms.
+Without pyahocorasick it falls back to one substring scan per term, which is
+still faster in CPython than a combined regex.
+
+Matching is case-insensitive substring containment, exactly like
+`term.lower() in text.lower()`.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional speed-up
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """Finds which terms of several named lists occur in a text."""
+
+    def __init__(self, term_lists: Dict[str, Iterable[str]]):
+        # Lowercased term -> every (list name, position) it stands for
+        self._entries: Dict[str, List[Tuple[str, int]]] = {}
+        self._empty: List[Tuple[str, int]] = []
+        self.names = list(term_lists)
+
+        for name, terms in term_lists.items():
+            for index, term in enumerate(terms or []):
+                lowered = term.lower()
+                if lowered:
+                    self._entries.setdefault(lowered, []).append((name, index))
+                else:
+                    # "" is contained in every text
+                    self._empty.append((name, index))
+
+        self._automaton = None
+        if ahocorasick is not None and self._entries:
+            self._automaton = ahocorasick.Automaton()
+            for lowered in self._entries:
+                self._automaton.add_word(lowered, lowered)
+            self._automaton.make_automaton()
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """
+        Positions of the terms found in an already lowercased text, per list,
+        in list order.
+        """
+        if self._automaton is not None:
+            # Each term once, however often it occurs
+            keys = {key for _, key in self._automaton.iter(text)}
+        else:
+            keys = [key for key in self._entries if key in text]
+
+        found = {name: [] for name in self.names}
+        for key in keys:
+            for name, index in self._entries[key]:
+                found[name].append(index)
+        for name, index in self._empty:
+            found[name].append(index)
+
+        for indices in found.values():
+            indices.sort()
+        return found
@@ -1,3 +1,188 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from matchers.keywords import KeywordMatcher
+from matchers.salary import SALARY_VERSION, salary_for_job
+from utils.logging import get_logger
+
+logger = get_logger("scoring")
+
+# Preferences the rules score depends on; changing any of them is a new prefs version
+SCORING_PREF_KEYS = (
+    "title_allowlist", "title_blocklist", "keywords_exclude",
+    "location_constraints", "keywords_boost", "salary_floor_usd"
+)
+
+
+@dataclass(frozen=True)
+class CompiledPrefs:
+    """
+    Scoring preferences compiled for repeated use: one keyword matcher per
+    field, so a job's title, location and text are each scanned once.
+    """
+    version: str
+    title_allowlist: Tuple[str, ...]
+    title_blocklist: Tuple[str, ...]
+    keywords_exclude: Tuple[str, ...]
+    location_constraints: Tuple[str, ...]
+    keywords_boost: Tuple[str, ...]
+    salary_floor_usd: Optional[int]
+    title_matcher: KeywordMatcher
+    location_matcher: KeywordMatcher
+    boost_matcher: KeywordMatcher
+
+
+_compiled_prefs: Dict[str, CompiledPrefs] = {}
+# The scoring preferences last compiled, as a snapshot, and their compiled form
+_last_compiled: Tuple[tuple, Optional[CompiledPrefs]] = ((), None)
+
+
+def prefs_version(prefs: dict) -> str:
+    """
+    Short fingerprint of the preferences that rules scoring depends on, and of
+    the salary parser version, since a parser change can change scores too.
+    """
+    relevant = {key: prefs.get(key) for key in SCORING_PREF_KEYS}
+    relevant["salary_parser"] = SALARY_VERSION
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def compile_prefs(prefs) -> CompiledPrefs:
+    """Compile scoring preferences, reusing the result for the same prefs version."""
+    global _last_compiled
+    if isinstance(prefs, CompiledPrefs):
+        return prefs
+
+    # Cheap check for the common case of scoring many jobs with the same prefs
+    snapshot = tuple(
+        tuple(value) if isinstance(value, list) else value
+        for value in (prefs.get(key) for key in SCORING_PREF_KEYS)
+    )
+    if _last_compiled[0] == snapshot:
+        return _last_compiled[1]
+
+    version = prefs_version(prefs)
+    compiled = _compiled_prefs.get(version)
+    if compiled is not None:
+        _last_compiled = (snapshot, compiled)
+        return compiled
+
+    lists = {key: tuple(prefs.get(key) or ()) for key in SCORING_PREF_KEYS[:-1]}
+    compiled = CompiledPrefs(
+        version=version,
+        salary_floor_usd=prefs.get('salary_floor_usd'),
+        title_matcher=KeywordMatcher({
+            "block": lists["title_blocklist"],
+            "exclude": lists["keywords_exclude"],
+            "allow": lists["title_allowlist"]
+        }),
+        location_matcher=KeywordMatcher({"location": lists["location_constraints"]}),
+        boost_matcher=KeywordMatcher({"boost": lists["keywords_boost"]}),
+        **lists
+    )
+    _compiled_prefs[version] = compiled
+    _last_compiled = (snapshot, compiled)
+    return compiled
+
+
+@dataclass
+class ScoreResults:
+    """Scores for a batch of jobs, stored column-wise in job order."""
+    scores: List[float]
+    reasons: List[List[str]]
+    metadata: List[dict]
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __getitem__(self, index: int) -> tuple[float, list[str], dict]:
+        return self.scores[index], self.reasons[index], self.metadata[index]
+
+    def __iter__(self) -> Iterator[tuple[float, list[str], dict]]:
+        return zip(self.scores, self.reasons, self.metadata)
+
+
+def _rules_metadata(rules_score: float) -> dict:
+    return {
+        "rules_score": rules_score,
+        "llm_score": None,
+        "llm_used": False,
+        "tokens_used": 0,
+        "scoring_method": "rules_only"
+    }
+
+
+def _llm_module():
+    """utils.llm, or None when it cannot be imported."""
+    try:
+        from utils import llm
+        return llm
+    except ImportError:
+        return None
+
+
+def score_jobs(jobs: list[dict], prefs: dict, use_llm: bool = None) -> ScoreResults:
+    """
+    Scores a batch of jobs: rules for all of them with prefs compiled once,
+    then the LLM (if enabled) for the jobs the rules kept, in grouped
+    requests. Results come back in job order.
+    """
+    compiled = compile_prefs(prefs)
+    scores, reasons = [], []
+    for job in jobs:
+        score, job_reasons = score_job_rules_only(job, compiled)
+        scores.append(score)
+        reasons.append(job_reasons)
+    metadata = [_rules_metadata(score) for score in scores]
+
+    survivors = [index for index, score in enumerate(scores) if score > 0]
+    llm = _llm_module() if survivors and _should_use_llm(use_llm, prefs) else None
+    if llm is None:
+        return ScoreResults(scores, reasons, metadata)
+
+    try:
+        llm_results = llm.score_jobs_with_llm([jobs[index] for index in survivors], prefs)
+    except Exception as e:
+        logger.debug(f"LLM batch scoring failed: {e}")
+        return ScoreResults(scores, reasons, metadata)
+
+    rules_weight = 1.0 - prefs.get('llm_weight', 0.5)
+    for index, llm_result in zip(survivors, llm_results):
+        if llm_result:
+            scores[index], reasons[index], metadata[index] = llm.create_hybrid_score(
+                scores[index], reasons[index], llm_result, rules_weight
+            )
+    return ScoreResults(scores, reasons, metadata)
+
+
+def rescore_rows(rows: list[dict], prefs: dict) -> list[dict]:
+    """
+    Rules-only scores for stored job rows, as column updates keyed by job id
+    (score, reasons, prefs version and the parsed salary fields).
+
+    Runs in rescore worker processes, so it takes and returns plain dicts.
+    """
+    version = prefs_version(prefs)
+    results = score_jobs(rows, prefs, use_llm=False)
+    return [
+        {
+            'id': row['id'],
+            'score': score,
+            'score_reasons': str(reasons),
+            'prefs_version': version,
+            'salary_min': row.get('salary_min'),
+            'salary_max': row.get('salary_max'),
+            'salary_currency': row.get('salary_currency'),
+            'salary_period': row.get('salary_period'),
+            'salary_version': row.get('salary_version')
+        }
+        for row, (score, reasons, _) in zip(rows, results)
+    ]
+
+
 def score_job(job: dict, prefs: dict, use_llm: bool = None) -> tuple[float, list[str], dict]:
     """
     Applies rule-based scoring to a job, with optional LLM enhancement.
@@ -15,87 +200,107 @@ def score_job(job: dict, prefs: dict, use_llm: bool = None) -> tuple[float, list
 
     # Try LLM enhancement if enabled and job passed basic rules
     llm_result = None
-    if rules_score > 0 and _should_use_llm(use_llm, prefs):
+    llm = _llm_module() if rules_score > 0 and _should_use_llm(use_llm, prefs) else None
+    if llm is not None:
         try:
-            from utils.llm import score_job_with_llm
-            llm_result = score_job_with_llm(job, prefs)
-        except ImportError:
-            pass  # LLM not available, continue with rules only
+            llm_result = llm.score_job_with_llm(job, prefs)
         except Exception as e:
-            from utils.logging import get_logger
-            logger = get_logger("scoring")
             logger.debug(f"LLM scoring failed for {job.get('title', 'Unknown')}: {e}")
 
     # Create hybrid score
     if llm_result:
-        from utils.llm import create_hybrid_score
         llm_weight = prefs.get('llm_weight', 0.5)
         rules_weight = 1.0 - llm_weight
-        final_score, combined_reasons, metadata = create_hybrid_score(
+        final_score, combined_reasons, metadata = llm.create_hybrid_score(
             rules_score, rules_reasons, llm_result, rules_weight
         )
         return final_score, combined_reasons, metadata
     else:
         # Rules only
-        metadata = {
-            "rules_score": rules_score,
-            "llm_score": None,
-            "llm_used": False,
-            "tokens_used": 0,
-            "scoring_method": "rules_only"
-        }
-        return rules_score, rules_reasons, metadata
+        return rules_score, rules_reasons, _rules_metadata(rules_score)
+
+
+def prefilter_job(job: dict, prefs: dict) -> tuple[bool, str]:
+    """
+    Applies only the title-based rules, so a listing can be rejected before
+    its description is fetched. A job rejected here always scores 0.
+
+    Returns:
+        Tuple of (passed, rejection_reason)
+    """
+    compiled = compile_prefs(prefs)
+    title_hits = compiled.title_matcher.scan(job.get('title', '').lower())
+
+    rejection = _title_rejection(title_hits, compiled)
+    if rejection:
+        return False, rejection
+
+    if title_hits["allow"]:
+        return True, None
+    return False, "Rejected: Title did not match allowlist"
+
+
+def _title_rejection(title_hits: dict, compiled: CompiledPrefs) -> str:
+    """Return the rejection reason if the title matched a blocked or excluded word."""
+    # --- BLOCKLIST FILTER (IMMEDIATE REJECTION) ---
+    if title_hits["block"]:
+        return f"Rejected: Title contains blocked word '{compiled.title_blocklist[title_hits['block'][0]]}'"
+
+    # --- EXCLUDED KEYWORDS (TITLE ONLY) ---
+    if title_hits["exclude"]:
+        return f"Rejected: Title contains excluded keyword '{compiled.keywords_exclude[title_hits['exclude'][0]]}'"
+
+    return None
 
 
-def score_job_rules_only(job: dict, prefs: dict) -> tuple[float, list[str]]:
-    """Legacy rule-based scoring function (backward compatible)."""
+def score_job_rules_only(job: dict, prefs) -> tuple[float, list[str]]:
+    """
+    Rule-based scoring. `prefs` is the prefs dict or a CompiledPrefs; dicts
+    are compiled once per prefs version and reused.
+    """
+    compiled = compile_prefs(prefs)
     score = 0.0
     reasons = []
 
     title = job.get('title', '').lower()
+    title_hits = compiled.title_matcher.scan(title)
 
-    # --- BLOCKLIST FILTER (IMMEDIATE REJECTION) ---
-    for blocked_word in prefs.get("title_blocklist", []):
-        if blocked_word.lower() in title:
-            return 0.0, [f"Rejected: Title contains blocked word '{blocked_word}'"]
+    # --- BLOCKLIST / EXCLUDE FILTER (IMMEDIATE REJECTION) ---
+    rejection = _title_rejection(title_hits, compiled)
+    if rejection:
+        return 0.0, [rejection]
 
     # --- ALLOWLIST FILTER (MUST MATCH ONE) ---
-    has_allowed_title = False
-    for allowed_word in prefs.get("title_allowlist", []):
-        if allowed_word.lower() in title:
-            score += 0.6  # Base score for matching title
-            reasons.append(f"Title matched '{allowed_word}'")
-            has_allowed_title = True
-            break
-    if not has_allowed_title:
+    if not title_hits["allow"]:
         return 0.0, ["Rejected: Title did not match allowlist"]
+    score += 0.6  # Base score for matching title
+    reasons.append(f"Title matched '{compiled.title_allowlist[title_hits['allow'][0]]}'")
 
     # --- LOCATION SCORING ---
-    location = job.get('location', '').lower()
-    for loc_pref in prefs.get("location_constraints", []):
-        if loc_pref.lower() in location:
-            score += 0.2
-            reasons.append(f"Location matched '{loc_pref}'")
-            break # Only add points for the first location match
+    location_hits = compiled.location_matcher.scan(job.get('location', '').lower())["location"]
+    if location_hits:
+        # Only add points for the first location match
+        score += 0.2
+        reasons.append(f"Location matched '{compiled.location_constraints[location_hits[0]]}'")
 
     # --- KEYWORD BOOSTS ---
-    description = job.get('description', '').lower()
+    description = (job.get('description') or '').lower()
     full_text = title + ' ' + description
-    for boost_word in prefs.get("keywords_boost", []):
-        if boost_word.lower() in full_text:
-            score += 0.05
-            reasons.append(f"Keyword boost: '{boost_word}'")
+    for index in compiled.boost_matcher.scan(full_text)["boost"]:
+        score += 0.05
+        reasons.append(f"Keyword boost: '{compiled.keywords_boost[index]}'")
 
     # --- SALARY FILTER ---
-    salary_floor = prefs.get('salary_floor_usd')
+    salary_floor = compiled.salary_floor_usd
     if salary_floor:
-        # Try to extract salary from description
-        salary_found = _extract_salary(full_text)
-        if salary_found and salary_found < salary_floor:
-            return 0.0, [f"Rejected: Salary ${salary_found:,} below floor ${salary_floor:,}"]
-        elif salary_found and salary_found >= salary_floor:
+        # Parsed once per posting and kept on the job record
+        salary = salary_for_job(job)
+        if salary and salary.is_usd:
+            # A range passes when its top reaches the floor
+            if salary.annual_max < salary_floor:
+                return 0.0, [f"Rejected: Salary {salary.describe()} below floor ${salary_floor:,}"]
             score += 0.1
-            reasons.append(f"Salary ${salary_found:,} meets requirements")
+            reasons.append(f"Salary {salary.describe()} meets requirements")
 
     return min(score, 1.0), reasons # Cap score at 1.0
 
@@ -110,38 +315,4 @@ def _should_use_llm(use_llm: bool, prefs: dict) -> bool:
         return prefs['use_llm']
 
     # Check environment
-    import os
     return os.getenv('LLM_ENABLED', 'false').lower() == 'true'
-
-
-def _extract_salary(text: str) -> int:
-    """Try to extract salary information from job text."""
-    import re
-
-    # Common salary patterns
-    patterns = [
-        r'\$(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)[kK]?',  # $150k, $150,000
-        r'(\d{1,3}(?:,\d{3})*)[kK]',                 # 150k, 150,000
-        r'salary.*?(\d{1,3}(?:,\d{3})*)',            # salary of 150000
-        r'compensation.*?(\d{1,3}(?:,\d{3})*)',      # compensation 150000
-    ]
-
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            try:
-                # Clean and convert to integer
-                salary_str = match.replace(',', '').replace('$', '')
-                salary = int(salary_str)
-
-                # Handle 'k' suffix
-                if 'k' in match.lower():
-                    salary *= 1000
-
-                # Reasonable salary range check
-                if 30000 <= salary <= 1000000:
-                    return salary
-            except (ValueError, TypeError):
-                continue
-
-    return None
\ No newline at end of file
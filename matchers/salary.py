@@ -0,0 +1,287 @@
+"""
+Salary extraction from job postings.
+
+Parses pay ranges ("$150k – $190k"), single amounts, k/M suffixes, currency
+symbols and codes, and hourly/weekly/monthly/annual units, from a posting's
+schema.org baseSalary when it has one and from its text otherwise. The
+result is stored on the job record (salary_* fields, tagged with
+SALARY_VERSION), so a posting is parsed once and later rescoring checks
+salary_floor_usd from those fields alone.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+# Bump when parsing changes so stored results are re-extracted
+SALARY_VERSION = "2"
+
+# Multipliers to annual pay, assuming a 40-hour week
+PERIOD_MULTIPLIERS = {"year": 1, "month": 12, "week": 52, "day": 260, "hour": 2080}
+
+# Annual pay outside this range is not a salary (401k, team sizes, funding rounds)
+MIN_ANNUAL = 10_000
+MAX_ANNUAL = 5_000_000
+
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP"}
+CURRENCY_CODES = ("USD", "EUR", "GBP", "CAD", "AUD", "CHF", "INR", "SGD")
+
+_AMOUNT = r"(?P<{n}cur>[$€£]|\b(?:{codes})\b)?\s*(?P<{n}num>\d{{1,3}}(?:,\d{{3}})+(?:\.\d+)?|\d+(?:\.\d+)?)(?P<{n}suf>[kKmM]\b)?"
+
+_SALARY_PATTERN = re.compile(
+    _AMOUNT.format(n="lo_", codes="|".join(CURRENCY_CODES))
+    + r"(?:\s*(?:-|–|—|to)\s*"
+    + _AMOUNT.format(n="hi_", codes="|".join(CURRENCY_CODES))
+    + r")?"
+    + r"(?:\s*(?P<code>" + "|".join(CURRENCY_CODES) + r")\b)?",
+    re.IGNORECASE
+)
+
+_PERIOD_PATTERNS = [
+    ("hour", re.compile(r"(?:/|\bper\s+|\ban\s+|\ba\s+)(?:hour|hr)\b|\bhourly\b", re.IGNORECASE)),
+    ("week", re.compile(r"(?:/|\bper\s+|\ba\s+)(?:week|wk)\b|\bweekly\b", re.IGNORECASE)),
+    ("month", re.compile(r"(?:/|\bper\s+|\ba\s+)(?:month|mo)\b|\bmonthly\b", re.IGNORECASE)),
+    ("day", re.compile(r"(?:/|\bper\s+|\ba\s+)day\b|\bdaily\b", re.IGNORECASE)),
+    ("year", re.compile(r"(?:/|\bper\s+|\ba\s+)(?:year|yr|annum)\b|\bannual(?:ly)?\b", re.IGNORECASE)),
+]
+
+# An amount is only read as pay next to one of these words (or an explicit pay period)
+_CONTEXT_WORDS = ("salary", "compensation", "pay", "base", "range", "ote", "wage", "rate")
+_CONTEXT_PATTERN = re.compile(r"\b(?:" + "|".join(_CONTEXT_WORDS) + r")\b", re.IGNORECASE)
+_CONTEXT_WINDOW = 60
+
+# Only text around these markers is run through _SALARY_PATTERN: re scans every
+# position of a 5,000-character description, str.find is far cheaper
+_WORD_MARKERS = tuple(code.lower() for code in CURRENCY_CODES) + _CONTEXT_WORDS
+# How far a window reaches before a marker (an amount ahead of "USD") and after it
+_WINDOW_BEFORE = 30
+_WINDOW_AFTER = _CONTEXT_WINDOW + 100
+_NUMBER_CHARS = frozenset("0123456789,.")
+
+# Amounts in the same phrase as these are perks or funding, not pay
+# ("$40 per diem", "$500 home office budget", "raised $150M", "$2M seed round")
+_PERK_PATTERN = re.compile(
+    r"\b(?:per\s+diem|stipends?|budgets?|bonus(?:es)?|seed|raised|funding|series\s+[a-h]|valuation|"
+    r"revenue|allowances?|reimburse\w*|relocation|sign[- ]?on|equity|credits?)\b",
+    re.IGNORECASE
+)
+# Where the phrase around an amount ends, looking either way
+_CLAUSE_BREAK = re.compile(r"[.;,!?\n+]|\b(?:and|plus|with|or)\b", re.IGNORECASE)
+_CLAUSE_WINDOW = 40
+# 401(k) / 403(b) retirement plans sit right next to salary words in benefit sections
+_BENEFIT_PLANS = ("401", "403")
+
+_UNIT_TEXT = {
+    "HOUR": "hour", "DAY": "day", "WEEK": "week", "MONTH": "month", "YEAR": "year",
+}
+
+
+@dataclass(frozen=True)
+class Salary:
+    """A pay range in one currency and period (min == max for a single amount)."""
+    min_amount: float
+    max_amount: float
+    currency: Optional[str]
+    period: str = "year"
+
+    @property
+    def annual_min(self) -> float:
+        return self.min_amount * PERIOD_MULTIPLIERS.get(self.period, 1)
+
+    @property
+    def annual_max(self) -> float:
+        return self.max_amount * PERIOD_MULTIPLIERS.get(self.period, 1)
+
+    @property
+    def is_usd(self) -> bool:
+        """Whether the amounts can be compared with a USD floor (unstated currency counts as USD)."""
+        return self.currency in (None, "USD")
+
+    def describe(self) -> str:
+        """'$150,000' or '$150,000–$190,000' (annualized), for score reasons."""
+        symbol = "$" if self.is_usd else f"{self.currency} "
+        low, high = int(self.annual_min), int(self.annual_max)
+        if low == high:
+            return f"{symbol}{low:,}"
+        return f"{symbol}{low:,}–{symbol}{high:,}"
+
+
+def _number(raw: str, suffix: Optional[str]) -> float:
+    value = float(raw.replace(",", ""))
+    if suffix:
+        value *= 1_000 if suffix.lower() == "k" else 1_000_000
+    return value
+
+
+def _clause_after(text: str, end: int) -> str:
+    segment = text[end:end + _CLAUSE_WINDOW]
+    cut = _CLAUSE_BREAK.search(segment)
+    return segment[:cut.start()] if cut else segment
+
+
+def _clause_before(text: str, start: int) -> str:
+    segment = text[max(0, start - _CLAUSE_WINDOW):start]
+    cut = None
+    for cut in _CLAUSE_BREAK.finditer(segment):
+        pass
+    return segment[cut.end():] if cut else segment
+
+
+def _period(text: str) -> Optional[str]:
+    for period, pattern in _PERIOD_PATTERNS:
+        if pattern.search(text):
+            return period
+    return None
+
+
+def _plausible(salary: Salary) -> bool:
+    return MIN_ANNUAL <= salary.annual_min <= salary.annual_max <= MAX_ANNUAL
+
+
+def _windows(text: str) -> list[tuple[int, int]]:
+    """Merged (start, end) spans of the text that can hold a salary, in order."""
+    lowered = text.lower()
+    length = len(text)
+    starts = []
+    for symbol in CURRENCY_SYMBOLS:
+        position = text.find(symbol)
+        while position != -1:
+            starts.append(position)
+            position = text.find(symbol, position + 1)
+    for word in _WORD_MARKERS:
+        position = lowered.find(word)
+        while position != -1:
+            end = position + len(word)
+            # Whole words only, like \b...\b ("collaborate" has no "rate")
+            if (position == 0 or not lowered[position - 1].isalnum()) and \
+                    (end == length or not lowered[end].isalnum()):
+                starts.append(position)
+            position = lowered.find(word, end)
+
+    windows = []
+    for position in sorted(starts):
+        start = max(0, position - _WINDOW_BEFORE)
+        # Never start inside a number
+        while start > 0 and text[start - 1] in _NUMBER_CHARS:
+            start -= 1
+        end = min(length, position + _WINDOW_AFTER)
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def extract_salary(text: str) -> Optional[Salary]:
+    """
+    The salary stated in free text, or None when there is none or it is unclear.
+
+    Only amounts presented as pay count: next to a salary word ("salary",
+    "pay", "base", ...) or with an explicit pay period ("/hr", "per year").
+    Amounts in a phrase about perks or funding ("$40 per diem", "$2M seed
+    round"), bare small amounts and retirement plans ("401k") are skipped.
+    When several remain, ranges and amounts next to a salary word win over
+    the first one found.
+    """
+    if not text:
+        return None
+
+    best, best_rank = None, None
+    for match in (match for start, end in _windows(text)
+                  for match in _SALARY_PATTERN.finditer(text, start, end)):
+        currency_text = match.group("lo_cur") or match.group("hi_cur") or match.group("code")
+        if not currency_text and match.group("lo_num") in _BENEFIT_PLANS:
+            continue
+
+        before = _clause_before(text, match.start())
+        after = _clause_after(text, match.end())
+        if _PERK_PATTERN.search(before) or _PERK_PATTERN.search(after):
+            continue
+
+        context = text[max(0, match.start() - _CONTEXT_WINDOW):match.start()]
+        has_context = bool(_CONTEXT_PATTERN.search(context) or _CONTEXT_PATTERN.search(after))
+        period = _period(after)
+        # Amounts without a currency need a salary word; others at least a pay period
+        if not (has_context or (currency_text and period)):
+            continue
+
+        low_suffix, high_suffix = match.group("lo_suf"), match.group("hi_suf")
+        is_range = bool(match.group("hi_num"))
+        if is_range:
+            # "$150-190k": the suffix on the upper bound applies to both
+            low = _number(match.group("lo_num"), low_suffix or high_suffix)
+            high = _number(match.group("hi_num"), high_suffix or low_suffix)
+        else:
+            low = high = _number(match.group("lo_num"), low_suffix)
+
+        if period is None:
+            if high < 1_000 and not (low_suffix or high_suffix):
+                # "$45" alone could be anything; hourly only when the text says so
+                continue
+            period = "year"
+
+        currency = CURRENCY_SYMBOLS.get(currency_text, currency_text.upper()) if currency_text else None
+        salary = Salary(min(low, high), max(low, high), currency, period)
+        if not _plausible(salary):
+            continue
+
+        rank = (has_context, is_range)
+        if best_rank is None or rank > best_rank:
+            best, best_rank = salary, rank
+
+    return best
+
+
+def parse_base_salary(base_salary) -> Optional[Salary]:
+    """A schema.org MonetaryAmount (JobPosting.baseSalary) as a Salary, or None."""
+    if not isinstance(base_salary, dict):
+        return extract_salary(str(base_salary)) if base_salary else None
+
+    currency = base_salary.get("currency")
+    value = base_salary.get("value", base_salary)
+    unit = None
+    if isinstance(value, dict):
+        unit = value.get("unitText")
+        amounts = [value.get("minValue"), value.get("maxValue"), value.get("value")]
+    else:
+        amounts = [value]
+
+    numbers = []
+    for amount in amounts:
+        try:
+            numbers.append(float(str(amount).replace(",", "")))
+        except (TypeError, ValueError):
+            continue
+    if not numbers:
+        return None
+
+    period = _UNIT_TEXT.get(str(unit or "YEAR").upper(), "year")
+    salary = Salary(min(numbers), max(numbers), str(currency).upper() if currency else None, period)
+    return salary if _plausible(salary) else None
+
+
+def salary_for_job(job: dict) -> Optional[Salary]:
+    """
+    The job's salary, extracted at most once per SALARY_VERSION.
+
+    Uses the stored salary_* fields when present; otherwise parses the
+    structured baseSalary (if the source had one) or the title and
+    description, and stores the result on the job.
+    """
+    if job.get("salary_version") == SALARY_VERSION:
+        if job.get("salary_min") is None:
+            return None
+        return Salary(job["salary_min"], job["salary_max"], job.get("salary_currency"), job.get("salary_period") or "year")
+
+    salary = parse_base_salary(job.get("base_salary")) if job.get("base_salary") else None
+    if salary is None:
+        salary = extract_salary(f"{job.get('title', '')}\n{job.get('description') or ''}")
+
+    job.update(
+        salary_version=SALARY_VERSION,
+        salary_min=salary.min_amount if salary else None,
+        salary_max=salary.max_amount if salary else None,
+        salary_currency=salary.currency if salary else None,
+        salary_period=salary.period if salary else None
+    )
+    return salary
@@ -5,9 +5,11 @@ Supported boards:
 - Greenhouse
 - Lever
 - Workday
+- Ashby
+- SmartRecruiters
 - Generic JavaScript-rendered pages
 """
 
-from . import greenhouse, lever, workday, generic_js
+from . import greenhouse, lever, workday, ashby, smartrecruiters, generic_js
 
-__all__ = ['greenhouse', 'lever', 'workday', 'generic_js']
\ No newline at end of file
+__all__ = ['greenhouse', 'lever', 'workday', 'ashby', 'smartrecruiters', 'generic_js']
\ No newline at end of file
@@ -0,0 +1,77 @@
+from .common import fetch_url, make_listing, enrich_listings, extract_company_from_url, html_to_text
+from utils.errors import NotModifiedException
+from utils.logging import get_logger
+
+logger = get_logger("sources.ashby")
+
+DESCRIPTION_SELECTOR = '[class*="_descriptionText_"]'
+
+# Public job board API; returns every listed posting with its full description
+POSTINGS_API_URL = "https://api.ashbyhq.com/posting-api/job-board/{board_name}"
+# Host the listing requests go to; its adaptive limits size our concurrency
+API_DOMAIN = "api.ashbyhq.com"
+
+
+def build_location(posting: dict) -> str:
+    """Combines an Ashby posting's primary and secondary locations."""
+    locations = [posting.get('location') or '']
+    locations += [(secondary.get('location') or '') for secondary in posting.get('secondaryLocations') or []]
+    location = ' / '.join(loc for loc in locations if loc)
+    if posting.get('isRemote') and 'remote' not in location.lower():
+        location = f"{location} (Remote)" if location else 'Remote'
+    return location or 'N/A'
+
+
+def list_jobs(board_url: str) -> list[dict]:
+    """Lists jobs on an Ashby board from the posting API, including descriptions."""
+    logger.info(f"Starting Ashby scrape for {board_url}")
+
+    # Ashby boards use format: https://jobs.ashbyhq.com/company
+    company_name = extract_company_from_url(board_url)
+
+    try:
+        data = fetch_url(POSTINGS_API_URL.format(board_name=company_name), conditional=True)
+        listings = []
+
+        for job in data.get('jobs', []):
+            # Unlisted postings are reachable by link only and not on the board
+            if job.get('isListed') is False:
+                continue
+
+            if job.get('descriptionPlain'):
+                description = job['descriptionPlain'].strip()[:5000]
+            else:
+                description = html_to_text(job.get('descriptionHtml') or '', "\n")
+
+            job_url = job.get('jobUrl') or f"https://jobs.ashbyhq.com/{company_name}/{job.get('id')}"
+            listings.append(make_listing(
+                company=company_name,
+                listing_id=str(job.get('id') or job_url),
+                title=job.get('title', 'N/A'),
+                url=job_url,
+                location=build_location(job),
+                description=description,
+                version=job.get('publishedAt', ''),
+                description_complete=True
+            ))
+
+        logger.info(f"Found {len(listings)} jobs for {company_name}")
+        return listings
+
+    except NotModifiedException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to scrape Ashby board {board_url}: {e}")
+        raise
+
+
+def enrich_jobs(listings: list[dict], fetch_descriptions: bool = True) -> list[dict]:
+    """Fetches descriptions for Ashby listings the API returned without content, and hashes them."""
+    return enrich_listings(listings, fetch_descriptions, DESCRIPTION_SELECTOR)
+
+
+def scrape(board_url: str, fetch_descriptions: bool = True):
+    """Scrapes jobs from an Ashby board using their posting API."""
+    scraped_jobs = enrich_jobs(list_jobs(board_url), fetch_descriptions)
+    logger.info(f"Successfully scraped {len(scraped_jobs)} jobs from {extract_company_from_url(board_url)}")
+    return scraped_jobs
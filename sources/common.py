@@ -1,10 +1,16 @@
 import hashlib
 from utils.scraping import web_scraper
+from utils.browser import browser_pool
+from utils.fetcher import adaptive_fetcher
+from utils.description_cache import description_cache
 from utils.logging import get_logger
-from utils.errors import ScrapingException
+from utils.errors import ScrapingException, NotModifiedException, RobotsDisallowedException
 
 logger = get_logger("sources.common")
 
+# Bump when html_to_text changes, so cached description text is re-extracted
+EXTRACTOR_VERSION = "1"
+
 def create_job_hash(company: str, title: str, description: str) -> str:
     """Creates a stable SHA-256 hash for a job based on its content."""
     # Normalize by lowercasing and removing whitespace
@@ -16,55 +22,174 @@ def create_job_hash(company: str, title: str, description: str) -> str:
     hash_input = f"{norm_company}{norm_title}{norm_desc}".encode('utf-8')
     return hashlib.sha256(hash_input).hexdigest()
 
-def fetch_url(url: str) -> dict:
-    """Fetches a URL with retries and rate limiting. Returns response data."""
+def create_listing_hash(company: str, listing_id: str, title: str = "", location: str = "", version: str = "") -> str:
+    """
+    Creates a cheap identity for a board listing, available before any description fetch.
+
+    The board's posting ID (or URL) identifies the posting; title, location and
+    the board's own change marker (e.g. updated_at) make an edited posting hash
+    differently so that it is enriched again.
+    """
+    parts = [company, listing_id, title, location, version]
+    hash_input = "|".join(" ".join(str(part).lower().split()) for part in parts).encode('utf-8')
+    return hashlib.sha256(hash_input).hexdigest()
+
+def make_listing(company: str, listing_id: str, title: str, url: str, location: str,
+                 description: str = "", version: str = "", description_complete: bool = False) -> dict:
+    """
+    Builds a listing record as returned by each source's list_jobs().
+
+    Set description_complete when the listing endpoint already returned the
+    full description, so enrichment does not fetch the posting page.
+    """
+    return {
+        'listing_id': listing_id,
+        'listing_hash': create_listing_hash(company, listing_id, title, location, version),
+        'title': title,
+        'url': url,
+        'company': company,
+        'location': location,
+        'description': description or '',
+        'description_complete': description_complete and bool(description)
+    }
+
+def enrich_listings(listings: list[dict], fetch_descriptions: bool = True, selector: str = None) -> list[dict]:
+    """
+    Turns listings into full job records.
+
+    Full descriptions are batch-fetched (when requested) and replace whatever
+    the listing endpoint provided, then the content hash is computed. Jobs
+    whose description fetch failed are flagged description_missing, so they
+    are not remembered as seen and the next poll fetches them again.
+    """
+    descriptions = {}
+    if fetch_descriptions:
+        urls = [
+            listing['url'] for listing in listings
+            if listing['url'] and listing['url'] != '#' and not listing.get('description_complete')
+        ]
+        descriptions = fetch_job_descriptions(urls, selector)
+
+    jobs = []
+    for listing in listings:
+        fetched = descriptions.get(listing['url'])
+        description = fetched or listing['description']
+        job = dict(listing, description=description, description_missing=listing['url'] in descriptions and not fetched)
+        job['hash'] = create_job_hash(listing['company'], listing['title'], description[:250])
+        jobs.append(job)
+
+    return jobs
+
+def fetch_url(url: str, json_body: dict = None, conditional: bool = False) -> dict:
+    """
+    Fetches a URL with retries and rate limiting. Returns response data.
+
+    With conditional=True, NotModifiedException is raised when the content is
+    unchanged since the last successfully processed poll. URLs disallowed by
+    robots.txt raise RobotsDisallowedException.
+    """
     try:
-        response = web_scraper.fetch_url(url)
+        return _response_data(web_scraper.fetch_url(url, json_body=json_body, conditional=conditional))
+    except (NotModifiedException, RobotsDisallowedException):
+        raise
+    except Exception as e:
+        logger.error(f"Failed to fetch {url}: {e}")
+        raise ScrapingException("", url, str(e), e)
 
-        # Try to parse as JSON, fall back to text
-        try:
-            return response.json()
-        except ValueError:
-            return {"content": response.text, "status_code": response.status_code}
 
+async def fetch_url_async(url: str, json_body: dict = None, conditional: bool = False) -> dict:
+    """Async fetch_url for code running on an event loop."""
+    try:
+        return _response_data(await web_scraper.fetch_url_async(url, json_body=json_body, conditional=conditional))
+    except (NotModifiedException, RobotsDisallowedException):
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch {url}: {e}")
         raise ScrapingException("", url, str(e), e)
 
 
-async def fetch_job_description(job_url: str, selector: str = None) -> str:
-    """Fetch full job description using Playwright for JS-heavy sites."""
+def _response_data(response) -> dict:
+    # Try to parse as JSON, fall back to text
     try:
-        async with web_scraper as scraper:
-            content = await scraper.fetch_with_playwright(
-                job_url,
-                wait_for_selector=selector
-            )
+        return response.json()
+    except ValueError:
+        return {"content": response.text, "status_code": response.status_code}
+
 
-            # Extract text content from HTML
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(content, 'html.parser')
+def html_to_text(content: str, separator: str = "") -> str:
+    """
+    Extract readable, whitespace-normalized text from an HTML document.
 
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+    Pass separator="\n" for HTML fragments without newlines between block
+    elements (e.g. API payloads), so list items don't run together.
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
 
-            # Get text content
-            text = soup.get_text()
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
 
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            description = '\n'.join(chunk for chunk in chunks if chunk)
+    # Get text content
+    text = soup.get_text(separator)
 
-            logger.debug(f"Fetched job description from {job_url} ({len(description)} chars)")
-            return description[:5000]  # Limit to 5000 characters
+    # Clean up whitespace
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    description = '\n'.join(chunk for chunk in chunks if chunk)
+    return description[:5000]  # Limit to 5000 characters
+
+
+async def fetch_job_description(job_url: str, selector: str = None) -> str:
+    """Fetch full job description using Playwright for JS-heavy sites."""
+    cached = description_cache.get_text(job_url, EXTRACTOR_VERSION, html_to_text)
+    if cached:
+        return cached
+
+    try:
+        content = await browser_pool.fetch_async(job_url, wait_for_selector=selector)
+        description = html_to_text(content)
+        description_cache.put(job_url, EXTRACTOR_VERSION, content, description)
+        logger.debug(f"Fetched job description from {job_url} ({len(description)} chars)")
+        return description
 
     except Exception as e:
         logger.warning(f"Failed to fetch job description from {job_url}: {e}")
         return ""
 
 
+def fetch_job_descriptions(job_urls: list[str], selector: str = None) -> dict[str, str]:
+    """
+    Fetch many job descriptions, over plain HTTP where the page is
+    server-rendered and concurrently on the shared browser pool otherwise.
+    Descriptions already in the on-disk cache are not fetched at all.
+
+    Returns a mapping of URL to description text. URLs that could not be
+    fetched map to an empty string, matching fetch_job_description.
+    """
+    if not job_urls:
+        return {}
+
+    descriptions = description_cache.get_texts(job_urls, EXTRACTOR_VERSION, html_to_text)
+    missing = [url for url in job_urls if url not in descriptions]
+    if not missing:
+        return descriptions
+
+    try:
+        pages = adaptive_fetcher.fetch_many(missing, selector)
+    except Exception as e:
+        logger.warning(f"Failed to fetch {len(missing)} job descriptions: {e}")
+        descriptions.update({url: "" for url in missing})
+        return descriptions
+
+    for url, content in pages.items():
+        descriptions[url] = html_to_text(content) if content else ""
+        description_cache.put(url, EXTRACTOR_VERSION, content, descriptions[url])
+
+    logger.debug(f"Fetched {sum(1 for d in descriptions.values() if d)}/{len(job_urls)} job descriptions")
+    return descriptions
+
+
 def extract_company_from_url(url: str) -> str:
     """Extract company name from job board URL."""
     from urllib.parse import urlparse
@@ -79,6 +204,10 @@ def extract_company_from_url(url: str) -> str:
     if 'lever.co' in parsed.netloc:
         return parsed.netloc.split('.')[0]
 
+    # Ashby and SmartRecruiters boards
+    if 'ashbyhq.com' in parsed.netloc or 'smartrecruiters.com' in parsed.netloc:
+        return parsed.path.strip('/').split('/')[0] or 'unknown'
+
     # Workday boards
     if 'workday.com' in parsed.netloc:
         return parsed.path.split('/')[1] if len(parsed.path.split('/')) > 1 else 'unknown'
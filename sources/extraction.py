@@ -0,0 +1,183 @@
+"""
+Declarative listing extraction from per-company selector specs.
+
+A company's `custom_selectors` describe where postings live on its career
+page, for example:
+
+    {
+        "item": "ul.openings > li",
+        "title": "h3",
+        "location": ".location",
+        "link": "a",
+        "next": "a[rel=next]",
+        "description": "#job-description",
+        "max_pages": 5,
+        "render": false,
+        "scroll": 0
+    }
+
+Selectors are CSS unless prefixed with "xpath:". A field selector may end in
+"@attr" to read an attribute instead of the text. Specs are compiled to lxml
+XPath objects once and cached, so hundreds of custom sites don't re-parse
+their selectors on every poll.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
+
+from utils.errors import ConfigurationException
+from utils.logging import get_logger
+
+logger = get_logger("sources.extraction")
+
+DEFAULT_MAX_PAGES = 5
+FIELD_KEYS = ('title', 'location', 'link')
+
+# "a.apply@href" reads the href attribute of the matched element
+_ATTRIBUTE_SUFFIX = re.compile(r'^(.*[^\s])\s*@([\w:-]+)$')
+
+_compiled_cache: Dict[str, "CompiledSelectors"] = {}
+
+
+@dataclass(frozen=True)
+class FieldSelector:
+    """A compiled selector plus the attribute to read (None for text)."""
+    source: str
+    xpath: etree.XPath
+    attribute: Optional[str] = None
+
+    def first(self, element) -> Optional[str]:
+        for match in self.xpath(element):
+            if isinstance(match, str):
+                value = match
+            elif self.attribute:
+                value = match.get(self.attribute)
+            else:
+                value = match.text_content()
+            value = " ".join((value or "").split())
+            if value:
+                return value
+        return None
+
+
+@dataclass(frozen=True)
+class CompiledSelectors:
+    """A company's selector spec, ready to apply to any number of pages."""
+    item: FieldSelector
+    fields: Dict[str, FieldSelector]
+    next_page: Optional[FieldSelector]
+    description: Optional[str]
+    max_pages: int
+    render: bool
+    scroll: int
+
+
+def _compile(selector: str, default_attribute: str = None) -> FieldSelector:
+    selector = selector.strip()
+    attribute = default_attribute
+    expression = selector
+
+    match = _ATTRIBUTE_SUFFIX.match(selector)
+    if match and not selector.startswith('xpath:'):
+        expression, attribute = match.groups()
+
+    try:
+        if expression.startswith('xpath:'):
+            xpath = etree.XPath(expression[len('xpath:'):])
+        else:
+            xpath = CSSSelector(expression.strip())
+    except Exception as e:
+        raise ConfigurationException(f"Invalid selector '{selector}': {e}")
+
+    return FieldSelector(selector, xpath, attribute)
+
+
+def _as_int(value: Any, default: int) -> int:
+    return default if value in (None, '') else int(value)
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def compile_selectors(spec: Dict[str, Any]) -> CompiledSelectors:
+    """Compile a custom_selectors spec, reusing the result for identical specs."""
+    key = json.dumps(spec, sort_keys=True, default=str)
+    compiled = _compiled_cache.get(key)
+    if compiled is not None:
+        return compiled
+
+    if not spec.get('item') or not spec.get('title'):
+        raise ConfigurationException("custom_selectors needs at least 'item' and 'title' selectors")
+
+    try:
+        compiled = CompiledSelectors(
+            item=_compile(spec['item']),
+            fields={
+                name: _compile(spec[name], 'href' if name == 'link' else None)
+                for name in FIELD_KEYS if spec.get(name)
+            },
+            next_page=_compile(spec['next'], 'href') if spec.get('next') else None,
+            description=spec.get('description') or None,
+            max_pages=max(1, _as_int(spec.get('max_pages'), DEFAULT_MAX_PAGES)),
+            render=_as_bool(spec.get('render', False)),
+            scroll=max(0, _as_int(spec.get('scroll'), 0))
+        )
+    except (TypeError, ValueError) as e:
+        raise ConfigurationException(f"Invalid custom_selectors value: {e}")
+
+    _compiled_cache[key] = compiled
+    logger.debug(f"Compiled custom selectors for item '{spec['item']}'")
+    return compiled
+
+
+def extract_items(selectors: CompiledSelectors, content: str, page_url: str) -> Tuple[List[dict], Optional[str]]:
+    """
+    Apply compiled selectors to one page.
+
+    Returns the extracted items (title, url, location) and the absolute URL of
+    the next page, if the spec has a "next" selector and the page links one.
+    """
+    if not content or not content.strip():
+        return [], None
+
+    try:
+        document = lxml_html.fromstring(content)
+    except (etree.ParserError, ValueError) as e:
+        logger.warning(f"Could not parse {page_url}: {e}")
+        return [], None
+
+    items = []
+    for element in selectors.item.xpath(document):
+        if not isinstance(element, etree._Element):
+            continue
+
+        title = selectors.fields['title'].first(element)
+        if not title:
+            continue
+
+        link_selector = selectors.fields.get('link')
+        link = link_selector.first(element) if link_selector else element.get('href')
+        location_selector = selectors.fields.get('location')
+
+        items.append({
+            'title': title,
+            'url': urljoin(page_url, link) if link else page_url,
+            'location': (location_selector.first(element) if location_selector else None) or 'N/A'
+        })
+
+    next_url = None
+    if selectors.next_page:
+        href = selectors.next_page.first(document)
+        if href:
+            next_url = urljoin(page_url, href)
+
+    return items, next_url
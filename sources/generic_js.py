@@ -1,92 +1,202 @@
 import asyncio
-import json
-from urllib.parse import urljoin
-from .common import create_job_hash, extract_company_from_url
-from utils.logging import get_logger
+import re
+from . import ashby, smartrecruiters
+from .common import fetch_url_async, make_listing, enrich_listings, extract_company_from_url
+from .extraction import CompiledSelectors, compile_selectors, extract_items
+from .structured_data import extract_job_postings
+from utils.errors import ScrapingException
+from utils.fetcher import adaptive_fetcher
 from utils.scraping import web_scraper
+from utils.logging import get_logger
+from utils.browser import browser_pool
 
 logger = get_logger("sources.generic_js")
 
+# list_jobs() accepts a company's custom_selectors as custom_config
+SUPPORTS_CUSTOM_SELECTORS = True
+
+# Hosted boards whose listings come from the platform's JSON API instead of the DOM
+PLATFORM_BOARD_PATTERNS = {
+    'ashby': re.compile(r'jobs\.ashbyhq\.com/([\w.-]+)'),
+    'smartrecruiters': re.compile(r'(?:jobs|careers)\.smartrecruiters\.com/([\w.-]+)'),
+}
+
+PLATFORM_SOURCES = {'ashby': ashby, 'smartrecruiters': smartrecruiters}
+
+
+def detect_platform(text: str):
+    """Returns (platform, board_url) for the first hosted board referenced in text, or None."""
+    for platform, pattern in PLATFORM_BOARD_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            return platform, f"https://{match.group(0)}"
+    return None
+
+
 async def scrape_js_career_page(board_url: str, fetch_descriptions: bool = True, custom_config: dict = None):
     """
     Scrape JavaScript-rendered career pages with intelligent job extraction
     and auto-detection of platforms like Ashby and SmartRecruiters.
+
+    Configured custom selectors are tried first. Hosted Ashby/SmartRecruiters
+    boards are listed from their JSON APIs. Other pages are fetched over plain
+    HTTP first and only rendered in the browser when that response carries
+    neither a known platform nor structured data.
     """
     logger.info(f"Starting generic JS scrape for {board_url}")
     company_name = extract_company_from_url(board_url)
-    
-    async with web_scraper as scraper:
-        # --- Platform Auto-Detection ---
-        page_content = await scraper.fetch_with_playwright(board_url)
-
-        if "ashbyhq.com" in page_content or "jobs.ashbyhq.com" in board_url:
-            logger.info(f"Detected AshbyHQ platform for {company_name}")
-            return await _scrape_ashby(page_content, board_url, company_name)
-        
-        if "smartrecruiters.com" in page_content or "smartrecruiters.com" in board_url:
-            logger.info(f"Detected SmartRecruiters platform for {company_name}")
-            return await _scrape_smartrecruiters(page_content, board_url, company_name)
-        
-        # Fallback to original generic scraping
-        logger.info("No specific platform detected, using default DOM extraction.")
-        return await _try_dom_extraction(scraper, board_url, {}, company_name, initial_content=page_content)
-
-async def _scrape_ashby(page_content, board_url, company_name):
-    """Scraper tailored for Ashby boards."""
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(page_content, 'html.parser')
-    jobs = []
-    
-    for job_div in soup.select('div[class*="_jobPosting_"]'):
-        title_tag = job_div.select_one('h3')
-        location_tag = job_div.select_one('p')
-        link_tag = job_div.find('a', href=True)
-        
-        if title_tag and location_tag and link_tag:
-            title = title_tag.get_text(strip=True)
-            location = location_tag.get_text(strip=True)
-            url = urljoin(board_url, link_tag['href'])
-            description_stub = f"{title} {location}"
-            job_hash = create_job_hash(company_name, title, description_stub)
-            
-            jobs.append({
-                'hash': job_hash, 'title': title, 'url': url,
-                'company': company_name, 'location': location,
-                'description': ''
-            })
-    return jobs
 
-async def _scrape_smartrecruiters(page_content, board_url, company_name):
-    """Scraper tailored for SmartRecruiters boards."""
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(page_content, 'html.parser')
-    jobs = []
+    # --- Configured selectors ---
+    if custom_config:
+        listings = await _scrape_with_selectors(board_url, company_name, compile_selectors(custom_config))
+        if listings:
+            return listings
+        logger.warning(f"Custom selectors matched no jobs on {board_url}, falling back to auto-detection")
 
-    for job_item in soup.select('li.jobs-item'):
-        title_tag = job_item.select_one('h4.details-title')
-        link_tag = job_item.find('a', href=True)
-        
-        if title_tag and link_tag:
-            title = title_tag.get_text(strip=True)
-            url = link_tag['href']
-            # Location is often not easily available on the list page
-            location = "See Description"
-            description_stub = f"{title} {location}"
-            job_hash = create_job_hash(company_name, title, description_stub)
-
-            jobs.append({
-                'hash': job_hash, 'title': title, 'url': url,
-                'company': company_name, 'location': location,
-                'description': ''
-            })
-    return jobs
+    # --- Platform Auto-Detection ---
+    detected = detect_platform(board_url)
+    page_content = None
+    if not detected:
+        page_content = await _fetch_static_page(board_url)
+        detected = detect_platform(page_content)
+
+        # --- Structured data fast path ---
+        if not detected:
+            listings = _listings_from_structured_data(page_content, board_url, company_name)
+            if listings:
+                logger.info(f"Found {len(listings)} JobPostings for {company_name} without rendering")
+                return listings
+
+            page_content = await browser_pool.fetch_async(board_url)
+            detected = detect_platform(page_content)
+
+    if detected:
+        platform, platform_url = detected
+        logger.info(f"Detected {platform} board {platform_url} for {company_name}")
+        return await asyncio.to_thread(PLATFORM_SOURCES[platform].list_jobs, platform_url)
+
+    # Fallback to generic scraping of the rendered page
+    logger.info("No specific platform detected, using default DOM extraction.")
+    return await _try_dom_extraction(browser_pool, board_url, {}, company_name, initial_content=page_content)
+
+async def _fetch_static_page(board_url: str) -> str:
+    """Fetches a page's HTML without rendering; returns '' if that fails."""
+    try:
+        data = await fetch_url_async(board_url)
+    except ScrapingException as e:
+        logger.debug(f"Plain HTTP fetch failed for {board_url}, will render: {e}")
+        return ''
+    return data.get('content', '') if isinstance(data, dict) else ''
+
+async def _fetch_listing_page(url: str, selectors: CompiledSelectors) -> str:
+    return await asyncio.to_thread(
+        adaptive_fetcher.fetch, url, selectors.item.source,
+        force_render=selectors.render, scrolls=selectors.scroll
+    )
+
+async def _scrape_with_selectors(board_url: str, company_name: str, selectors: CompiledSelectors) -> list[dict]:
+    """
+    Extracts listings with a company's compiled selectors, following "next"
+    links for up to max_pages pages. Pages are fetched over plain HTTP unless
+    the spec asks for rendering or scrolling, or the items only appear once
+    the page is rendered.
+    """
+    listings = []
+    seen = set()
+    visited = set()
+    page_url = board_url
+
+    for _ in range(selectors.max_pages):
+        visited.add(page_url)
+        items, next_url = extract_items(selectors, await _fetch_listing_page(page_url, selectors), page_url)
+
+        for item in items:
+            key = (item['url'], item['title'])
+            if key in seen:
+                continue
+            seen.add(key)
+            listing = make_listing(company_name, item['url'], item['title'], item['url'], item['location'])
+            if selectors.description:
+                listing['description_selector'] = selectors.description
+            listings.append(listing)
+
+        if not next_url or next_url in visited:
+            break
+        page_url = next_url
+
+    logger.info(f"Custom selectors found {len(listings)} jobs for {company_name} on {len(visited)} pages")
+    return listings
+
+def _listings_from_structured_data(content: str, board_url: str, company_name: str) -> list[dict]:
+    """Builds listings from the schema.org JobPostings embedded in a page."""
+    listings = []
+    for posting in extract_job_postings(content, board_url):
+        description = posting['description']
+        # Surface the structured salary where the rules engine looks for one
+        if posting['salary'] and posting['salary'] not in description:
+            description = f"{description}\nSalary: {posting['salary']}".strip()
+
+        listing = make_listing(
+            company=company_name,
+            listing_id=posting['identifier'] or posting['url'],
+            title=posting['title'],
+            url=posting['url'],
+            location=posting['location'],
+            description=description,
+            version=posting['date_posted'],
+            description_complete=True
+        )
+        if posting['date_posted']:
+            listing['posted_at'] = posting['date_posted']
+        if posting['salary']:
+            listing['salary'] = posting['salary']
+        if posting['base_salary']:
+            listing['base_salary'] = posting['base_salary']
+        listings.append(listing)
+    return listings
 
 async def _try_dom_extraction(scraper, board_url, config, company_name, initial_content=None):
-    """Original DOM extraction logic as a fallback."""
-    # (Your original _try_dom_extraction logic can be placed here)
-    logger.warning(f"DOM extraction for {board_url} is not fully implemented in this update.")
-    return []
+    """Extracts listings from a rendered page; structured data is the only source for now."""
+    if initial_content is None:
+        initial_content = await scraper.fetch_async(board_url)
+
+    listings = _listings_from_structured_data(initial_content, board_url, company_name)
+    if not listings:
+        logger.warning(f"No structured job postings found on rendered page {board_url}")
+    return listings
+
+def list_jobs(board_url: str, custom_config: dict = None) -> list[dict]:
+    """Lists jobs on a generic career page."""
+    return asyncio.run(_scrape_and_close(board_url, custom_config))
+
+async def _scrape_and_close(board_url: str, custom_config: dict = None) -> list[dict]:
+    # Each asyncio.run() gets its own loop, and with it its own HTTP client to close
+    try:
+        return await scrape_js_career_page(board_url, False, custom_config)
+    finally:
+        await web_scraper.aclose()
+
+def enrich_jobs(listings: list[dict], fetch_descriptions: bool = True) -> list[dict]:
+    """
+    Enriches listings that came from a detected platform through that platform's
+    source; listings extracted from the page itself are enriched generically.
+    """
+    by_selector = {}
+    by_platform = {}
+    for listing in listings:
+        detected = detect_platform(listing['url'])
+        if detected:
+            by_platform.setdefault(detected[0], []).append(listing)
+        else:
+            by_selector.setdefault(listing.get('description_selector'), []).append(listing)
+
+    jobs = []
+    for selector, page_listings in by_selector.items():
+        jobs.extend(enrich_listings(page_listings, fetch_descriptions, selector))
+    for platform, platform_listings in by_platform.items():
+        jobs.extend(PLATFORM_SOURCES[platform].enrich_jobs(platform_listings, fetch_descriptions))
+    return jobs
 
 # Synchronous wrapper
 def scrape(board_url: str, fetch_descriptions: bool = True, custom_config: dict = None):
-    return asyncio.run(scrape_js_career_page(board_url, fetch_descriptions, custom_config))
\ No newline at end of file
+    return enrich_jobs(list_jobs(board_url, custom_config), fetch_descriptions)
\ No newline at end of file
@@ -1,18 +1,71 @@
-import asyncio
-from .common import fetch_url, create_job_hash, fetch_job_description, extract_company_from_url
+import html
+from .common import fetch_url, make_listing, enrich_listings, extract_company_from_url, html_to_text
+from utils.errors import NotModifiedException
 from utils.logging import get_logger
 
 logger = get_logger("sources.greenhouse")
 
-def scrape(board_url: str, fetch_descriptions: bool = True):
-    """Scrapes jobs from a Greenhouse board with a JSON endpoint."""
+DESCRIPTION_SELECTOR = '.content'
+
+# Public boards API; content=true inlines each posting's full description
+BOARDS_API_URL = "https://boards-api.greenhouse.io/v1/boards/{board_token}/jobs?content=true"
+# Host the listing requests go to; its adaptive limits size our concurrency
+API_DOMAIN = "boards-api.greenhouse.io"
+
+
+def list_jobs(board_url: str) -> list[dict]:
+    """
+    Lists jobs on a Greenhouse board.
+
+    The boards API returns every posting with its full content, stable id and
+    updated_at in one request, so no posting page has to be rendered. The
+    board's '?for=json' endpoint (descriptions fetched later) is the fallback.
+    """
     logger.info(f"Starting Greenhouse scrape for {board_url}")
 
+    company_name = extract_company_from_url(board_url)
+
+    try:
+        data = fetch_url(BOARDS_API_URL.format(board_token=company_name), conditional=True)
+        if not isinstance(data, dict) or not isinstance(data.get('jobs'), list):
+            raise ValueError("response has no 'jobs' list")
+    except NotModifiedException:
+        raise
+    except Exception as e:
+        logger.warning(f"Greenhouse boards API unavailable for {company_name}, using board JSON: {e}")
+        return _list_jobs_from_board(board_url, company_name)
+
+    jobs_data = data['jobs']
+    logger.info(f"Found {len(jobs_data)} jobs for {company_name} via boards API")
+
+    listings = []
+    for job in jobs_data:
+        job_url = job.get('absolute_url', '#')
+        # Content is HTML with entities escaped once more by the API
+        content = job.get('content') or ''
+        description = html_to_text(html.unescape(content)) if content else ''
+
+        listings.append(make_listing(
+            company=company_name,
+            listing_id=str(job.get('id') or job_url),
+            title=job.get('title', 'N/A'),
+            url=job_url,
+            location=(job.get('location') or {}).get('name', 'N/A'),
+            description=description,
+            version=job.get('updated_at', ''),
+            description_complete=True
+        ))
+
+    return listings
+
+
+def _list_jobs_from_board(board_url: str, company_name: str) -> list[dict]:
+    """Lists jobs from the board's '?for=json' endpoint, without descriptions."""
     # Greenhouse boards often have a '?for=json' API endpoint
     api_url = f"{board_url}?for=json"
 
     try:
-        data = fetch_url(api_url)
+        data = fetch_url(api_url, conditional=True)
 
         # Handle both direct JSON response and wrapped response
         if isinstance(data, dict) and 'jobs' in data:
@@ -20,44 +73,39 @@ def scrape(board_url: str, fetch_descriptions: bool = True):
         else:
             jobs_data = data
 
-        scraped_jobs = []
-        company_name = extract_company_from_url(board_url)
+        listings = []
 
         logger.info(f"Found {len(jobs_data)} jobs for {company_name}")
 
         for job in jobs_data:
-            job_title = job.get('title', 'N/A')
             job_url = job.get('absolute_url', '#')
-            job_location = job.get('location', {}).get('name', 'N/A')
-
-            # Initial description from API (usually limited)
-            job_description = job.get('content', '')
-
-            # Fetch full description if requested and URL is available
-            if fetch_descriptions and job_url and job_url != '#':
-                try:
-                    full_description = asyncio.run(
-                        fetch_job_description(job_url, '.content')
-                    )
-                    if full_description:
-                        job_description = full_description
-                except Exception as e:
-                    logger.warning(f"Failed to fetch description for {job_title}: {e}")
-
-            job_hash = create_job_hash(company_name, job_title, job_description[:250])
-
-            scraped_jobs.append({
-                'hash': job_hash,
-                'title': job_title,
-                'url': job_url,
-                'company': company_name,
-                'location': job_location,
-                'description': job_description
-            })
-
-        logger.info(f"Successfully scraped {len(scraped_jobs)} jobs from {company_name}")
-        return scraped_jobs
+            listings.append(make_listing(
+                company=company_name,
+                listing_id=str(job.get('id') or job_url),
+                title=job.get('title', 'N/A'),
+                url=job_url,
+                location=job.get('location', {}).get('name', 'N/A'),
+                # Initial description from API (usually limited)
+                description=job.get('content', ''),
+                version=job.get('updated_at', '')
+            ))
+
+        return listings
 
+    except NotModifiedException:
+        raise
     except Exception as e:
         logger.error(f"Failed to scrape Greenhouse board {board_url}: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def enrich_jobs(listings: list[dict], fetch_descriptions: bool = True) -> list[dict]:
+    """Fetches full descriptions for Greenhouse listings that lack one and hashes them."""
+    return enrich_listings(listings, fetch_descriptions, DESCRIPTION_SELECTOR)
+
+
+def scrape(board_url: str, fetch_descriptions: bool = True):
+    """Scrapes jobs from a Greenhouse board with a JSON endpoint."""
+    scraped_jobs = enrich_jobs(list_jobs(board_url), fetch_descriptions)
+    logger.info(f"Successfully scraped {len(scraped_jobs)} jobs from {extract_company_from_url(board_url)}")
+    return scraped_jobs
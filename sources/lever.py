@@ -1,70 +1,126 @@
-import asyncio
-from .common import fetch_url, create_job_hash, fetch_job_description, extract_company_from_url
+from datetime import datetime, timezone
+from typing import Iterator
+
+from .common import fetch_url, make_listing, enrich_listings, extract_company_from_url, html_to_text
+from utils.errors import NotModifiedException
+from utils.http_cache import http_validators
 from utils.logging import get_logger
 
 logger = get_logger("sources.lever")
 
+DESCRIPTION_SELECTOR = '.posting-content'
 
-def scrape(board_url: str, fetch_descriptions: bool = True):
-    """Scrapes jobs from a Lever board using their API endpoint."""
-    logger.info(f"Starting Lever scrape for {board_url}")
+POSTINGS_API_URL = "https://api.lever.co/v0/postings/{company}?mode=json&skip={skip}&limit={limit}"
+# Host the listing requests go to; its adaptive limits size our concurrency
+API_DOMAIN = "api.lever.co"
+PAGE_SIZE = 100
 
-    # Lever boards typically use format: https://jobs.lever.co/company
-    # API endpoint: https://api.lever.co/v0/postings/company
-    company_name = extract_company_from_url(board_url)
-    api_url = f"https://api.lever.co/v0/postings/{company_name}"
 
-    try:
-        data = fetch_url(api_url)
+def iter_postings(company: str, page_size: int = PAGE_SIZE) -> Iterator[dict]:
+    """
+    Streams a company's postings from the Lever API one page at a time,
+    using skip/limit so very large boards never sit in memory at once.
+    """
+    skip = 0
+    while True:
+        url = POSTINGS_API_URL.format(company=company, skip=skip, limit=page_size)
+        # A board that fits on one page is skipped entirely while it is unchanged
+        data = fetch_url(url, conditional=(skip == 0))
 
         # Lever API returns list of jobs directly
         if isinstance(data, list):
-            jobs_data = data
+            page = data
         else:
-            jobs_data = data.get('data', [])
+            page = data.get('data', [])
+
+        if skip == 0 and len(page) >= page_size:
+            # Later pages can change while the first stays the same
+            http_validators.discard(url)
+
+        yield from page
+
+        if len(page) < page_size:
+            return
+        skip += page_size
+
+
+def build_description(posting: dict) -> str:
+    """Assembles a plain-text description from a Lever posting payload."""
+    parts = []
+
+    if posting.get('descriptionPlain'):
+        parts.append(posting['descriptionPlain'].strip())
+    elif posting.get('description'):
+        parts.append(html_to_text(posting['description'], "\n"))
+
+    # Requirements, responsibilities etc. come as titled HTML lists
+    for section in posting.get('lists') or []:
+        heading = (section.get('text') or '').strip()
+        body = html_to_text(section.get('content') or '', "\n")
+        if heading or body:
+            parts.append(f"{heading}\n{body}".strip())
+
+    if posting.get('additionalPlain'):
+        parts.append(posting['additionalPlain'].strip())
+    elif posting.get('additional'):
+        parts.append(html_to_text(posting['additional'], "\n"))
 
-        scraped_jobs = []
-        logger.info(f"Found {len(jobs_data)} jobs for {company_name}")
+    return '\n'.join(part for part in parts if part)[:5000]
 
-        for job in jobs_data:
-            job_title = job.get('text', 'N/A')
+
+def list_jobs(board_url: str) -> list[dict]:
+    """Lists jobs on a Lever board from the postings API, including descriptions."""
+    logger.info(f"Starting Lever scrape for {board_url}")
+
+    # Lever boards typically use format: https://jobs.lever.co/company
+    # API endpoint: https://api.lever.co/v0/postings/company
+    company_name = extract_company_from_url(board_url)
+
+    try:
+        listings = []
+
+        for job in iter_postings(company_name):
             job_url = job.get('hostedUrl', '#')
 
             # Location can be in different formats
-            location_obj = job.get('categories', {}).get('location')
+            location_obj = (job.get('categories') or {}).get('location')
             if location_obj:
                 job_location = location_obj if isinstance(location_obj, str) else location_obj.get('text', 'N/A')
             else:
                 job_location = 'N/A'
 
-            # Initial description from API
-            job_description = job.get('description', '')
-
-            # Fetch full description if requested
-            if fetch_descriptions and job_url and job_url != '#':
-                try:
-                    full_description = asyncio.run(
-                        fetch_job_description(job_url, '.posting-content')
-                    )
-                    if full_description:
-                        job_description = full_description
-                except Exception as e:
-                    logger.warning(f"Failed to fetch description for {job_title}: {e}")
-
-            job_hash = create_job_hash(company_name, job_title, job_description[:250])
-
-            scraped_jobs.append({
-                'hash': job_hash,
-                'title': job_title,
-                'url': job_url,
-                'company': company_name,
-                'location': job_location,
-                'description': job_description
-            })
-
-        logger.info(f"Successfully scraped {len(scraped_jobs)} jobs from {company_name}")
-        return scraped_jobs
+            listing = make_listing(
+                company=company_name,
+                listing_id=str(job.get('id') or job_url),
+                title=job.get('text', 'N/A'),
+                url=job_url,
+                location=job_location,
+                description=build_description(job),
+                version=str(job.get('updatedAt') or job.get('createdAt') or ''),
+                # Only postings the API returned without content are rendered
+                description_complete=True
+            )
+            if job.get('createdAt'):
+                listing['posted_at'] = datetime.fromtimestamp(job['createdAt'] / 1000, timezone.utc).isoformat()
+            listings.append(listing)
+
+        logger.info(f"Found {len(listings)} jobs for {company_name}")
+        return listings
 
+    except NotModifiedException:
+        raise
     except Exception as e:
         logger.error(f"Failed to scrape Lever board {board_url}: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def enrich_jobs(listings: list[dict], fetch_descriptions: bool = True) -> list[dict]:
+    """Fetches descriptions for Lever listings the API returned without content, and hashes them."""
+    return enrich_listings(listings, fetch_descriptions, DESCRIPTION_SELECTOR)
+
+
+def scrape(board_url: str, fetch_descriptions: bool = True):
+    """Scrapes jobs from a Lever board using their API endpoint."""
+    scraped_jobs = enrich_jobs(list_jobs(board_url), fetch_descriptions)
+    logger.info(f"Successfully scraped {len(scraped_jobs)} jobs from {extract_company_from_url(board_url)}")
+    return scraped_jobs
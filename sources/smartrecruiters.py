@@ -0,0 +1,130 @@
+from typing import Iterator
+
+from .common import fetch_url, make_listing, enrich_listings, extract_company_from_url, html_to_text
+from utils.errors import NotModifiedException
+from utils.http_cache import http_validators
+from utils.logging import get_logger
+
+logger = get_logger("sources.smartrecruiters")
+
+DESCRIPTION_SELECTOR = '.job-sections'
+
+POSTINGS_API_URL = "https://api.smartrecruiters.com/v1/companies/{company}/postings?offset={offset}&limit={limit}"
+POSTING_API_URL = "https://api.smartrecruiters.com/v1/companies/{company}/postings/{posting_id}"
+# Host the listing requests go to; its adaptive limits size our concurrency
+API_DOMAIN = "api.smartrecruiters.com"
+PAGE_SIZE = 100
+
+# Job ad sections, in the order they appear on the posting page
+JOB_AD_SECTIONS = ['jobDescription', 'qualifications', 'additionalInformation']
+
+
+def iter_postings(company: str, page_size: int = PAGE_SIZE) -> Iterator[dict]:
+    """Streams a company's postings from the SmartRecruiters API using offset paging."""
+    offset = 0
+    while True:
+        url = POSTINGS_API_URL.format(company=company, offset=offset, limit=page_size)
+        # A board that fits on one page is skipped entirely while it is unchanged
+        data = fetch_url(url, conditional=(offset == 0))
+        page = data.get('content') or []
+
+        if offset == 0 and data.get('totalFound', 0) > len(page):
+            # Later pages can change while the first stays the same
+            http_validators.discard(url)
+
+        yield from page
+
+        offset += len(page)
+        if len(page) < page_size or offset >= data.get('totalFound', 0):
+            return
+
+
+def build_location(posting: dict) -> str:
+    """Formats a SmartRecruiters location object."""
+    location = posting.get('location') or {}
+    if location.get('fullLocation'):
+        text = location['fullLocation']
+    else:
+        text = ', '.join(part for part in (location.get('city'), location.get('region'), location.get('country')) if part)
+    if location.get('remote') and 'remote' not in text.lower():
+        text = f"{text} (Remote)" if text else 'Remote'
+    return text or 'N/A'
+
+
+def build_description(posting: dict) -> str:
+    """Assembles a plain-text description from a posting's job ad sections."""
+    sections = (posting.get('jobAd') or {}).get('sections') or {}
+    parts = []
+    for key in JOB_AD_SECTIONS:
+        section = sections.get(key) or {}
+        body = html_to_text(section.get('text') or '', "\n")
+        if body:
+            parts.append(f"{(section.get('title') or '').strip()}\n{body}".strip())
+    return '\n'.join(parts)[:5000]
+
+
+def list_jobs(board_url: str) -> list[dict]:
+    """Lists jobs on a SmartRecruiters board from the postings API, without descriptions."""
+    logger.info(f"Starting SmartRecruiters scrape for {board_url}")
+
+    # SmartRecruiters boards use format: https://jobs.smartrecruiters.com/company
+    company_name = extract_company_from_url(board_url)
+
+    try:
+        listings = []
+
+        for job in iter_postings(company_name):
+            posting_id = str(job.get('id', ''))
+            listing = make_listing(
+                company=company_name,
+                listing_id=posting_id,
+                title=job.get('name', 'N/A'),
+                url=f"https://jobs.smartrecruiters.com/{company_name}/{posting_id}",
+                location=build_location(job),
+                version=job.get('releasedDate', '')
+            )
+            listing['posting_id'] = posting_id
+            listings.append(listing)
+
+        logger.info(f"Found {len(listings)} jobs for {company_name}")
+        return listings
+
+    except NotModifiedException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to scrape SmartRecruiters board {board_url}: {e}")
+        raise
+
+
+def enrich_jobs(listings: list[dict], fetch_descriptions: bool = True) -> list[dict]:
+    """
+    Fetches full descriptions for SmartRecruiters listings and hashes them.
+
+    The list endpoint carries no job ad, so each posting's JSON is fetched;
+    postings whose JSON cannot be fetched are rendered in the browser.
+    """
+    if fetch_descriptions:
+        for listing in listings:
+            if listing.get('description_complete') or not listing.get('posting_id'):
+                continue
+            try:
+                posting = fetch_url(POSTING_API_URL.format(company=listing['company'], posting_id=listing['posting_id']))
+            except Exception as e:
+                logger.warning(f"Failed to fetch SmartRecruiters posting {listing['url']}: {e}")
+                continue
+
+            description = build_description(posting)
+            if description:
+                listing['description'] = description
+                listing['description_complete'] = True
+            if posting.get('postingUrl'):
+                listing['url'] = posting['postingUrl']
+
+    return enrich_listings(listings, fetch_descriptions, DESCRIPTION_SELECTOR)
+
+
+def scrape(board_url: str, fetch_descriptions: bool = True):
+    """Scrapes jobs from a SmartRecruiters board using their postings API."""
+    scraped_jobs = enrich_jobs(list_jobs(board_url), fetch_descriptions)
+    logger.info(f"Successfully scraped {len(scraped_jobs)} jobs from {extract_company_from_url(board_url)}")
+    return scraped_jobs
@@ -0,0 +1,198 @@
+"""
+Schema.org JobPosting extraction from career pages.
+
+Most applicant tracking systems embed each posting as JSON-LD (for search
+engine job listings) or, less often, as microdata. Both are read from the raw
+HTML, so a plain HTTP response is usually enough and no browser is needed.
+"""
+
+import html
+import json
+from typing import Iterator
+from urllib.parse import urljoin
+
+from .common import html_to_text
+from utils.logging import get_logger
+
+logger = get_logger("sources.structured_data")
+
+JOB_POSTING_TYPE = 'JobPosting'
+
+
+def extract_job_postings(content: str, page_url: str) -> list[dict]:
+    """
+    Returns the JobPostings embedded in an HTML page, JSON-LD first, then microdata.
+
+    Each posting is normalized to a dict with title, url, identifier, location,
+    date_posted, salary and a plain-text description.
+    """
+    if not content or ('JobPosting' not in content):
+        return []
+
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
+
+    raw_postings = list(_iter_json_ld(soup)) or list(_iter_microdata(soup))
+    postings = []
+    seen = set()
+    for raw in raw_postings:
+        posting = _normalize_posting(raw, page_url)
+        key = (posting['url'], posting['identifier'], posting['title'])
+        if posting['title'] and key not in seen:
+            seen.add(key)
+            postings.append(posting)
+
+    logger.debug(f"Found {len(postings)} structured job postings on {page_url}")
+    return postings
+
+
+def _is_job_posting(node: dict) -> bool:
+    node_type = node.get('@type')
+    types = node_type if isinstance(node_type, list) else [node_type]
+    return any(isinstance(t, str) and t.split('/')[-1] == JOB_POSTING_TYPE for t in types)
+
+
+def _walk(node) -> Iterator[dict]:
+    """Yields every JobPosting in a JSON-LD document, including @graph and list nesting."""
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+    elif isinstance(node, dict):
+        if _is_job_posting(node):
+            yield node
+            return
+        for key in ('@graph', 'itemListElement', 'item', 'mainEntity'):
+            if key in node:
+                yield from _walk(node[key])
+
+
+def _iter_json_ld(soup) -> Iterator[dict]:
+    for script in soup.find_all('script', type='application/ld+json'):
+        text = script.string or script.get_text()
+        if not text or not text.strip():
+            continue
+        try:
+            # strict=False tolerates raw newlines inside description strings
+            data = json.loads(text, strict=False)
+        except ValueError as e:
+            logger.debug(f"Skipping malformed JSON-LD block: {e}")
+            continue
+        yield from _walk(data)
+
+
+def _iter_microdata(soup) -> Iterator[dict]:
+    for item in soup.find_all(attrs={'itemscope': True, 'itemtype': True}):
+        if item['itemtype'].rstrip('/').split('/')[-1] == JOB_POSTING_TYPE:
+            yield _read_microdata_item(item)
+
+
+def _read_microdata_item(item) -> dict:
+    """Reads an itemscope element's own properties; nested items become dicts."""
+    properties = {}
+    for element in item.find_all(attrs={'itemprop': True}):
+        # Skip properties that belong to a nested item
+        owner = element.find_parent(attrs={'itemscope': True})
+        if owner is not item:
+            continue
+
+        if element.has_attr('itemscope'):
+            value = _read_microdata_item(element)
+        elif element.has_attr('content'):
+            value = element['content']
+        elif element.name in ('a', 'link') and element.has_attr('href'):
+            value = element['href']
+        elif element.name == 'time' and element.has_attr('datetime'):
+            value = element['datetime']
+        elif element.name == 'meta':
+            value = element.get('content', '')
+        elif element['itemprop'] == 'description':
+            value = element.decode_contents()
+        else:
+            value = element.get_text(" ", strip=True)
+
+        for name in element['itemprop'].split():
+            properties.setdefault(name, value)
+    return properties
+
+
+def _text(value) -> str:
+    """Reduces a schema.org value (string, Thing or list of them) to text."""
+    if isinstance(value, list):
+        return ', '.join(filter(None, (_text(item) for item in value)))
+    if isinstance(value, dict):
+        return _text(value.get('name') or value.get('value') or value.get('@id') or '')
+    return str(value).strip() if value is not None else ''
+
+
+def _format_place(place) -> str:
+    if isinstance(place, list):
+        return ' / '.join(filter(None, (_format_place(item) for item in place)))
+    if not isinstance(place, dict):
+        return _text(place)
+
+    address = place.get('address', place)
+    if not isinstance(address, dict):
+        return _text(address)
+    parts = [_text(address.get(key)) for key in ('addressLocality', 'addressRegion', 'addressCountry')]
+    return ', '.join(part for part in parts if part) or _text(place.get('name'))
+
+
+def _format_salary(salary) -> str:
+    """Formats a MonetaryAmount such as {'currency': 'USD', 'value': {'minValue': ..., 'maxValue': ...}}."""
+    if not salary:
+        return ''
+    if not isinstance(salary, dict):
+        return _text(salary)
+
+    currency = _text(salary.get('currency'))
+    value = salary.get('value', salary)
+    unit = ''
+    if isinstance(value, dict):
+        unit = _text(value.get('unitText')).lower()
+        low, high = value.get('minValue'), value.get('maxValue')
+        amount = value.get('value')
+    else:
+        low = high = None
+        amount = value
+
+    def number(raw):
+        try:
+            return f"{float(raw):,.0f}"
+        except (TypeError, ValueError):
+            return _text(raw)
+
+    if low is not None and high is not None:
+        text = f"{number(low)} - {number(high)}"
+    else:
+        text = number(amount if amount is not None else low if low is not None else high)
+    if not text:
+        return ''
+    return ' '.join(part for part in (currency, text, f"per {unit}" if unit else '') if part)
+
+
+def _normalize_posting(raw: dict, page_url: str) -> dict:
+    location = _format_place(raw.get('jobLocation'))
+    if _text(raw.get('jobLocationType')).upper() == 'TELECOMMUTE':
+        location = f"{location} (Remote)" if location else 'Remote'
+
+    description = raw.get('description') or ''
+    if description:
+        # Some boards entity-escape the HTML inside the JSON string
+        if '&lt;' in description:
+            description = html.unescape(description)
+        description = html_to_text(description, "\n")
+
+    identifier = raw.get('identifier')
+    if isinstance(identifier, dict):
+        identifier = identifier.get('value') or identifier.get('name')
+
+    return {
+        'title': _text(raw.get('title') or raw.get('name')),
+        'url': urljoin(page_url, _text(raw.get('url'))) if raw.get('url') else page_url,
+        'identifier': _text(identifier),
+        'location': location or 'N/A',
+        'date_posted': _text(raw.get('datePosted')),
+        'salary': _format_salary(raw.get('baseSalary')),
+        'base_salary': raw.get('baseSalary'),
+        'description': description
+    }
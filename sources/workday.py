@@ -1,24 +1,163 @@
-import asyncio
-from .common import fetch_url, create_job_hash, fetch_job_description, extract_company_from_url
+import re
+from typing import Callable, Iterable, Iterator, Optional
+from urllib.parse import urlparse
+
+from .common import fetch_url, make_listing, enrich_listings, extract_company_from_url, html_to_text
 from utils.logging import get_logger
 
 logger = get_logger("sources.workday")
 
-
-def scrape(board_url: str, fetch_descriptions: bool = True):
-    """Scrapes jobs from a Workday board."""
+DESCRIPTION_SELECTOR = '[data-automation-id="jobPostingDescription"]'
+
+# Candidate-experience (CXS) JSON API behind every myworkdayjobs.com career site
+CXS_JOBS_URL = "https://{host}/wday/cxs/{tenant}/{site}/jobs"
+CXS_POSTING_URL = "https://{host}/wday/cxs/{tenant}/{site}{path}"
+# Workday rejects search pages larger than 20
+PAGE_SIZE = 20
+
+# list_jobs() accepts a seen_lookup callback and stops paging at known postings
+SUPPORTS_SEEN_LOOKUP = True
+
+_LOCALE_SEGMENT = re.compile(r'^[a-z]{2}-[A-Z]{2}$')
+_POSTED_DAYS_AGO = re.compile(r'(\d+)\+?\s+days?\s+ago', re.IGNORECASE)
+
+
+def parse_board_url(board_url: str) -> Optional[tuple[str, str, str]]:
+    """
+    Splits a career site URL such as https://acme.wd5.myworkdayjobs.com/en-US/External
+    into (host, tenant, site), or returns None if it is not a myworkdayjobs.com site.
+    """
+    parsed = urlparse(board_url)
+    host = parsed.netloc.lower()
+    if not host.endswith('.myworkdayjobs.com'):
+        return None
+
+    segments = [segment for segment in parsed.path.split('/') if segment]
+    if segments and _LOCALE_SEGMENT.match(segments[0]):
+        segments = segments[1:]
+    if not segments:
+        return None
+
+    return host, host.split('.')[0], segments[0]
+
+
+def iter_postings(host: str, tenant: str, site: str) -> Iterator[list[dict]]:
+    """
+    Yields pages of postings from the CXS search endpoint using offset paging.
+
+    The CXS API takes no sort parameter; an unfiltered search comes back
+    newest posting first (the career site's default). list_jobs() checks
+    that order before relying on it.
+    """
+    url = CXS_JOBS_URL.format(host=host, tenant=tenant, site=site)
+    offset = 0
+    total = None
+
+    while True:
+        data = fetch_url(url, json_body={
+            "appliedFacets": {},
+            "limit": PAGE_SIZE,
+            "offset": offset,
+            "searchText": ""
+        })
+        page = data.get('jobPostings') or []
+        # Only the first page reliably carries the total
+        if total is None:
+            total = data.get('total') or 0
+
+        if page:
+            yield page
+
+        offset += len(page)
+        if len(page) < PAGE_SIZE or offset >= total:
+            return
+
+
+def list_jobs(board_url: str, seen_lookup: Callable[[list[str]], set] = None) -> list[dict]:
+    """
+    Lists jobs on a Workday career site from the CXS JSON API, without descriptions.
+
+    When seen_lookup is given (it maps listing hashes to the subset already
+    known), paging stops after the first page made up only of known postings:
+    results are newest first, so everything after it has been seen before.
+    If the postings' ages show the board is not in that order, every page is
+    listed. Boards that are not myworkdayjobs.com sites fall back to scraping
+    links from the board page.
+    """
     logger.info(f"Starting Workday scrape for {board_url}")
 
     company_name = extract_company_from_url(board_url)
+    site = parse_board_url(board_url)
+    if not site:
+        logger.warning(f"{board_url} is not a myworkdayjobs.com career site, scraping page links")
+        return _list_jobs_from_page(board_url, company_name)
+
+    host, tenant, site_name = site
+    listings = []
+    newest_age = 0
 
-    # Workday often uses GraphQL or specific API endpoints
-    # This is a generic approach that may need customization per company
+    try:
+        for page in iter_postings(host, tenant, site_name):
+            page_listings = [_make_listing(company_name, host, site_name, posting) for posting in page]
+            listings.extend(page_listings)
+
+            # Postings must keep getting older for the stop below to be safe
+            ages = [newest_age] + [age for age in map(_posted_days_ago, page) if age is not None]
+            if seen_lookup and ages != sorted(ages):
+                logger.info(f"{company_name} does not list newest postings first, listing every page")
+                seen_lookup = None
+            newest_age = ages[-1]
+
+            if seen_lookup:
+                hashes = [listing['listing_hash'] for listing in page_listings]
+                if len(seen_lookup(hashes)) == len(hashes):
+                    logger.info(f"Reached known postings for {company_name} after {len(listings)} jobs, stopping")
+                    break
 
+    except Exception as e:
+        logger.error(f"Failed to scrape Workday board {board_url}: {e}")
+        raise
+
+    logger.info(f"Found {len(listings)} jobs for {company_name} via CXS API")
+    return listings
+
+
+def _posted_days_ago(posting: dict) -> Optional[int]:
+    """Age in days from a posting's postedOn text ("Posted Today", "Posted 30+ Days Ago"), if given."""
+    posted = (posting.get('postedOn') or '').lower()
+    if 'today' in posted:
+        return 0
+    if 'yesterday' in posted:
+        return 1
+    match = _POSTED_DAYS_AGO.search(posted)
+    return int(match.group(1)) if match else None
+
+
+def _make_listing(company_name: str, host: str, site: str, posting: dict) -> dict:
+    """Builds a listing from a CXS search result."""
+    path = posting.get('externalPath') or ''
+    job_url = f"https://{host}/{site}{path}" if path else '#'
+    # The requisition ID is the first bullet field on most tenants
+    bullets = posting.get('bulletFields') or []
+
+    listing = make_listing(
+        company=company_name,
+        listing_id=str(bullets[0] if bullets else path or job_url),
+        title=posting.get('title', 'N/A'),
+        url=job_url,
+        location=posting.get('locationsText') or 'N/A'
+    )
+    listing['cxs_path'] = path
+    return listing
+
+
+def _list_jobs_from_page(board_url: str, company_name: str) -> list[dict]:
+    """Lists jobs linked from a Workday board page, without descriptions."""
     try:
         # First, try to fetch the main page to look for job data
         page_data = fetch_url(board_url)
 
-        scraped_jobs = []
+        listings = []
 
         # Workday pages often contain JSON data embedded in script tags
         # or use specific API endpoints that vary by company
@@ -55,42 +194,60 @@ def scrape(board_url: str, fetch_descriptions: bool = True):
 
             logger.info(f"Found {len(job_data)} potential jobs for {company_name}")
 
-            # Process each job
             for job in job_data[:20]:  # Limit to 20 jobs to avoid overwhelming
-                job_title = job['title']
-                job_url = job['url']
-                job_location = job['location']
-
-                job_description = ""
-
-                # Fetch full description if requested
-                if fetch_descriptions and job_url:
-                    try:
-                        full_description = asyncio.run(
-                            fetch_job_description(job_url, '[data-automation-id="jobPostingDescription"]')
-                        )
-                        if full_description:
-                            job_description = full_description
-                    except Exception as e:
-                        logger.warning(f"Failed to fetch description for {job_title}: {e}")
-
-                job_hash = create_job_hash(company_name, job_title, job_description[:250])
-
-                scraped_jobs.append({
-                    'hash': job_hash,
-                    'title': job_title,
-                    'url': job_url,
-                    'company': company_name,
-                    'location': job_location,
-                    'description': job_description
-                })
+                listings.append(make_listing(
+                    company=company_name,
+                    listing_id=job['url'],
+                    title=job['title'],
+                    url=job['url'],
+                    location=job['location']
+                ))
 
         else:
             logger.warning(f"No recognizable job data found for Workday board: {board_url}")
 
-        logger.info(f"Successfully scraped {len(scraped_jobs)} jobs from {company_name}")
-        return scraped_jobs
+        return listings
 
     except Exception as e:
         logger.error(f"Failed to scrape Workday board {board_url}: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def enrich_jobs(listings: list[dict], fetch_descriptions: bool = True) -> list[dict]:
+    """
+    Fetches full descriptions for Workday listings and hashes them.
+
+    Descriptions come from the CXS posting endpoint; only postings it fails
+    for (and listings from the page fallback) are rendered in the browser.
+    """
+    if fetch_descriptions:
+        _fetch_posting_descriptions(listings)
+    return enrich_listings(listings, fetch_descriptions, DESCRIPTION_SELECTOR)
+
+
+def _fetch_posting_descriptions(listings: Iterable[dict]):
+    """Fills in descriptions from the CXS posting endpoint, in place."""
+    for listing in listings:
+        path = listing.get('cxs_path')
+        site = parse_board_url(listing['url'])
+        if not path or not site or listing.get('description_complete'):
+            continue
+
+        host, tenant, site_name = site
+        try:
+            data = fetch_url(CXS_POSTING_URL.format(host=host, tenant=tenant, site=site_name, path=path))
+            content = (data.get('jobPostingInfo') or {}).get('jobDescription') or ''
+        except Exception as e:
+            logger.warning(f"Failed to fetch Workday posting {listing['url']}: {e}")
+            continue
+
+        if content:
+            listing['description'] = html_to_text(content, "\n")
+            listing['description_complete'] = True
+
+
+def scrape(board_url: str, fetch_descriptions: bool = True):
+    """Scrapes jobs from a Workday board."""
+    scraped_jobs = enrich_jobs(list_jobs(board_url), fetch_descriptions)
+    logger.info(f"Successfully scraped {len(scraped_jobs)} jobs from {extract_company_from_url(board_url)}")
+    return scraped_jobs
@@ -0,0 +1,21 @@
+"""Shared pytest fixtures. Run the suite from the repository root: python -m pytest"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from sqlmodel import create_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """A fresh jobs database in a temporary directory, used by all database functions."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.sqlite'}", echo=False)
+    monkeypatch.setattr(database, "engine", engine)
+    database.init_db()
+    yield engine
+    engine.dispose()
@@ -0,0 +1,143 @@
+import pytest
+from sqlmodel import Session, select
+
+import database
+from database import Job
+
+
+def _job(job_hash, **fields):
+    job = {"hash": job_hash, "title": "Security Engineer", "url": f"https://example.com/{job_hash}",
+           "company": "acme", "location": "Remote", "description": "text", "score": 0.5}
+    job.update(fields)
+    return job
+
+
+def _stored(engine):
+    with Session(engine) as session:
+        return {job.hash: job for job in session.exec(select(Job)).all()}
+
+
+def test_upsert_inserts_new_jobs(temp_db):
+    ids = database.upsert_jobs([_job("a"), _job("b", score=0.9)])
+
+    stored = _stored(temp_db)
+    assert set(ids) == {"a", "b"}
+    assert {job_hash: job.id for job_hash, job in stored.items()} == ids
+    assert stored["b"].score == 0.9
+    assert all(job.times_seen == 1 for job in stored.values())
+
+
+def test_upsert_only_bumps_existing_jobs(temp_db):
+    first_ids = database.upsert_jobs([_job("a", score=0.5, title="Original")])
+    second_ids = database.upsert_jobs([_job("a", score=0.9, title="Changed"), _job("b")])
+
+    stored = _stored(temp_db)
+    assert second_ids["a"] == first_ids["a"]
+    assert stored["a"].times_seen == 2
+    # Existing rows keep their content; only the seen counters move
+    assert stored["a"].score == 0.5
+    assert stored["a"].title == "Original"
+    assert stored["b"].times_seen == 1
+
+
+def test_upsert_dedupes_hashes_within_a_batch(temp_db):
+    ids = database.upsert_jobs([_job("a", company="first"), _job("a", company="second"), _job("b")])
+
+    stored = _stored(temp_db)
+    assert len(stored) == 2
+    assert stored["a"].times_seen == 1
+    assert stored["a"].company == "first"
+    assert ids["a"] == stored["a"].id
+
+
+def test_upsert_spans_several_statements(temp_db, monkeypatch):
+    monkeypatch.setattr(database, "SQL_VARIABLE_LIMIT", 60)
+
+    ids = database.upsert_jobs([_job(f"job-{index}") for index in range(25)])
+
+    assert len(ids) == 25
+    assert len(_stored(temp_db)) == 25
+
+
+def _listing(listing_hash, **fields):
+    return _job(f"job-{listing_hash}", listing_hash=listing_hash, **fields)
+
+
+def test_rejected_listings_are_seen_only_under_the_same_prefs(temp_db):
+    database.record_seen_listings([
+        _listing("kept", score=0.8, prefs_version="v1"),
+        _listing("rejected", score=0.0, prefs_version="v1"),
+        _listing("known", score=None),
+    ])
+    hashes = ["kept", "rejected", "known", "new"]
+
+    assert database.get_seen_listing_hashes(hashes) == {"kept", "rejected", "known"}
+    assert database.get_seen_listing_hashes(hashes, prefs_version="v1") == {"kept", "rejected", "known"}
+    # New preferences: the rejected listing is scored again, stored jobs are left to rescore
+    assert database.get_seen_listing_hashes(hashes, prefs_version="v2") == {"kept", "known"}
+
+
+def test_rescoring_a_rejected_listing_updates_its_version(temp_db):
+    database.record_seen_listings([_listing("a", score=0.0, prefs_version="v1")])
+    database.record_seen_listings([_listing("a", score=0.0, prefs_version="v2")])
+    assert database.get_seen_listing_hashes(["a"], prefs_version="v2") == {"a"}
+
+    database.record_seen_listings([_listing("a", score=0.7, prefs_version="v3")])
+    assert database.get_seen_listing_hashes(["a"], prefs_version="v4") == {"a"}
+
+
+def _store_scored(versions):
+    """Store one job per entry of versions, scored under that prefs version, in id order."""
+    ids = database.upsert_jobs([_job(f"job-{index}", prefs_version=version) for index, version in enumerate(versions)])
+    return [ids[f"job-{index}"] for index in range(len(versions))]
+
+
+def test_iter_jobs_to_rescore_pages_stale_jobs_by_id(temp_db):
+    ids = _store_scored(["v1", "v2", None, "v2", "v1", "v1", None])
+    stale = [ids[index] for index in (0, 2, 4, 5, 6)]
+
+    chunks = list(database.iter_jobs_to_rescore("v2", chunk_size=2))
+
+    assert [[row["id"] for row in chunk] for chunk in chunks] == [stale[0:2], stale[2:4], stale[4:]]
+    assert set(chunks[0][0]) == {column.key for column in database.RESCORE_COLUMNS}
+    assert chunks[0][0]["title"] == "Security Engineer"
+    assert database.count_jobs_to_rescore("v2") == 5
+    assert database.count_jobs_to_rescore("v1") == 4
+
+
+def test_iter_jobs_to_rescore_survives_updates_between_chunks(temp_db):
+    ids = _store_scored(["v1"] * 5)
+    seen = []
+
+    for chunk in database.iter_jobs_to_rescore("v2", chunk_size=2):
+        seen.extend(row["id"] for row in chunk)
+        # Rescored rows drop out of the filter; the id cursor must not skip the rest
+        database.update_job_scores([{"id": row["id"], "prefs_version": "v2"} for row in chunk])
+
+    assert seen == ids
+    assert database.count_jobs_to_rescore("v2") == 0
+    assert list(database.iter_jobs_to_rescore("v2")) == []
+
+
+def test_update_job_scores_sets_only_the_given_columns(temp_db):
+    ids = _store_scored(["v1"] * 4)
+
+    updated = database.update_job_scores(
+        [{"id": job_id, "score": 0.1 * index, "prefs_version": "v2"} for index, job_id in enumerate(ids)]
+    )
+
+    stored = _stored(temp_db)
+    assert updated == 4
+    assert [stored[f"job-{index}"].score for index in range(4)] == pytest.approx([0.0, 0.1, 0.2, 0.3])
+    assert {job.prefs_version for job in stored.values()} == {"v2"}
+    assert {job.title for job in stored.values()} == {"Security Engineer"}
+    assert database.update_job_scores([]) == 0
+
+
+def test_listings_missing_their_description_are_not_remembered(temp_db):
+    database.record_seen_listings([
+        _listing("fetched", score=0.8),
+        _listing("failed", score=0.8, description_missing=True),
+    ])
+
+    assert database.get_seen_listing_hashes(["fetched", "failed"]) == {"fetched"}
@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+
+import pytest
+
+from sources import common
+from utils import fetcher
+from utils.description_cache import DescriptionCache
+from utils.errors import RobotsDisallowedException
+from utils.fetcher import AdaptiveFetcher
+from utils.state import StateStore
+
+POSTING = ('<html><body><script type="application/ld+json">{"@type": "JobPosting"}</script>'
+           '<h1>Security Engineer</h1></body></html>')
+
+
+class FakeScraper:
+    """Serves static pages by URL; robots-disallowed URLs raise like the real scraper."""
+
+    def __init__(self, pages, disallowed=()):
+        self.pages = pages
+        self.disallowed = set(disallowed)
+        self.requested = []
+
+    def fetch_url(self, url):
+        self.requested.append(url)
+        if url in self.disallowed:
+            raise RobotsDisallowedException(url)
+        return SimpleNamespace(text=self.pages.get(url, "<html><body></body></html>"),
+                               headers={"Content-Type": "text/html"})
+
+
+class FakeBrowser:
+    def __init__(self, pages=None):
+        self.pages = pages or {}
+        self.rendered = []
+
+    def fetch(self, url, wait_for_selector=None, scrolls=0):
+        self.rendered.append(url)
+        return self.pages.get(url, POSTING)
+
+    def fetch_many(self, urls, wait_for_selector=None):
+        self.rendered.extend(urls)
+        return {url: self.pages.get(url, POSTING) for url in urls}
+
+
+@pytest.fixture
+def state(tmp_path):
+    return StateStore(str(tmp_path / "state.sqlite"))
+
+
+def _install(monkeypatch, scraper, browser):
+    monkeypatch.setattr(fetcher, "web_scraper", scraper)
+    monkeypatch.setattr(fetcher, "browser_pool", browser)
+
+
+def test_fetch_many_skips_only_the_disallowed_url(monkeypatch, state):
+    urls = ["https://a.example/1", "https://a.example/2", "https://b.example/blocked"]
+    scraper = FakeScraper({url: POSTING for url in urls}, disallowed=[urls[2]])
+    browser = FakeBrowser()
+    _install(monkeypatch, scraper, browser)
+
+    results = AdaptiveFetcher(store=state).fetch_many(urls)
+
+    assert results == {urls[0]: POSTING, urls[1]: POSTING, urls[2]: None}
+    assert browser.rendered == []
+
+
+def test_fetch_job_descriptions_keeps_pages_fetched_beside_a_disallowed_one(monkeypatch, state, tmp_path):
+    urls = ["https://a.example/1", "https://b.example/blocked"]
+    _install(monkeypatch, FakeScraper({urls[0]: POSTING}, disallowed=[urls[1]]), FakeBrowser())
+    monkeypatch.setattr(common, "adaptive_fetcher", AdaptiveFetcher(store=state))
+    monkeypatch.setattr(common, "description_cache", DescriptionCache(str(tmp_path / "cache"), store=state))
+
+    descriptions = common.fetch_job_descriptions(urls)
+
+    assert "Security Engineer" in descriptions[urls[0]]
+    assert descriptions[urls[1]] == ""
+
+
+def test_enrich_listings_flags_failed_description_fetches(monkeypatch):
+    listings = [
+        common.make_listing("acme", "1", "Security Engineer", "https://a.example/1", "Remote"),
+        common.make_listing("acme", "2", "Security Engineer", "https://a.example/2", "Remote"),
+        common.make_listing("acme", "3", "Security Engineer", "https://a.example/3", "Remote",
+                            description="From the API", description_complete=True),
+    ]
+    monkeypatch.setattr(common, "fetch_job_descriptions", lambda urls, selector=None: {
+        "https://a.example/1": "Full text", "https://a.example/2": ""
+    })
+
+    jobs = common.enrich_listings(listings)
+
+    assert [job["description"] for job in jobs] == ["Full text", "", "From the API"]
+    assert [job["description_missing"] for job in jobs] == [False, True, False]
+
+
+def test_fetch_modes_are_learned_per_selector(monkeypatch, state):
+    listing_page = '<html><body><div class="job-card">Security Engineer</div></body></html>'
+    scraper = FakeScraper({"https://a.example/jobs/1": POSTING})
+    browser = FakeBrowser({"https://a.example/careers": listing_page})
+    _install(monkeypatch, scraper, browser)
+    adaptive = AdaptiveFetcher(store=state)
+
+    # The listing cards only appear once rendered...
+    assert adaptive.fetch("https://a.example/careers", ".job-card") == listing_page
+    assert adaptive.get_mode("a.example", ".job-card") == fetcher.MODE_RENDER
+
+    # ...which says nothing about the posting pages, still probed and served over HTTP
+    assert adaptive.fetch_many(["https://a.example/jobs/1"]) == {"https://a.example/jobs/1": POSTING}
+    assert scraper.requested[-1] == "https://a.example/jobs/1"
+    assert browser.rendered == ["https://a.example/careers"]
+    assert adaptive.get_mode("a.example") == fetcher.MODE_STATIC
+
+    # Learned modes survive a restart
+    assert AdaptiveFetcher(store=state).get_mode("a.example", ".job-card") == fetcher.MODE_RENDER
+
+
+def test_fetch_many_renders_only_the_pages_whose_probe_missed(monkeypatch, state):
+    urls = [f"https://a.example/jobs/{index}" for index in range(4)]
+    scraper = FakeScraper({url: POSTING for url in urls if url != urls[1]})
+    browser = FakeBrowser()
+    _install(monkeypatch, scraper, browser)
+    adaptive = AdaptiveFetcher(store=state)
+    adaptive.record_mode("a.example", fetcher.MODE_STATIC)
+
+    results = adaptive.fetch_many(urls)
+
+    assert scraper.requested == urls
+    assert browser.rendered == [urls[1]]
+    assert all(results[url] == POSTING for url in urls)
+    assert adaptive.get_mode("a.example") == fetcher.MODE_STATIC
+
+
+def test_fetch_many_learns_render_only_domains(monkeypatch, state):
+    urls = [f"https://a.example/jobs/{index}" for index in range(3)]
+    scraper = FakeScraper({})
+    browser = FakeBrowser()
+    _install(monkeypatch, scraper, browser)
+    adaptive = AdaptiveFetcher(store=state)
+
+    adaptive.fetch_many(urls)
+    assert adaptive.get_mode("a.example") == fetcher.MODE_RENDER
+
+    scraper.requested.clear()
+    adaptive.fetch_many(["https://a.example/jobs/9"])
+    assert scraper.requested == []
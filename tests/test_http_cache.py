@@ -0,0 +1,47 @@
+import sqlite3
+
+from utils.http_cache import ValidatorCache
+from utils.state import StateStore
+
+URL = "https://boards.example/acme"
+
+
+def _store(cache, prefs_version):
+    with cache.track(prefs_version) as pending:
+        cache.remember(URL, '"etag-1"', None, "body-hash")
+    cache.commit(pending)
+
+
+def test_validators_only_apply_under_the_prefs_version_they_were_stored_with(tmp_path):
+    cache = ValidatorCache(store=StateStore(str(tmp_path / "state.sqlite")))
+    _store(cache, "v1")
+
+    with cache.track("v1"):
+        assert cache.get(URL) == {"etag": '"etag-1"', "last_modified": None, "body_hash": "body-hash"}
+    with cache.track("v2"):
+        assert cache.get(URL) is None
+    assert cache.get(URL) is None
+
+    _store(cache, "v2")
+    with cache.track("v2"):
+        assert cache.get(URL)["etag"] == '"etag-1"'
+
+
+def test_validators_table_from_before_prefs_versions_is_migrated(tmp_path):
+    path = str(tmp_path / "state.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE http_validators (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+        "body_hash TEXT NOT NULL, stored_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO http_validators VALUES (?, 'old', NULL, 'old-hash', strftime('%s', 'now'))", (URL,))
+    conn.commit()
+    conn.close()
+    cache = ValidatorCache(store=StateStore(path))
+
+    with cache.track("v1"):
+        # Stored before versions existed: never trusted under the current preferences
+        assert cache.get(URL) is None
+    _store(cache, "v1")
+    with cache.track("v1"):
+        assert cache.get(URL)["etag"] == '"etag-1"'
@@ -0,0 +1,200 @@
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from matchers import rules
+from matchers.rules import score_job, score_jobs
+from utils import llm
+from utils.llm_cache import LLMCache
+from utils.state import StateStore
+
+PREFS = {
+    "title_allowlist": ["Security"],
+    "location_constraints": ["Remote"],
+    "keywords_boost": ["Kubernetes"],
+    "llm_weight": 0.5,
+}
+
+
+def _job(index, title="Security Engineer"):
+    return {"hash": f"job-{index}", "title": title, "company": "acme", "location": "Remote",
+            "description": f"Posting {index} using kubernetes"}
+
+
+class FakeCompletions:
+    """Answers scoring prompts like the API would and records every request."""
+
+    def __init__(self, tokens=300):
+        self.tokens = tokens
+        self.requests = []
+
+    def create(self, **request):
+        prompt = request["messages"][1]["content"]
+        self.requests.append(prompt)
+        if '"results"' in prompt:
+            count = len(re.findall(r"^JOB \d+:$", prompt, re.MULTILINE))
+            content = {"results": [
+                {"id": index, "score": 0.9, "reasons": [f"batch {index}"], "summary": "fits"}
+                for index in range(count)
+            ]}
+        else:
+            content = {"score": 0.8, "reasons": ["single"], "summary": "fits"}
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(content)))],
+            usage=SimpleNamespace(total_tokens=self.tokens)
+        )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(store=StateStore(str(tmp_path / "state.sqlite")), ttl_seconds=3600, max_bytes=10**6)
+
+
+@pytest.fixture
+def fake_openai(monkeypatch, cache):
+    """LLM enabled against a fake client, with a fresh token budget and result cache."""
+    completions = FakeCompletions()
+    monkeypatch.setattr(llm, "openai_client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(llm, "LLM_ENABLED", True)
+    monkeypatch.setattr(llm, "token_tracker", llm.TokenTracker(max_daily_tokens=10**6, max_rpm=1000))
+    monkeypatch.setattr(llm, "llm_cache", cache)
+    monkeypatch.setenv("LLM_BATCH_SIZE", "3")
+    return completions
+
+
+def test_score_jobs_matches_score_job_without_llm():
+    jobs = [_job(0), _job(1, title="Sales Manager"), _job(2, title="Security Analyst")]
+
+    results = score_jobs(jobs, PREFS, use_llm=False)
+
+    assert len(results) == 3
+    assert list(results) == [score_job(job, PREFS, use_llm=False) for job in jobs]
+    assert results[1][0] == 0.0
+    assert results.scores == [result[0] for result in results]
+
+
+def test_score_jobs_sends_only_rule_survivors_to_the_llm(monkeypatch):
+    sent = []
+
+    def score_jobs_with_llm(jobs, preferences):
+        sent.extend(job["hash"] for job in jobs)
+        return [llm.LLMResult(0.4, ["ai"], "ok", 10, "model") for _ in jobs]
+
+    fake = SimpleNamespace(score_jobs_with_llm=score_jobs_with_llm, create_hybrid_score=llm.create_hybrid_score)
+    monkeypatch.setattr(rules, "_llm_module", lambda: fake)
+    jobs = [_job(0), _job(1, title="Sales Manager"), _job(2)]
+
+    results = score_jobs(jobs, PREFS, use_llm=True)
+
+    assert sent == ["job-0", "job-2"]
+    rules_score = score_job(jobs[0], PREFS, use_llm=False)[0]
+    assert results[0][0] == pytest.approx(rules_score * 0.5 + 0.4 * 0.5)
+    assert results[0][2]["llm_used"] is True
+    assert results[1][2]["scoring_method"] == "rules_only"
+
+
+def test_score_jobs_falls_back_to_rules_when_the_llm_fails(monkeypatch):
+    def score_jobs_with_llm(jobs, preferences):
+        raise RuntimeError("API down")
+
+    fake = SimpleNamespace(score_jobs_with_llm=score_jobs_with_llm, create_hybrid_score=llm.create_hybrid_score)
+    monkeypatch.setattr(rules, "_llm_module", lambda: fake)
+    jobs = [_job(0), _job(1)]
+
+    assert list(score_jobs(jobs, PREFS, use_llm=True)) == [score_job(job, PREFS, use_llm=False) for job in jobs]
+
+
+def test_score_jobs_with_llm_groups_requests(fake_openai):
+    jobs = [_job(index) for index in range(7)]
+
+    results = llm.score_jobs_with_llm(jobs, PREFS)
+
+    assert len(fake_openai.requests) == 3
+    assert [result.reasons for result in results] == [
+        ["batch 0"], ["batch 1"], ["batch 2"], ["batch 0"], ["batch 1"], ["batch 2"], ["batch 0"]
+    ]
+    assert [result.tokens_used for result in results] == [100] * 6 + [300]
+    assert llm.token_tracker.daily_tokens == 900
+
+
+def test_score_jobs_with_llm_stops_at_the_token_budget(fake_openai):
+    llm.token_tracker.max_daily_tokens = 300
+
+    results = llm.score_jobs_with_llm([_job(index) for index in range(6)], PREFS)
+
+    assert len(fake_openai.requests) == 1
+    assert [result is not None for result in results] == [True] * 3 + [False] * 3
+
+
+def test_cache_key_folds_case_and_whitespace_only():
+    key = LLMCache.key("Title: Security Engineer\nRemote", "prefs", "model", "1")
+
+    assert LLMCache.key("title:  SECURITY engineer  remote ", "PREFS", "model", "1") == key
+    assert LLMCache.key("Title: Security Analyst\nRemote", "prefs", "model", "1") != key
+
+
+def test_cache_key_changes_with_prompt_version_model_and_preferences(monkeypatch):
+    job = _job(0)
+    key = llm._cache_key(job, PREFS, "gpt-4o-mini")
+
+    assert llm._cache_key(dict(job), dict(PREFS), "gpt-4o-mini") == key
+    assert llm._cache_key(job, PREFS, "gpt-4o") != key
+    assert llm._cache_key(job, {**PREFS, "keywords_boost": ["Terraform"]}, "gpt-4o-mini") != key
+    monkeypatch.setattr(llm, "PROMPT_VERSION", "2")
+    assert llm._cache_key(job, PREFS, "gpt-4o-mini") != key
+
+
+def test_cached_result_is_free_even_over_budget(fake_openai, cache):
+    first = llm.score_job_with_llm(_job(0), PREFS)
+    llm.token_tracker.max_daily_tokens = llm.token_tracker.daily_tokens
+
+    again = llm.score_job_with_llm(_job(0), PREFS)
+
+    assert len(fake_openai.requests) == 1
+    assert (again.score, again.reasons, again.tokens_used, again.cached) == (first.score, first.reasons, 0, True)
+    assert llm.score_job_with_llm(_job(1), PREFS) is None
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["tokens_saved"] == 300
+
+
+def test_prompt_version_bump_misses_the_cache(fake_openai, monkeypatch):
+    llm.score_job_with_llm(_job(0), PREFS)
+    monkeypatch.setattr(llm, "PROMPT_VERSION", "2")
+
+    result = llm.score_job_with_llm(_job(0), PREFS)
+
+    assert len(fake_openai.requests) == 2
+    assert result.cached is False
+
+
+def test_score_jobs_with_llm_sends_only_cache_misses(fake_openai):
+    llm.score_job_with_llm(_job(0), PREFS)
+
+    results = llm.score_jobs_with_llm([_job(index) for index in range(4)], PREFS)
+
+    assert len(fake_openai.requests) == 2
+    assert fake_openai.requests[1].count("Description: Posting") == 3
+    assert "Posting 0 " not in fake_openai.requests[1]
+    assert [result.cached for result in results] == [True, False, False, False]
+    assert results[0].reasons == ["single"]
+
+
+def test_cache_expires_and_evicts_least_recently_used(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("utils.llm_cache.time", SimpleNamespace(time=lambda: clock[0]))
+    cache = LLMCache(store=StateStore(str(tmp_path / "state.sqlite")), ttl_seconds=100, max_bytes=10**6)
+    for name in ("a", "b", "c"):
+        cache.put(name, {"score": 0.5}, 10)
+        clock[0] += 1
+    assert cache.get("a") == {"score": 0.5}
+
+    cache.max_bytes = 2 * (1 + len('{"score": 0.5}'))
+    assert cache.prune() == 1
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+    clock[0] += 200
+    assert cache.get("a") is None
+    assert cache.prune() == 2
@@ -0,0 +1,169 @@
+import asyncio
+from types import SimpleNamespace
+
+import agent
+from utils.errors import RobotsDisallowedException, ScrapingException
+
+
+class DisallowedSource:
+    @staticmethod
+    def list_jobs(board_url, **options):
+        raise RobotsDisallowedException(board_url)
+
+
+def _poll(source, totals):
+    company = SimpleNamespace(
+        id="acme", board_type="generic", url="https://acme.example/careers",
+        custom_selectors=None, fetch_descriptions=True
+    )
+
+    async def run():
+        return await agent._poll_company(
+            company, source, "acme.example", {}, SimpleNamespace(fetch_descriptions=True),
+            asyncio.Semaphore(1), asyncio.Semaphore(1), totals
+        )
+
+    return asyncio.run(run())
+
+
+def test_robots_disallowed_board_is_skipped_without_backoff(monkeypatch):
+    failures = []
+    monkeypatch.setattr(agent.network_resilience, "record_failure", failures.append)
+    totals = {"found": 0, "prefiltered": 0, "unchanged": 0, "errors": 0}
+
+    assert _poll(DisallowedSource, totals) == []
+    assert failures == []
+    assert totals["errors"] == 0
+
+
+class BoardSource:
+    """Two listings; one is already known."""
+
+    @staticmethod
+    def list_jobs(board_url, **options):
+        return [
+            {"listing_hash": "known", "title": "Security Engineer", "company": "acme", "url": "u1"},
+            {"listing_hash": "fresh", "title": "Security Engineer", "company": "acme", "url": "u2"},
+        ]
+
+    @staticmethod
+    def enrich_jobs(listings, fetch_descriptions=True):
+        return [dict(listing, hash=f"job-{listing['listing_hash']}", location="Remote") for listing in listings]
+
+
+def test_database_calls_run_off_the_event_loop(monkeypatch):
+    loop_threads = []
+
+    def tracked(name, result):
+        def call(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                loop_threads.append(name)
+            except RuntimeError:
+                pass
+            return result
+        return call
+
+    monkeypatch.setattr(agent, "get_seen_listing_hashes", tracked("seen", {"known"}))
+    monkeypatch.setattr(agent, "get_existing_hashes", tracked("existing", set()))
+    monkeypatch.setattr(agent, "_store_known_listings", tracked("store", None))
+    monkeypatch.setattr(agent, "prefilter_job", lambda listing, prefs: (True, ""))
+    monkeypatch.setattr(agent.network_resilience, "record_success", tracked("success", None))
+    monkeypatch.setattr(agent.network_resilience, "record_failure", tracked("failure", None))
+    monkeypatch.setattr(agent.http_validators, "defer", lambda validators: None)
+    totals = {"found": 0, "prefiltered": 0, "unchanged": 0, "errors": 0}
+
+    new_jobs = _poll(BoardSource, totals)
+
+    assert [job["hash"] for job in new_jobs] == ["job-fresh"]
+    assert totals["errors"] == 0
+
+    class FailingSource(BoardSource):
+        @staticmethod
+        def list_jobs(board_url, **options):
+            raise ScrapingException("acme.example", board_url, "HTTP 500")
+
+    assert _poll(FailingSource, totals) == []
+    assert totals["errors"] == 1
+    assert loop_threads == []
+
+
+def test_prefiltered_listings_are_not_enriched(monkeypatch):
+    enriched = []
+
+    class Source(BoardSource):
+        @staticmethod
+        def list_jobs(board_url, **options):
+            return [
+                {"listing_hash": "a", "title": "Security Engineer", "company": "acme", "url": "u1"},
+                {"listing_hash": "b", "title": "Sales Manager", "company": "acme", "url": "u2"},
+            ]
+
+        @staticmethod
+        def enrich_jobs(listings, fetch_descriptions=True):
+            enriched.extend(listing["listing_hash"] for listing in listings)
+            return BoardSource.enrich_jobs(listings, fetch_descriptions)
+
+    monkeypatch.setattr(agent, "get_seen_listing_hashes", lambda hashes, prefs_version=None: set())
+    monkeypatch.setattr(agent, "get_existing_hashes", lambda hashes: set())
+    monkeypatch.setattr(agent, "_store_known_listings", lambda seen, known_jobs, rejected: None)
+    monkeypatch.setattr(agent.network_resilience, "record_success", lambda domain: None)
+    monkeypatch.setattr(agent.http_validators, "defer", lambda validators: None)
+    totals = {"found": 0, "prefiltered": 0, "unchanged": 0, "errors": 0}
+    company = SimpleNamespace(
+        id="acme", board_type="generic", url="https://acme.example/careers",
+        custom_selectors=None, fetch_descriptions=True
+    )
+
+    async def run():
+        return await agent._poll_company(
+            company, Source, "acme.example", {"title_allowlist": ["Security"]},
+            SimpleNamespace(fetch_descriptions=True), asyncio.Semaphore(1), asyncio.Semaphore(1), totals
+        )
+
+    new_jobs = asyncio.run(run())
+
+    assert enriched == ["a"]
+    assert [job["listing_hash"] for job in new_jobs] == ["a"]
+    assert totals["prefiltered"] == 1
+
+
+def test_prefiltered_listings_are_remembered_under_the_prefs_version(temp_db, monkeypatch):
+    class Source(BoardSource):
+        @staticmethod
+        def list_jobs(board_url, **options):
+            return [{"listing_hash": "sales", "title": "Sales Manager", "company": "acme", "url": "u1"}]
+
+    monkeypatch.setattr(agent.network_resilience, "record_success", lambda domain: None)
+    monkeypatch.setattr(agent.http_validators, "commit", lambda validators: None)
+    prefs = {"title_allowlist": ["Security"]}
+    totals = {"found": 0, "prefiltered": 0, "unchanged": 0, "errors": 0}
+    company = SimpleNamespace(
+        id="acme", board_type="generic", url="https://acme.example/careers",
+        custom_selectors=None, fetch_descriptions=True
+    )
+
+    async def run():
+        return await agent._poll_company(
+            company, Source, "acme.example", prefs,
+            SimpleNamespace(fetch_descriptions=True), asyncio.Semaphore(1), asyncio.Semaphore(1), totals
+        )
+
+    assert asyncio.run(run()) == []
+    assert totals["prefiltered"] == 1
+    version = agent.prefs_version(prefs)
+    assert agent.get_seen_listing_hashes(["sales"], prefs_version=version) == {"sales"}
+    assert agent.get_seen_listing_hashes(["sales"], prefs_version="other") == set()
+
+
+def test_processing_jobs_keeps_the_llm_cache_bounded(temp_db, monkeypatch):
+    pruned = []
+    monkeypatch.setattr(agent.llm_cache, "prune", lambda: pruned.append(True) or 0)
+    monkeypatch.setattr(agent.config_manager, "get_filter_config",
+                        lambda: SimpleNamespace(immediate_alert_threshold=0.9))
+    monkeypatch.setattr(agent.config_manager, "get_notification_config",
+                        lambda: SimpleNamespace(validate_slack=lambda: False))
+
+    agent.process_jobs([], {"title_allowlist": ["Security"]})
+
+    assert pruned == [True]
@@ -0,0 +1,192 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from utils import scraping
+from utils.errors import RateLimitException
+from utils.scraping import RateLimitConfig, RateLimiter, TokenBucket
+from utils.state import StateStore
+
+DOMAIN = "boards.example"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return StateStore(str(tmp_path / "state.sqlite"))
+
+
+def _limiter(store, shared=False, interval=1.0, burst=1):
+    limiter = RateLimiter(store=store, shared=shared)
+    limiter.domain_configs[DOMAIN] = RateLimitConfig(
+        requests_per_minute=6000, min_delay_seconds=interval, max_delay_seconds=interval, burst=burst
+    )
+    return limiter
+
+
+def test_bucket_spaces_reservations_by_the_interval():
+    bucket = TokenBucket()
+
+    waits = [bucket.reserve(100.0, 2.0) for _ in range(3)]
+
+    assert waits == [0.0, 2.0, 4.0]
+    assert bucket.peek(100.0, 2.0) == 6.0
+    # Peeking does not claim a slot
+    assert bucket.reserve(100.0, 2.0) == 6.0
+
+
+def test_bucket_allows_a_burst_then_spaces():
+    bucket = TokenBucket()
+
+    waits = [bucket.reserve(100.0, 2.0, burst=3) for _ in range(5)]
+
+    assert waits == [0.0, 0.0, 0.0, 2.0, 4.0]
+
+
+def test_idle_time_refills_at_most_the_burst():
+    bucket = TokenBucket()
+    for _ in range(3):
+        bucket.reserve(100.0, 2.0, burst=2)
+
+    # Long idle: two requests go straight through, the third waits again
+    waits = [bucket.reserve(1000.0, 2.0, burst=2) for _ in range(3)]
+
+    assert waits == [0.0, 0.0, 2.0]
+
+
+def test_concurrent_tasks_get_successive_slots(store):
+    limiter = _limiter(store, interval=0.02)
+
+    async def run():
+        return await asyncio.gather(*(limiter.acquire(DOMAIN) for _ in range(3)))
+
+    waits = sorted(asyncio.run(run()))
+
+    assert waits[0] == pytest.approx(0.0, abs=0.005)
+    assert waits[1] == pytest.approx(0.02, abs=0.005)
+    assert waits[2] == pytest.approx(0.04, abs=0.005)
+    assert limiter.get_wait_metrics()[DOMAIN]["waits"] == 3
+
+
+def test_bucket_position_survives_a_restart(store):
+    _limiter(store, interval=30.0)._reserve(DOMAIN)
+
+    assert _limiter(store, interval=30.0)._reserve(DOMAIN) == pytest.approx(30.0, abs=0.5)
+
+
+def test_shared_limiters_draw_from_one_bucket(store):
+    first, second = _limiter(store, shared=True, interval=10.0), _limiter(store, shared=True, interval=10.0)
+
+    waits = [first._reserve(DOMAIN), second._reserve(DOMAIN), first._reserve(DOMAIN)]
+
+    assert waits == pytest.approx([0.0, 10.0, 20.0], abs=0.5)
+    assert second.should_wait(DOMAIN) == pytest.approx(30.0, abs=0.5)
+
+
+def test_healthy_responses_raise_rate_and_concurrency_up_to_twice_the_config(store):
+    limiter = _limiter(store)
+    limiter.domain_configs[DOMAIN].max_concurrent = 2
+
+    limiter.record_request(DOMAIN, success=True)
+    state = limiter.adaptive[DOMAIN]
+    assert state.rate_factor == pytest.approx(1.0 + scraping.RATE_INCREASE_STEP)
+    assert state.concurrency == pytest.approx(2.5)
+
+    for _ in range(200):
+        limiter.record_request(DOMAIN, success=True)
+    assert state.rate_factor == scraping.MAX_RATE_FACTOR
+    assert limiter.get_concurrency_limit(DOMAIN) == 4
+
+
+def test_overload_halves_limits_once_per_cooldown(store):
+    limiter = _limiter(store)
+    limiter.domain_configs[DOMAIN].max_concurrent = 4
+
+    limiter.record_request(DOMAIN, success=False, overloaded=True)
+    limiter.record_request(DOMAIN, success=False, overloaded=True)
+
+    state = limiter.adaptive[DOMAIN]
+    assert state.rate_factor == pytest.approx(0.5)
+    assert limiter.get_concurrency_limit(DOMAIN) == 2
+    assert limiter._interval(DOMAIN) == pytest.approx(2.0)
+
+
+def test_plain_failures_leave_limits_alone(store):
+    limiter = _limiter(store)
+
+    limiter.record_request(DOMAIN, success=False)
+
+    assert limiter.adaptive[DOMAIN].rate_factor == 1.0
+
+
+def test_rising_latency_throttles(store):
+    limiter = _limiter(store)
+    for _ in range(3):
+        limiter.record_request(DOMAIN, success=True, latency=0.2)
+    rate = limiter.adaptive[DOMAIN].rate_factor
+
+    for _ in range(5):
+        limiter.record_request(DOMAIN, success=True, latency=3.0)
+
+    assert limiter.adaptive[DOMAIN].rate_factor < rate
+
+
+def test_retry_after_holds_the_bucket_past_the_deadline(store):
+    limiter = _limiter(store, interval=0.01)
+
+    limiter.record_request(DOMAIN, success=False, overloaded=True, retry_after=30)
+
+    assert limiter._reserve(DOMAIN) == pytest.approx(30.0, abs=0.5)
+    assert limiter.get_adaptive_limits()[DOMAIN]["blocked_seconds"] == pytest.approx(30.0, abs=0.5)
+
+
+def test_long_retry_after_fails_fast(store):
+    limiter = _limiter(store)
+
+    limiter.record_request(DOMAIN, success=False, overloaded=True, retry_after=scraping.MAX_RETRY_AFTER_SECONDS + 60)
+
+    with pytest.raises(RateLimitException) as error:
+        limiter._reserve(DOMAIN)
+    assert error.value.retry_after > scraping.MAX_RETRY_AFTER_SECONDS
+    assert not scraping._should_retry(error.value)
+
+
+def test_parse_retry_after():
+    assert scraping.parse_retry_after("120") == 120.0
+    assert scraping.parse_retry_after(None) is None
+    assert scraping.parse_retry_after("soon") is None
+    assert scraping.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    future = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=90), usegmt=True)
+    assert scraping.parse_retry_after(future) == pytest.approx(90, abs=2)
+
+
+def _response(status, headers=None):
+    return httpx.Response(status, headers=headers, request=httpx.Request("GET", f"https://{DOMAIN}/jobs"))
+
+
+@pytest.mark.parametrize("status, headers", [(429, {"Retry-After": "7"}), (503, {"Retry-After": "7"})])
+def test_check_status_turns_retry_after_into_a_rate_limit(store, monkeypatch, status, headers):
+    limiter = _limiter(store, interval=0.01)
+    monkeypatch.setattr(scraping, "rate_limiter", limiter)
+
+    with pytest.raises(RateLimitException) as error:
+        scraping.WebScraper()._check_status(DOMAIN, _response(status, headers))
+
+    assert error.value.retry_after == 7.0
+    assert limiter.adaptive[DOMAIN].rate_factor == pytest.approx(0.5)
+    assert limiter._reserve(DOMAIN) == pytest.approx(7.0, abs=0.5)
+    assert scraping._should_retry(error.value)
+
+
+def test_check_status_without_retry_after(store, monkeypatch):
+    monkeypatch.setattr(scraping, "rate_limiter", _limiter(store))
+    scraper = scraping.WebScraper()
+
+    with pytest.raises(RateLimitException) as error:
+        scraper._check_status(DOMAIN, _response(429))
+    assert error.value.retry_after is None
+    with pytest.raises(httpx.HTTPStatusError):
+        scraper._check_status(DOMAIN, _response(503))
+    assert scraper._check_status(DOMAIN, _response(304)) is None
@@ -0,0 +1,58 @@
+import pytest
+from sqlmodel import Session, select
+
+import agent
+import database
+from database import Job
+from matchers.rules import prefs_version, rescore_rows, score_job
+
+PREFS = {
+    "title_allowlist": ["Security"],
+    "location_constraints": ["Remote"],
+    "keywords_boost": ["Kubernetes"],
+    "salary_floor_usd": 150000,
+}
+
+
+def _row(index, **fields):
+    row = {"id": index, "title": "Security Engineer", "company": "acme", "location": "Remote",
+           "description": "Kubernetes platform. Base salary: $180,000 - $220,000.",
+           "salary_min": None, "salary_max": None, "salary_currency": None,
+           "salary_period": None, "salary_version": None}
+    row.update(fields)
+    return row
+
+
+def test_rescore_rows_returns_rules_scores_and_parsed_salary():
+    rows = [_row(1), _row(2, title="Sales Manager"), _row(3, description="Kubernetes. $90,000 - $110,000 base.")]
+
+    updates = rescore_rows([dict(row) for row in rows], PREFS)
+
+    assert [update["id"] for update in updates] == [1, 2, 3]
+    assert [update["score"] for update in updates] == [score_job(row, PREFS, use_llm=False)[0] for row in rows]
+    assert updates[0]["score"] > 0 and updates[1]["score"] == 0 and updates[2]["score"] == 0
+    assert {update["prefs_version"] for update in updates} == {prefs_version(PREFS)}
+    assert (updates[0]["salary_min"], updates[0]["salary_max"]) == (180000, 220000)
+
+
+def test_rescore_updates_only_jobs_scored_under_other_prefs(temp_db, monkeypatch):
+    monkeypatch.setenv("RESCORE_WORKERS", "1")
+    monkeypatch.setenv("RESCORE_CHUNK_SIZE", "2")
+    current = prefs_version(PREFS)
+    versions = ["old", current, None, "old", "old"]
+    database.upsert_jobs([
+        {"hash": f"job-{index}", "title": "Security Engineer", "url": f"https://example.com/{index}",
+         "company": "acme", "location": "Remote", "description": "Kubernetes platform",
+         "score": 0.42, "prefs_version": version}
+        for index, version in enumerate(versions)
+    ])
+
+    agent.rescore(PREFS)
+
+    with Session(temp_db) as session:
+        stored = {job.hash: job for job in session.exec(select(Job)).all()}
+    expected = score_job(_row(0, description="Kubernetes platform"), PREFS, use_llm=False)[0]
+    assert stored["job-1"].score == 0.42
+    assert [stored[f"job-{index}"].score for index in (0, 2, 3, 4)] == pytest.approx([expected] * 4)
+    assert {job.prefs_version for job in stored.values()} == {current}
+    assert database.count_jobs_to_rescore(current) == 0
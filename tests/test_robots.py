@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from utils.robots import DISALLOW_ALL, RobotsCache, RobotsRules, parse_robots
+from utils.state import StateStore
+
+ROBOTS = """
+# Everyone else
+User-agent: *
+Disallow: /private
+Crawl-delay: 5
+
+User-agent: Googlebot
+User-agent: JobScraper
+Disallow: /search
+Allow: /search/jobs
+Disallow: /*.pdf$
+Crawl-delay: 2
+
+User-agent: OtherBot
+Disallow: /
+"""
+
+
+def test_our_group_wins_over_the_wildcard():
+    rules = parse_robots(ROBOTS)
+
+    assert rules.crawl_delay == 2.0
+    assert rules.allows("https://acme.example/private/page")
+    assert not rules.allows("https://acme.example/search?q=x")
+
+
+def test_wildcard_group_applies_when_no_group_names_us():
+    rules = parse_robots(ROBOTS, agent="SomeCrawler")
+
+    assert rules.crawl_delay == 5.0
+    assert not rules.allows("https://acme.example/private/page")
+    assert rules.allows("https://acme.example/search")
+
+
+@pytest.mark.parametrize("path, allowed", [
+    ("/search/jobs/123", True),  # Longer Allow beats the shorter Disallow
+    ("/search/other", False),
+    ("/files/posting.pdf", False),
+    ("/files/posting.pdf?download=1", True),  # "$" anchors the end
+    ("/robots.txt", True),
+    ("/", True),
+])
+def test_longest_match_wins(path, allowed):
+    assert parse_robots(ROBOTS).allows(f"https://acme.example{path}") is allowed
+
+
+def test_allow_beats_disallow_on_a_tie():
+    rules = RobotsRules([("/jobs", False), ("/jobs", True), ("/team", False)])
+
+    assert rules.allows("https://acme.example/jobs/1")
+    assert not rules.allows("https://acme.example/team")
+
+
+def test_empty_disallow_allows_everything():
+    assert parse_robots("User-agent: *\nDisallow:\n").allows("https://acme.example/anything")
+
+
+def test_rules_round_trip_through_json():
+    rules = parse_robots(ROBOTS)
+
+    restored = RobotsRules.from_json(rules.to_json())
+
+    assert restored.rules == rules.rules
+    assert restored.crawl_delay == rules.crawl_delay
+    assert not restored.allows("https://acme.example/search")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return StateStore(str(tmp_path / "state.sqlite"))
+
+
+def _cache_serving(store, monkeypatch, response):
+    requested = []
+
+    def get(url):
+        requested.append(url)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    cache = RobotsCache(store=store)
+    monkeypatch.setattr(cache, "_client", SimpleNamespace(get=get, close=lambda: None))
+    return cache, requested
+
+
+def test_rules_are_fetched_once_and_shared_through_the_store(store, monkeypatch):
+    cache, requested = _cache_serving(store, monkeypatch, httpx.Response(200, text=ROBOTS))
+
+    assert not cache.get("https://acme.example/search").allows("https://acme.example/search")
+    assert cache.get("https://acme.example/jobs").crawl_delay == 2.0
+    assert requested == ["https://acme.example/robots.txt"]
+
+    other_process, fetched_again = _cache_serving(store, monkeypatch, httpx.Response(500))
+    assert other_process.get("https://acme.example/jobs").crawl_delay == 2.0
+    assert fetched_again == []
+
+
+@pytest.mark.parametrize("response, allowed", [
+    (httpx.Response(404), True),
+    (httpx.Response(503), False),
+    (httpx.ConnectError("unreachable"), False),
+])
+def test_fetch_outcomes_follow_rfc_9309(store, monkeypatch, response, allowed):
+    cache, _ = _cache_serving(store, monkeypatch, response)
+
+    rules = cache.get("https://acme.example/jobs")
+
+    assert rules.allows("https://acme.example/jobs") is allowed
+    assert (rules is DISALLOW_ALL) is not allowed
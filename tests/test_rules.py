@@ -0,0 +1,156 @@
+import random
+
+import pytest
+
+from matchers import keywords, rules
+from matchers.keywords import KeywordMatcher
+from matchers.rules import compile_prefs, score_job_rules_only
+
+VOCABULARY = [
+    "security", "Security Engineer", "engineer", "senior", "Senior Security", "manager", "sec", "ops",
+    "devsecops", "remote", "Remote - US", "us", "united states", "new york", "aws", "kubernetes", "k8s",
+    "c++", "go", "rust", "soc", "soc 2", "iso 27001", "ci/cd", "zürich", "über", "", " ",
+]
+
+
+def _reference_score(job: dict, prefs: dict) -> tuple[float, list[str]]:
+    """Rules scoring as it was before keyword matchers: one substring test per term, in list order."""
+    title = job.get('title', '').lower()
+    for blocked_word in prefs.get("title_blocklist", []):
+        if blocked_word.lower() in title:
+            return 0.0, [f"Rejected: Title contains blocked word '{blocked_word}'"]
+    for excluded_word in prefs.get("keywords_exclude", []):
+        if excluded_word.lower() in title:
+            return 0.0, [f"Rejected: Title contains excluded keyword '{excluded_word}'"]
+
+    score, reasons = 0.0, []
+    for allowed_word in prefs.get("title_allowlist", []):
+        if allowed_word.lower() in title:
+            score += 0.6
+            reasons.append(f"Title matched '{allowed_word}'")
+            break
+    else:
+        return 0.0, ["Rejected: Title did not match allowlist"]
+
+    location = job.get('location', '').lower()
+    for loc_pref in prefs.get("location_constraints", []):
+        if loc_pref.lower() in location:
+            score += 0.2
+            reasons.append(f"Location matched '{loc_pref}'")
+            break
+
+    full_text = title + ' ' + job.get('description', '').lower()
+    for boost_word in prefs.get("keywords_boost", []):
+        if boost_word.lower() in full_text:
+            score += 0.05
+            reasons.append(f"Keyword boost: '{boost_word}'")
+
+    return min(score, 1.0), reasons
+
+
+def _random_text(rng: random.Random, words: int) -> str:
+    parts = []
+    for _ in range(words):
+        word = rng.choice(VOCABULARY + ["and", "the", "team", "platform", "-", ","])
+        parts.append(word.upper() if rng.random() < 0.2 else word)
+    return rng.choice([" ", "", "/"]).join(parts)
+
+
+def _random_prefs(rng: random.Random) -> dict:
+    def terms(count):
+        return [rng.choice(VOCABULARY) for _ in range(rng.randint(0, count))]
+    return {
+        "title_allowlist": terms(4),
+        "title_blocklist": terms(2),
+        "keywords_exclude": terms(2),
+        "location_constraints": terms(3),
+        "keywords_boost": terms(8),
+    }
+
+
+@pytest.fixture(params=["aho-corasick", "substring scan"])
+def matcher_backend(request, monkeypatch):
+    """Run a test with pyahocorasick and with the plain fallback, from a clean prefs cache."""
+    if request.param == "aho-corasick":
+        pytest.importorskip("ahocorasick")
+    else:
+        monkeypatch.setattr(keywords, "ahocorasick", None)
+    monkeypatch.setattr(rules, "_compiled_prefs", {})
+    monkeypatch.setattr(rules, "_last_compiled", ((), None))
+    return request.param
+
+
+def test_keyword_matcher_matches_substring_containment(matcher_backend):
+    rng = random.Random(7)
+    for _ in range(300):
+        lists = {"a": [rng.choice(VOCABULARY) for _ in range(5)], "b": [rng.choice(VOCABULARY) for _ in range(3)]}
+        text = _random_text(rng, 12).lower()
+
+        found = KeywordMatcher(lists).scan(text)
+
+        assert found == {
+            name: [index for index, term in enumerate(terms) if term.lower() in text]
+            for name, terms in lists.items()
+        }
+
+
+def test_keyword_matcher_handles_overlapping_and_repeated_terms(matcher_backend):
+    matcher = KeywordMatcher({"boost": ["SOC", "soc 2", "SOC", "2"], "other": ["soc"]})
+
+    assert matcher.scan("soc 2 type ii; soc 2 again") == {"boost": [0, 1, 2, 3], "other": [0]}
+    assert matcher.scan("nothing here") == {"boost": [], "other": []}
+
+
+def test_compiled_scoring_matches_substring_scoring(matcher_backend):
+    rng = random.Random(11)
+    for _ in range(100):
+        prefs = _random_prefs(rng)
+        for _ in range(20):
+            job = {
+                "title": _random_text(rng, 3),
+                "location": _random_text(rng, 2),
+                "description": _random_text(rng, 40),
+            }
+            expected = _reference_score(job, prefs)
+
+            assert score_job_rules_only(job, prefs) == expected
+            assert score_job_rules_only(job, compile_prefs(prefs)) == expected
+
+
+def test_compile_prefs_follows_edits_to_the_same_dict():
+    prefs = {"title_allowlist": ["security"], "keywords_boost": []}
+    job = {"title": "Security Engineer", "location": "Remote", "description": "kubernetes"}
+
+    assert score_job_rules_only(job, prefs)[0] == pytest.approx(0.6)
+
+    prefs["keywords_boost"].append("Kubernetes")
+    assert score_job_rules_only(job, prefs)[0] == pytest.approx(0.65)
+
+
+def test_prefilter_agrees_with_full_scoring():
+    rng = random.Random(5)
+    for _ in range(100):
+        prefs = _random_prefs(rng)
+        for _ in range(20):
+            listing = {"title": _random_text(rng, 3), "location": _random_text(rng, 2)}
+            passed, reason = rules.prefilter_job(listing, prefs)
+            score, reasons = score_job_rules_only(dict(listing, description=_random_text(rng, 30)), prefs)
+
+            if passed:
+                assert reason is None
+                assert score > 0
+            else:
+                # Whatever the description says, a prefiltered title scores 0 for the same reason
+                assert (score, reasons) == (0.0, [reason])
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Senior Security Engineer", (True, None)),
+    ("Security Engineering Manager", (False, "Rejected: Title contains blocked word 'Manager'")),
+    ("Security Sales Engineer", (False, "Rejected: Title contains excluded keyword 'sales'")),
+    ("Data Scientist", (False, "Rejected: Title did not match allowlist")),
+])
+def test_prefilter_job(title, expected):
+    prefs = {"title_allowlist": ["Security"], "title_blocklist": ["Manager"], "keywords_exclude": ["sales"]}
+
+    assert rules.prefilter_job({"title": title}, prefs) == expected
@@ -0,0 +1,156 @@
+import pytest
+
+from matchers.rules import score_jobs
+from matchers.salary import SALARY_VERSION, Salary, extract_salary, parse_base_salary, salary_for_job
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Salary: $150k–$190k", (150_000, 190_000, "USD", "year")),
+    ("Pay: $150-190k per year", (150_000, 190_000, "USD", "year")),
+    ("The base salary range for this role is $120,000 - $160,000.", (120_000, 160_000, "USD", "year")),
+    ("USD 150,000 - 190,000 per year", (150_000, 190_000, "USD", "year")),
+    ("$150,000 - $190,000 base salary", (150_000, 190_000, "USD", "year")),
+    ("$45/hr", (45, 45, "USD", "hour")),
+    ("Pay rate $45 - $60 per hour", (45, 60, "USD", "hour")),
+    ("€60,000 per year", (60_000, 60_000, "EUR", "year")),
+    ("Compensation: GBP 70,000", (70_000, 70_000, "GBP", "year")),
+    ("$8,000 per month", (8_000, 8_000, "USD", "month")),
+    ("Salary $150k + equity", (150_000, 150_000, "USD", "year")),
+    ("Our team of 45 engineers; salary $160k", (160_000, 160_000, "USD", "year")),
+])
+def test_extract_salary(text, expected):
+    salary = extract_salary(text)
+    assert (salary.min_amount, salary.max_amount, salary.currency, salary.period) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "$40 per diem",
+    "$99 gym stipend",
+    "$500 home office budget",
+    "$2M seed round",
+    "We raised $150M in our Series B",
+    "Bonus: $20k",
+    "great 401k match and salary",
+    "competitive salary, 401(k) plan",
+    "5,000 employees",
+    # No salary word and no pay period: unknown rather than guessed
+    "$150k–$190k",
+    "Pay rate: $45 - $60",
+    "$20",
+])
+def test_extract_salary_ignores_non_salary_amounts(text):
+    assert extract_salary(text) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Travel: $40 per diem. Compensation: $180,000–$220,000 base.", (180_000, 220_000)),
+    ("We offer $180,000–$220,000 base plus a $40 per diem.", (180_000, 220_000)),
+    ("Bonus: $20k. Salary: $150k", (150_000, 150_000)),
+    ("signing bonus of $25,000 and base salary of $170,000", (170_000, 170_000)),
+    ("Salary from $150,000. Pay range: $150,000 to $190,000", (150_000, 190_000)),
+])
+def test_extract_salary_prefers_the_stated_pay(text, expected):
+    salary = extract_salary(text)
+    assert (salary.min_amount, salary.max_amount) == expected
+
+
+def test_salary_describe_is_annualized():
+    assert Salary(150_000, 150_000, "USD").describe() == "$150,000"
+    assert Salary(45, 60, None, "hour").describe() == "$93,600–$124,800"
+    assert Salary(60_000, 60_000, "EUR").describe() == "EUR 60,000"
+
+
+@pytest.mark.parametrize("base_salary, expected", [
+    ({"@type": "MonetaryAmount", "currency": "USD",
+      "value": {"@type": "QuantitativeValue", "minValue": 150000, "maxValue": 190000, "unitText": "YEAR"}},
+     (150_000, 190_000, "USD", "year")),
+    ({"currency": "usd", "value": {"minValue": "60", "maxValue": "80", "unitText": "HOUR"}},
+     (60, 80, "USD", "hour")),
+    ({"currency": "EUR", "value": {"value": "70,000"}}, (70_000, 70_000, "EUR", "year")),
+    ({"currency": "USD", "value": 120000}, (120_000, 120_000, "USD", "year")),
+    ("Salary: $150,000 per year", (150_000, 150_000, "USD", "year")),
+])
+def test_parse_base_salary(base_salary, expected):
+    salary = parse_base_salary(base_salary)
+    assert (salary.min_amount, salary.max_amount, salary.currency, salary.period) == expected
+
+
+@pytest.mark.parametrize("base_salary", [
+    None,
+    {},
+    {"currency": "USD", "value": {"unitText": "YEAR"}},
+    {"currency": "USD", "value": {"minValue": 40, "unitText": "YEAR"}},
+])
+def test_parse_base_salary_rejects_missing_or_implausible(base_salary):
+    assert parse_base_salary(base_salary) is None
+
+
+def test_salary_for_job_stores_the_result():
+    job = {"title": "Engineer", "description": "Base salary $170,000 per year"}
+
+    salary = salary_for_job(job)
+
+    assert salary.annual_max == 170_000
+    assert job["salary_version"] == SALARY_VERSION
+    assert (job["salary_min"], job["salary_max"], job["salary_currency"]) == (170_000, 170_000, "USD")
+    # Stored fields are used as they are, without parsing the text again
+    job["description"] = "Base salary $90,000 per year"
+    assert salary_for_job(job).annual_max == 170_000
+
+
+def test_salary_for_job_reparses_older_versions():
+    job = {"title": "Engineer", "description": "Base salary $170,000 per year",
+           "salary_version": "0", "salary_min": 83_200, "salary_max": 83_200, "salary_currency": "USD",
+           "salary_period": "year"}
+
+    assert salary_for_job(job).annual_max == 170_000
+
+
+def test_salary_for_job_prefers_structured_base_salary():
+    job = {"title": "Engineer", "description": "Salary $90,000",
+           "base_salary": {"currency": "USD", "value": {"minValue": 150000, "maxValue": 190000}}}
+
+    assert (salary_for_job(job).min_amount, salary_for_job(job).max_amount) == (150_000, 190_000)
+
+
+PREFS = {"title_allowlist": ["Security Engineer"], "salary_floor_usd": 150_000, "use_llm": False}
+
+
+def test_perk_amount_does_not_reject_a_posting_with_a_salary():
+    job = {"title": "Security Engineer", "location": "Remote",
+           "description": "Meals: $40 per diem while travelling. Compensation: $180,000–$220,000 base."}
+
+    (score, reasons, _), = score_jobs([job], PREFS, use_llm=False)
+
+    assert score > 0
+    assert "Salary $180,000–$220,000 meets requirements" in reasons
+
+
+def test_unclear_amount_counts_as_unknown_salary():
+    job = {"title": "Security Engineer", "location": "Remote",
+           "description": "Every engineer gets a $99 gym stipend and a $500 home office budget."}
+
+    (score, reasons, _), = score_jobs([job], PREFS, use_llm=False)
+
+    assert score > 0
+    assert not any("Salary" in reason for reason in reasons)
+
+
+def test_salary_below_floor_is_rejected():
+    job = {"title": "Security Engineer", "location": "Remote", "description": "Salary: $100k-$120k"}
+
+    (score, reasons, _), = score_jobs([job], PREFS, use_llm=False)
+
+    assert score == 0.0
+    assert reasons == ["Rejected: Salary $100,000–$120,000 below floor $150,000"]
+
+
+def test_prefs_version_tracks_scoring_prefs_and_parser(monkeypatch):
+    from matchers import rules
+
+    version = rules.prefs_version(PREFS)
+    assert rules.prefs_version(dict(PREFS, immediate_alert_threshold=0.5)) == version
+    assert rules.prefs_version(dict(PREFS, salary_floor_usd=120_000)) != version
+
+    monkeypatch.setattr(rules, "SALARY_VERSION", "next")
+    assert rules.prefs_version(PREFS) != version
@@ -0,0 +1,70 @@
+from sources import workday
+
+BOARD = "https://acme.wd5.myworkdayjobs.com/en-US/External"
+
+
+def _install(monkeypatch, postings):
+    """Serve postings from the CXS search endpoint, recording the offsets requested."""
+    offsets = []
+
+    def fetch_url(url, json_body=None):
+        offsets.append(json_body["offset"])
+        page = postings[json_body["offset"]:json_body["offset"] + json_body["limit"]]
+        return {"jobPostings": page, "total": len(postings)}
+
+    monkeypatch.setattr(workday, "fetch_url", fetch_url)
+    return offsets
+
+
+def _postings(ages):
+    return [
+        {"title": f"Job {index}", "externalPath": f"/job/{index}", "bulletFields": [f"R{index}"],
+         "locationsText": "Remote", "postedOn": f"Posted {age} Days Ago"}
+        for index, age in enumerate(ages)
+    ]
+
+
+def _known_after(count):
+    """A seen_lookup that knows every listing from the count-th posting on."""
+    known = set()
+
+    def seen_lookup(hashes):
+        return {listing_hash for listing_hash in hashes if listing_hash in known}
+
+    def learn(listings):
+        known.update(listing["listing_hash"] for listing in listings[count:])
+
+    return seen_lookup, learn
+
+
+def test_paging_stops_at_a_page_of_known_postings(monkeypatch):
+    postings = _postings(range(60))
+    _install(monkeypatch, postings)
+    seen_lookup, learn = _known_after(20)
+    learn(workday.list_jobs(BOARD))
+    offsets = _install(monkeypatch, postings)
+
+    listings = workday.list_jobs(BOARD, seen_lookup=seen_lookup)
+
+    assert offsets == [0, 20]
+    assert len(listings) == 40
+
+
+def test_paging_continues_when_postings_are_not_newest_first(monkeypatch):
+    postings = _postings([0] * 10 + [5] * 5 + [1] * 5 + [30] * 40)
+    _install(monkeypatch, postings)
+    seen_lookup, learn = _known_after(20)
+    learn(workday.list_jobs(BOARD))
+    offsets = _install(monkeypatch, postings)
+
+    listings = workday.list_jobs(BOARD, seen_lookup=seen_lookup)
+
+    assert offsets == [0, 20, 40]
+    assert len(listings) == 60
+
+
+def test_posted_days_ago():
+    assert workday._posted_days_ago({"postedOn": "Posted Today"}) == 0
+    assert workday._posted_days_ago({"postedOn": "Posted Yesterday"}) == 1
+    assert workday._posted_days_ago({"postedOn": "Posted 30+ Days Ago"}) == 30
+    assert workday._posted_days_ago({}) is None
@@ -0,0 +1,221 @@
+"""
+Shared Chromium browser with a bounded pool of reusable pages.
+
+Launching Chromium costs far more than rendering a single job posting, so one
+browser is kept alive for the whole poll cycle (or the whole daemon lifetime)
+and every scraper borrows pages from it. Playwright objects are bound to the
+event loop that created them, so the browser lives on a dedicated background
+thread with its own loop; callers on any thread or loop submit work to it.
+"""
+
+import asyncio
+import atexit
+import threading
+from typing import Dict, Iterable, Optional
+
+from playwright.async_api import async_playwright
+
+from utils.logging import get_logger
+from utils.errors import ScrapingException
+from utils.scraping import rate_limiter, parse_retry_after, check_robots_async
+
+logger = get_logger("browser")
+
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-features=VizDisplayCompositor'
+]
+
+# Time for an infinite-scroll page to load the next batch after each scroll
+SCROLL_PAUSE_MS = 1500
+
+
+class BrowserPool:
+    """Long-lived headless Chromium with a fixed number of reusable pages."""
+
+    def __init__(self, max_pages: int = 4):
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._playwright = None
+        self._browser = None
+        self._pages: Optional[asyncio.Queue] = None
+        self.pages_rendered = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None
+
+    def start(self):
+        """Launch the browser thread and Chromium if not already running."""
+        with self._lock:
+            if self._browser is not None:
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="browser-pool", daemon=True
+            )
+            self._thread.start()
+
+            try:
+                asyncio.run_coroutine_threadsafe(self._launch(), self._loop).result()
+            except Exception as e:
+                self._stop_loop()
+                raise ScrapingException("", "", f"Failed to launch browser: {e}", e)
+
+            logger.info(f"Browser pool started with {self.max_pages} pages")
+
+    async def _launch(self):
+        self._playwright = await async_playwright().start()
+        try:
+            self._browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+        except Exception:
+            await self._playwright.stop()
+            raise
+        self._pages = asyncio.Queue()
+        for _ in range(max(1, self.max_pages)):
+            await self._pages.put(await self._new_page())
+
+    async def _new_page(self):
+        """Create a page in its own context so cookies never leak between boards."""
+        context = await self._browser.new_context(viewport={"width": 1920, "height": 1080})
+        return await context.new_page()
+
+    def close(self):
+        """Shut down Chromium and the browser thread."""
+        with self._lock:
+            if self._browser is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=30)
+            except Exception as e:
+                logger.warning(f"Error while closing browser pool: {e}")
+            self._stop_loop()
+            logger.info(f"Browser pool closed after rendering {self.pages_rendered} pages")
+
+    async def _shutdown(self):
+        try:
+            await self._browser.close()
+        finally:
+            await self._playwright.stop()
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        self._browser = None
+        self._playwright = None
+        self._pages = None
+
+    def _submit(self, coro_func, *args):
+        # Start first so a failed launch never leaves an un-awaited coroutine behind
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro_func(*args), self._loop)
+
+    async def _render(self, url: str, wait_for_selector: str = None, timeout: int = 30000, scrolls: int = 0) -> str:
+        """
+        Render a URL on a pooled page. Runs on the browser thread.
+
+        With scrolls > 0 the page is scrolled to the bottom up to that many
+        times, so infinite-scroll listings load more items before capture.
+        """
+        domain = rate_limiter.get_domain(url)
+        await check_robots_async(url)
+        await rate_limiter.wait_if_needed(url)
+
+        page = await self._pages.get()
+        try:
+            logger.debug(f"Loading page with Playwright: {url}")
+            response = await page.goto(url, timeout=timeout, wait_until='domcontentloaded')
+
+            if response and response.status >= 400:
+                rate_limiter.record_request(
+                    domain, success=False, overloaded=response.status == 429 or response.status >= 500,
+                    retry_after=parse_retry_after(response.headers.get('retry-after'))
+                )
+                raise ScrapingException(domain, url, f"HTTP {response.status}")
+
+            if wait_for_selector:
+                try:
+                    await page.wait_for_selector(wait_for_selector, timeout=10000)
+                except Exception as e:
+                    logger.warning(f"Selector '{wait_for_selector}' not found on {url}: {e}")
+
+            if scrolls:
+                await self._scroll_to_end(page, scrolls)
+
+            content = await page.content()
+            rate_limiter.record_request(domain, success=True)
+            self.pages_rendered += 1
+            return content
+
+        except ScrapingException:
+            raise
+        except Exception as e:
+            rate_limiter.record_request(domain, success=False)
+            # A crashed or wedged page is replaced rather than returned to the pool
+            try:
+                await page.context.close()
+                page = await self._new_page()
+            except Exception:
+                pass
+            raise ScrapingException(domain, url, str(e), e)
+        finally:
+            self._pages.put_nowait(page)
+
+    async def _scroll_to_end(self, page, scrolls: int):
+        """Scroll until the page stops growing or `scrolls` is exhausted."""
+        height = await page.evaluate("document.body.scrollHeight")
+        for _ in range(scrolls):
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await page.wait_for_timeout(SCROLL_PAUSE_MS)
+            new_height = await page.evaluate("document.body.scrollHeight")
+            if new_height == height:
+                break
+            height = new_height
+
+    def fetch(self, url: str, wait_for_selector: str = None, timeout: int = 30000, scrolls: int = 0) -> str:
+        """Render a URL and return its HTML (blocking)."""
+        return self._submit(self._render, url, wait_for_selector, timeout, scrolls).result()
+
+    async def fetch_async(self, url: str, wait_for_selector: str = None, timeout: int = 30000,
+                          scrolls: int = 0) -> str:
+        """Render a URL and return its HTML from any event loop."""
+        return await asyncio.wrap_future(self._submit(self._render, url, wait_for_selector, timeout, scrolls))
+
+    def fetch_many(self, urls: Iterable[str], wait_for_selector: str = None,
+                   timeout: int = 30000) -> Dict[str, Optional[str]]:
+        """
+        Render many URLs concurrently across the page pool (blocking).
+
+        Returns a mapping of URL to HTML; URLs that failed map to None.
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        return self._submit(self._render_many, urls, wait_for_selector, timeout).result()
+
+    async def _render_many(self, urls, wait_for_selector, timeout) -> Dict[str, Optional[str]]:
+        results = await asyncio.gather(
+            *(self._render(url, wait_for_selector, timeout) for url in urls),
+            return_exceptions=True
+        )
+        content = {}
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to load {url} with Playwright: {result}")
+                content[url] = None
+            else:
+                content[url] = result
+        return content
+
+
+# Global browser pool instance
+browser_pool = BrowserPool()
+atexit.register(browser_pool.close)
@@ -22,7 +22,7 @@ class CompanyConfig:
     board_type: str
     url: str
     fetch_descriptions: bool = True
-    custom_selectors: Optional[Dict[str, str]] = None
+    custom_selectors: Optional[Dict[str, Any]] = None
 
     def __post_init__(self):
         """Validate company configuration."""
@@ -47,8 +47,11 @@ class CompanyConfig:
 class ScrapingConfig:
     """Configuration for scraping behavior."""
     max_companies_per_run: int = 10
+    max_concurrent_companies: int = 5
+    max_browser_pages: int = 4
     fetch_descriptions: bool = True
     timeout_seconds: int = 30
+    max_response_mb: int = 10
     max_retries: int = 3
     respect_robots_txt: bool = True
     user_agent: str = "Mozilla/5.0 (compatible; JobScraper/1.0)"
@@ -268,9 +271,13 @@ class ConfigManager:
 
         return ScrapingConfig(
             max_companies_per_run=self._config_data.get('max_companies_per_run', 10),
+            max_concurrent_companies=self._config_data.get('max_concurrent_companies', 5),
+            max_browser_pages=self._config_data.get('max_browser_pages', 4),
             fetch_descriptions=self._config_data.get('fetch_descriptions', True),
             timeout_seconds=self._config_data.get('timeout_seconds', 30),
-            max_retries=self._config_data.get('max_retries', 3)
+            max_response_mb=self._config_data.get('max_response_mb', 10),
+            max_retries=self._config_data.get('max_retries', 3),
+            respect_robots_txt=self._config_data.get('respect_robots_txt', True)
         )
 
 
@@ -0,0 +1,175 @@
+"""
+Content-addressed on-disk cache for job description pages.
+
+Posting pages rarely change once they are live, so fetched HTML and the text
+extracted from it are kept under data/description_cache. Blobs are stored
+gzip-compressed and named by the SHA-256 of their content, so identical pages
+(e.g. the same posting linked from two boards) are stored once. An index in
+the state store maps each key to its blob:
+
+- pages are keyed by URL, so an extractor change re-extracts without refetching
+- extracted text is keyed by URL plus the extractor version
+
+Entries expire after a TTL, and the least recently used ones are evicted once
+the cache grows past its size limit.
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from utils.logging import get_logger
+from utils.state import CacheCounters, StateStore, prune_cache_table, state_store
+
+logger = get_logger("description_cache")
+
+CACHE_DIR = "data/description_cache"
+KIND_PAGE = "page"
+KIND_TEXT = "text"
+
+
+class DescriptionCache(CacheCounters):
+    """Compressed page/text cache with TTL, LRU eviction and hit/miss counters."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS description_cache (
+            key TEXT PRIMARY KEY,
+            blob_hash TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            stored_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_description_cache_accessed ON description_cache (accessed_at);
+        CREATE INDEX IF NOT EXISTS ix_description_cache_blob ON description_cache (blob_hash);
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, store: StateStore = None,
+                 ttl_seconds: float = None, max_bytes: int = None):
+        super().__init__()
+        self.cache_dir = Path(cache_dir)
+        self.store = store or state_store
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else \
+            float(os.getenv("DESCRIPTION_CACHE_TTL_DAYS", "14")) * 86400
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.getenv("DESCRIPTION_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+    @staticmethod
+    def _key(kind: str, url: str, version: str = "") -> str:
+        return f"{kind}:{version}:{url}" if version else f"{kind}:{url}"
+
+    def _blob_path(self, blob_hash: str) -> Path:
+        return self.cache_dir / blob_hash[:2] / f"{blob_hash}.gz"
+
+    def _read(self, key: str) -> Optional[str]:
+        self.store.ensure_schema("description_cache", self.SCHEMA)
+        rows = self.store.query(
+            "SELECT blob_hash, stored_at FROM description_cache WHERE key = ?", (key,)
+        )
+        if not rows or time.time() - rows[0][1] > self.ttl_seconds:
+            return None
+        try:
+            data = gzip.decompress(self._blob_path(rows[0][0]).read_bytes()).decode("utf-8")
+        except (OSError, EOFError, UnicodeDecodeError):
+            # Blob went missing or is damaged; treat as a miss and let put() replace it
+            return None
+        self.store.execute("UPDATE description_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return data
+
+    def _write(self, key: str, content: str):
+        raw = content.encode("utf-8")
+        blob_hash = hashlib.sha256(raw).hexdigest()
+        path = self._blob_path(blob_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(gzip.compress(raw))
+            os.replace(tmp_path, path)
+
+        now = time.time()
+        self.store.ensure_schema("description_cache", self.SCHEMA)
+        self.store.execute(
+            "INSERT OR REPLACE INTO description_cache (key, blob_hash, size, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, blob_hash, path.stat().st_size, now, now)
+        )
+
+    def get_text(self, url: str, version: str, extract) -> Optional[str]:
+        """
+        Cached description text for a URL, or None on a miss.
+
+        When only the page is cached (the extractor version changed), the text
+        is re-extracted with `extract(html)` and cached under the new version.
+        """
+        try:
+            text = self._read(self._key(KIND_TEXT, url, version))
+            if text is None:
+                page = self._read(self._key(KIND_PAGE, url))
+                if page is not None:
+                    text = extract(page)
+                    if text:
+                        self._write(self._key(KIND_TEXT, url, version), text)
+        except sqlite3.Error as e:
+            logger.warning(f"Description cache lookup failed for {url}: {e}")
+            text = None
+
+        self.count_lookup(bool(text))
+        return text or None
+
+    def get_texts(self, urls: Iterable[str], version: str, extract) -> Dict[str, str]:
+        """Cached description texts for the URLs that have one."""
+        texts = {}
+        for url in urls:
+            text = self.get_text(url, version, extract)
+            if text:
+                texts[url] = text
+        return texts
+
+    def put(self, url: str, version: str, page: Optional[str], text: str):
+        """Cache a fetched page and the text extracted from it."""
+        if not text:
+            return
+        try:
+            if page:
+                self._write(self._key(KIND_PAGE, url), page)
+            self._write(self._key(KIND_TEXT, url, version), text)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not cache description for {url}: {e}")
+
+    def prune(self) -> int:
+        """Drop expired entries, then evict least recently used ones down to the size limit."""
+        try:
+            self.store.ensure_schema("description_cache", self.SCHEMA)
+            with self.store.transaction() as conn:
+                expired, evicted = prune_cache_table(
+                    conn, "description_cache", time.time() - self.ttl_seconds, self.max_bytes
+                )
+                referenced = {row[0] for row in conn.execute("SELECT DISTINCT blob_hash FROM description_cache")}
+        except sqlite3.Error as e:
+            logger.warning(f"Description cache pruning failed: {e}")
+            return 0
+
+        # Blobs are shared between keys; only delete those no entry points to
+        removed_blobs = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*/*.gz"):
+                if path.stem not in referenced:
+                    try:
+                        path.unlink()
+                        removed_blobs += 1
+                    except OSError:
+                        pass
+
+        if expired or evicted:
+            logger.info(
+                f"Description cache pruned: {expired} expired, {evicted} evicted, {removed_blobs} blobs removed"
+            )
+        return expired + evicted
+
+
+# Global description cache instance
+description_cache = DescriptionCache()
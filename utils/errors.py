@@ -43,4 +43,16 @@ class RateLimitException(JobScraperException):
         message = f"Rate limited by {domain}"
         if retry_after:
             message += f", retry after {retry_after} seconds"
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+class NotModifiedException(JobScraperException):
+    """Raised when a conditional fetch finds the content unchanged since the last poll."""
+    def __init__(self, url: str):
+        self.url = url
+        super().__init__(f"Content at {url} has not changed since the last poll")
+
+class RobotsDisallowedException(JobScraperException):
+    """Raised instead of fetching a URL that the site's robots.txt disallows."""
+    def __init__(self, url: str):
+        self.url = url
+        super().__init__(f"robots.txt disallows fetching {url}")
@@ -0,0 +1,227 @@
+"""
+HTTP-first page fetching that escalates to the browser only when needed.
+
+Most job posting pages are server-rendered, and a plain GET costs a tiny
+fraction of a Chromium render. The fetcher tries the GET first and checks
+whether the content we want (a CSS/XPath selector, or a schema.org JobPosting
+when no selector is given) is in the static HTML. Only pages without it are
+rendered. The outcome is remembered per domain and selector in the state
+store, since a site's listing pages may need rendering while its posting
+pages do not; later runs send render-only pages straight to the browser
+without probing.
+"""
+
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional
+
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
+
+from utils.browser import browser_pool
+from utils.errors import RobotsDisallowedException
+from utils.logging import get_logger
+from utils.scraping import web_scraper, rate_limiter
+from utils.state import StateStore, state_store
+
+logger = get_logger("fetcher")
+
+MODE_STATIC = "static"
+MODE_RENDER = "render"
+
+# Render-only domains are probed again after this long, in case they changed
+REPROBE_INTERVAL_SECONDS = 7 * 24 * 3600
+
+
+class AdaptiveFetcher:
+    """Fetches pages over HTTP or in the browser, learning which each domain and selector needs."""
+
+    # Replaces fetch_modes, which was keyed by domain only
+    SCHEMA = """
+        DROP TABLE IF EXISTS fetch_modes;
+        CREATE TABLE IF NOT EXISTS selector_fetch_modes (
+            domain TEXT NOT NULL,
+            selector TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            probed_at REAL NOT NULL,
+            PRIMARY KEY (domain, selector)
+        );
+    """
+
+    def __init__(self, store: StateStore = None):
+        self.store = store or state_store
+        self.modes: Dict[str, tuple] = {}
+        self.static_pages = 0
+        self.rendered_pages = 0
+        self._checks: Dict[str, etree.XPath] = {}
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        """Load learned fetch modes on first use."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            self.store.ensure_schema("selector_fetch_modes", self.SCHEMA)
+            for domain, selector, mode, probed_at in self.store.query(
+                "SELECT domain, selector, mode, probed_at FROM selector_fetch_modes"
+            ):
+                self.modes[(domain, selector)] = (mode, probed_at)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not load learned fetch modes: {e}")
+
+    def get_mode(self, domain: str, selector: str = None) -> Optional[str]:
+        """The learned mode for a domain's pages checked against a selector, or None if they should be probed."""
+        self._ensure_loaded()
+        mode, probed_at = self.modes.get((domain, selector or ""), (None, 0.0))
+        if mode == MODE_RENDER and time.time() - probed_at > REPROBE_INTERVAL_SECONDS:
+            return None
+        return mode
+
+    def record_mode(self, domain: str, mode: str, selector: str = None):
+        """Remember how a domain's pages have to be fetched to find a selector."""
+        self._ensure_loaded()
+        key = (domain, selector or "")
+        previous = self.modes.get(key, (None, 0.0))[0]
+        now = time.time()
+        self.modes[key] = (mode, now)
+        if previous != mode:
+            logger.info(f"Fetch mode for {domain} ({selector or 'JobPosting'}): {mode}")
+        try:
+            self.store.execute(
+                "INSERT OR REPLACE INTO selector_fetch_modes (domain, selector, mode, probed_at) VALUES (?, ?, ?, ?)",
+                (*key, mode, now)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist fetch mode for {domain}: {e}")
+
+    def _compile_check(self, selector: str) -> Optional[etree.XPath]:
+        if selector not in self._checks:
+            try:
+                if selector.startswith('xpath:'):
+                    self._checks[selector] = etree.XPath(selector[len('xpath:'):])
+                else:
+                    self._checks[selector] = CSSSelector(selector)
+            except Exception as e:
+                logger.warning(f"Cannot check selector '{selector}' in static HTML: {e}")
+                self._checks[selector] = None
+        return self._checks[selector]
+
+    def has_wanted_content(self, content: Optional[str], selector: str = None) -> bool:
+        """Whether HTML already contains the wanted selector (or a JobPosting if none)."""
+        if not content or not content.strip():
+            return False
+        if not selector:
+            return 'application/ld+json' in content and 'JobPosting' in content
+
+        check = self._compile_check(selector)
+        if check is None:
+            return False
+        try:
+            document = lxml_html.fromstring(content)
+        except (etree.ParserError, ValueError):
+            return False
+        return any(
+            not isinstance(match, etree._Element) or match.text_content().strip()
+            for match in check(document)
+        )
+
+    def _fetch_static(self, url: str) -> Optional[str]:
+        try:
+            response = web_scraper.fetch_url(url)
+        except RobotsDisallowedException:
+            # Rendering would be disallowed just the same
+            raise
+        except Exception as e:
+            # Includes exhausted retries; the browser gets its own attempt
+            logger.debug(f"Static fetch failed for {url}: {e}")
+            return None
+        if 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return None
+        return response.text
+
+    def fetch(self, url: str, selector: str = None, force_render: bool = False, scrolls: int = 0) -> str:
+        """Fetch one page, rendering it only if the static HTML lacks the wanted content."""
+        domain = rate_limiter.get_domain(url)
+        mode = self.get_mode(domain, selector)
+        probe = not force_render and not scrolls and mode != MODE_RENDER
+
+        if probe:
+            content = self._fetch_static(url)
+            if self.has_wanted_content(content, selector):
+                self.static_pages += 1
+                self.record_mode(domain, MODE_STATIC, selector)
+                return content
+
+        content = browser_pool.fetch(url, wait_for_selector=self._wait_target(selector), scrolls=scrolls)
+        self.rendered_pages += 1
+        if probe and mode is None and self.has_wanted_content(content, selector):
+            self.record_mode(domain, MODE_RENDER, selector)
+        return content
+
+    def fetch_many(self, urls: Iterable[str], selector: str = None) -> Dict[str, Optional[str]]:
+        """
+        Fetch many pages, returning a mapping of URL to HTML (None on failure
+        or when robots.txt disallows the page).
+
+        Every page on a domain not known to need rendering is probed over
+        HTTP, and only the pages whose probe misses the wanted content are
+        rendered. A domain not yet known to be static is remembered as
+        render-only when rendering found the content and none of its pages in
+        the batch were served statically.
+        """
+        urls = list(dict.fromkeys(urls))
+        results: Dict[str, Optional[str]] = {}
+        to_render = []
+        static_domains = set()
+        disallowed = 0
+
+        for url in urls:
+            domain = rate_limiter.get_domain(url)
+            if self.get_mode(domain, selector) == MODE_RENDER:
+                to_render.append(url)
+                continue
+
+            try:
+                content = self._fetch_static(url)
+            except RobotsDisallowedException as e:
+                # Only this page is off limits; the rest of the batch is kept
+                logger.info(f"Skipping {url}: {e}")
+                results[url] = None
+                disallowed += 1
+                continue
+            if self.has_wanted_content(content, selector):
+                results[url] = content
+                self.static_pages += 1
+                if domain not in static_domains:
+                    self.record_mode(domain, MODE_STATIC, selector)
+                    static_domains.add(domain)
+            else:
+                to_render.append(url)
+
+        if to_render:
+            rendered = browser_pool.fetch_many(to_render, wait_for_selector=self._wait_target(selector))
+            for url, content in rendered.items():
+                results[url] = content
+                if content is None:
+                    continue
+                self.rendered_pages += 1
+                # Domains known to serve static pages keep being probed; one odd page does not flip them
+                domain = rate_limiter.get_domain(url)
+                if self.get_mode(domain, selector) is None and self.has_wanted_content(content, selector):
+                    self.record_mode(domain, MODE_RENDER, selector)
+
+        if urls:
+            logger.debug(
+                f"Fetched {len(urls) - len(to_render) - disallowed} pages over HTTP, rendered {len(to_render)}"
+            )
+        return results
+
+    @staticmethod
+    def _wait_target(selector: Optional[str]) -> Optional[str]:
+        # Playwright waits on CSS; XPath checks only apply to the static probe
+        return None if not selector or selector.startswith('xpath:') else selector
+
+
+# Global adaptive fetcher instance
+adaptive_fetcher = AdaptiveFetcher()
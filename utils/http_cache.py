@@ -0,0 +1,149 @@
+"""
+HTTP validator cache for conditional GETs of board listing endpoints.
+
+For each listing URL we keep the server's ETag / Last-Modified and a hash of
+the last body we processed. A 304, or a 200 whose body hashes the same, means
+the board has not changed and the company can be skipped for this poll.
+
+New validators are only committed once the company has been fully processed,
+so a poll that fails half-way is retried in full next time rather than
+skipped as "unchanged". They are also stored with the scoring preferences
+version of that poll and ignored under any other, since listings rejected
+under old preferences have to be looked at again.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from utils.logging import get_logger
+from utils.state import StateStore, state_store
+
+logger = get_logger("http_cache")
+
+# Validators older than this are ignored, so every board gets a full poll at
+# least once a day and its listings' last_seen keeps advancing
+VALIDATOR_MAX_AGE_SECONDS = 24 * 3600
+
+
+class ValidatorCache:
+    """Per-URL ETag / Last-Modified / body hash and prefs version, persisted in the state store."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS http_validators (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            body_hash TEXT NOT NULL,
+            stored_at REAL NOT NULL,
+            prefs_version TEXT
+        );
+    """
+
+    def __init__(self, store: StateStore = None, max_age_seconds: float = VALIDATOR_MAX_AGE_SECONDS):
+        self.store = store or state_store
+        self.max_age_seconds = max_age_seconds
+        self._local = threading.local()
+        self._deferred: Dict[str, tuple] = {}
+        self._deferred_lock = threading.Lock()
+        self._migrated = False
+
+    def _ensure_schema(self):
+        self.store.ensure_schema("http_validators", self.SCHEMA)
+        if not self._migrated:
+            # Tables created before validators were tied to a prefs version
+            columns = {row[1] for row in self.store.query("PRAGMA table_info(http_validators)")}
+            if "prefs_version" not in columns:
+                self.store.execute("ALTER TABLE http_validators ADD COLUMN prefs_version TEXT")
+            self._migrated = True
+
+    def get(self, url: str) -> Optional[Dict[str, str]]:
+        """
+        Stored validators for a URL, or None if absent, too old or stored under
+        another prefs version than the current track() scope.
+        """
+        try:
+            self._ensure_schema()
+            rows = self.store.query(
+                "SELECT etag, last_modified, body_hash, stored_at, prefs_version FROM http_validators WHERE url = ?",
+                (url,)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read HTTP validators for {url}: {e}")
+            return None
+
+        if not rows or time.time() - rows[0][3] > self.max_age_seconds:
+            return None
+        etag, last_modified, body_hash, _, prefs_version = rows[0]
+        if prefs_version != getattr(self._local, "prefs_version", None):
+            return None
+        return {"etag": etag, "last_modified": last_modified, "body_hash": body_hash}
+
+    @contextmanager
+    def track(self, prefs_version: str = None) -> Iterator[Dict[str, tuple]]:
+        """
+        Collect the validators seen by conditional fetches on this thread.
+
+        The yielded dict is filled in as fetches happen; pass it to commit()
+        once the fetched content has been processed successfully. Only
+        validators stored under the same prefs_version are sent.
+        """
+        pending: Dict[str, tuple] = {}
+        previous = getattr(self._local, "pending", None), getattr(self._local, "prefs_version", None)
+        self._local.pending, self._local.prefs_version = pending, prefs_version
+        try:
+            yield pending
+        finally:
+            self._local.pending, self._local.prefs_version = previous
+
+    def remember(self, url: str, etag: Optional[str], last_modified: Optional[str], body_hash: str):
+        """Queue validators from a fresh response for the current track() scope."""
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending[url] = (etag, last_modified, body_hash, self._local.prefs_version)
+
+    def discard(self, url: str):
+        """Drop a URL's queued validators, e.g. for a page of a multi-page listing."""
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending.pop(url, None)
+
+    def commit(self, pending: Dict[str, tuple]):
+        """Persist validators collected by track()."""
+        if not pending:
+            return
+        now = time.time()
+        try:
+            self._ensure_schema()
+            self.store.executemany(
+                "INSERT OR REPLACE INTO http_validators "
+                "(url, etag, last_modified, body_hash, stored_at, prefs_version) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (url, etag, last_modified, body_hash, now, prefs_version)
+                    for url, (etag, last_modified, body_hash, prefs_version) in pending.items()
+                ]
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist HTTP validators: {e}")
+
+    def defer(self, pending: Dict[str, tuple]):
+        """Hold validators until commit_deferred(), e.g. until new jobs are stored."""
+        with self._deferred_lock:
+            self._deferred.update(pending)
+
+    def commit_deferred(self):
+        """Persist and clear validators held by defer()."""
+        with self._deferred_lock:
+            pending, self._deferred = self._deferred, {}
+        self.commit(pending)
+
+    def discard_deferred(self):
+        """Forget validators held by defer(), so those boards are polled in full again."""
+        with self._deferred_lock:
+            self._deferred = {}
+
+
+# Global validator cache instance
+http_validators = ValidatorCache()
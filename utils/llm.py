@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 from utils.logging import get_logger
+from utils.llm_cache import llm_cache
 
 logger = get_logger("llm")
 
@@ -17,6 +18,9 @@ logger = get_logger("llm")
 LLM_ENABLED = False
 openai_client = None
 
+# Part of the result cache key: bump when the scoring prompts or their parsing change
+PROMPT_VERSION = "1"
+
 
 @dataclass
 class LLMConfig:
@@ -39,6 +43,7 @@ class LLMResult:
     summary: str
     tokens_used: int
     model_used: str
+    cached: bool = False
 
 
 class TokenTracker:
@@ -143,33 +148,62 @@ def get_llm_config() -> LLMConfig:
     )
 
 
-def create_scoring_prompt(job: Dict, preferences: Dict) -> str:
-    """Create a prompt for job scoring."""
-
-    # Extract preferences
-    title_allowlist = preferences.get('title_allowlist', [])
-    title_blocklist = preferences.get('title_blocklist', [])
-    keywords_boost = preferences.get('keywords_boost', [])
-    location_constraints = preferences.get('location_constraints', [])
+def _preferences_section(preferences: Dict) -> str:
+    """The candidate preferences block shared by the single and batch prompts."""
     salary_floor = preferences.get('salary_floor_usd')
+    salary = f"${salary_floor:,} USD" if salary_floor else "Not specified"
+    return f"""CANDIDATE PREFERENCES:
+- Desired Titles: {', '.join(preferences.get('title_allowlist', []))}
+- Avoid Titles: {', '.join(preferences.get('title_blocklist', []))}
+- Location Requirements: {', '.join(preferences.get('location_constraints', []))}
+- Minimum Salary: {salary} (if specified)
+- Preferred Keywords: {', '.join(preferences.get('keywords_boost', []))}"""
+
 
+def _job_section(job: Dict) -> str:
     # Truncate description to save tokens
-    description = job.get('description', '')[:1200]
+    description = (job.get('description') or '')[:1200]
+    return f"""Title: {job.get('title', 'N/A')}
+Company: {job.get('company', 'N/A')}
+Location: {job.get('location', 'N/A')}
+Description: {description}"""
+
+
+def _cache_key(job: Dict, preferences: Dict, model: str) -> str:
+    return llm_cache.key(_job_section(job), _preferences_section(preferences), model, PROMPT_VERSION)
+
+
+def _cached_result(key: str) -> Optional[LLMResult]:
+    """A cached LLMResult (costing no tokens now), or None."""
+    data = llm_cache.get(key)
+    if data is None:
+        return None
+    return LLMResult(
+        score=float(data.get('score', 0.0)),
+        reasons=data.get('reasons', []),
+        summary=data.get('summary', ''),
+        tokens_used=0,
+        model_used=data.get('model_used', ''),
+        cached=True
+    )
+
+
+def _cache_result(key: str, result: LLMResult):
+    llm_cache.put(
+        key,
+        {'score': result.score, 'reasons': result.reasons, 'summary': result.summary, 'model_used': result.model_used},
+        result.tokens_used
+    )
+
 
+def create_scoring_prompt(job: Dict, preferences: Dict) -> str:
+    """Create a prompt for job scoring."""
     prompt = f"""You are a job matching expert. Score this job posting for relevance to the candidate's preferences.
 
-CANDIDATE PREFERENCES:
-- Desired Titles: {', '.join(title_allowlist)}
-- Avoid Titles: {', '.join(title_blocklist)}
-- Location Requirements: {', '.join(location_constraints)}
-- Minimum Salary: ${salary_floor:,} USD (if specified)
-- Preferred Keywords: {', '.join(keywords_boost)}
+{_preferences_section(preferences)}
 
 JOB POSTING:
-Title: {job.get('title', 'N/A')}
-Company: {job.get('company', 'N/A')}
-Location: {job.get('location', 'N/A')}
-Description: {description}
+{_job_section(job)}
 
 INSTRUCTIONS:
 1. Score from 0.0 to 1.0 (1.0 = perfect match)
@@ -194,11 +228,18 @@ def score_job_with_llm(job: Dict, preferences: Dict) -> Optional[LLMResult]:
     if not LLM_ENABLED or not openai_client:
         return None
 
+    config = get_llm_config()
+
+    # Identical postings cost nothing, whatever the token budget
+    cache_key = _cache_key(job, preferences, config.model)
+    cached = _cached_result(cache_key)
+    if cached is not None:
+        logger.debug(f"LLM cache hit for '{job.get('title')}': {cached.score:.2f}")
+        return cached
+
     if not token_tracker.can_make_request():
         return None
 
-    config = get_llm_config()
-
     try:
         prompt = create_scoring_prompt(job, preferences)
 
@@ -235,6 +276,7 @@ def score_job_with_llm(job: Dict, preferences: Dict) -> Optional[LLMResult]:
             model_used=config.model
         )
 
+        _cache_result(cache_key, llm_result)
         logger.debug(f"LLM scored '{job.get('title')}': {llm_result.score:.2f} ({tokens_used} tokens)")
         return llm_result
 
@@ -246,6 +288,105 @@ def score_job_with_llm(job: Dict, preferences: Dict) -> Optional[LLMResult]:
         return None
 
 
+def create_batch_scoring_prompt(jobs: List[Dict], preferences: Dict) -> str:
+    """Create one prompt that scores several jobs against the same preferences."""
+    postings = "\n\n".join(f"JOB {index}:\n{_job_section(job)}" for index, job in enumerate(jobs))
+
+    return f"""You are a job matching expert. Score each job posting for relevance to the candidate's preferences.
+
+{_preferences_section(preferences)}
+
+JOB POSTINGS:
+{postings}
+
+INSTRUCTIONS:
+1. Score each job from 0.0 to 1.0 (1.0 = perfect match)
+2. Be strict about location and title requirements
+3. Penalize management/director roles unless specifically desired
+4. Boost for relevant keywords and technologies
+5. Consider salary if mentioned
+
+Return JSON format, with one entry per job and "id" set to its JOB number:
+{{
+    "results": [
+        {{"id": 0, "score": 0.85, "reasons": ["Title matches Product Security"], "summary": "Strong security role"}}
+    ]
+}}"""
+
+
+def score_jobs_with_llm(jobs: List[Dict], preferences: Dict) -> List[Optional[LLMResult]]:
+    """
+    Score jobs with grouped ChatGPT requests (LLM_BATCH_SIZE jobs per call).
+
+    Returns one entry per job, None where the job could not be scored. Jobs
+    found in the result cache are not sent. Each call's tokens are split
+    evenly across the jobs it scored.
+    """
+    results: List[Optional[LLMResult]] = [None] * len(jobs)
+    if not LLM_ENABLED or not openai_client or not jobs:
+        return results
+
+    config = get_llm_config()
+    batch_size = max(1, int(os.getenv('LLM_BATCH_SIZE', '10')))
+
+    cache_keys = [_cache_key(job, preferences, config.model) for job in jobs]
+    pending = []
+    for index, cache_key in enumerate(cache_keys):
+        results[index] = _cached_result(cache_key)
+        if results[index] is None:
+            pending.append(index)
+    if len(pending) < len(jobs):
+        logger.debug(f"LLM cache hits for {len(jobs) - len(pending)} of {len(jobs)} jobs")
+
+    for start in range(0, len(pending), batch_size):
+        if not token_tracker.can_make_request():
+            break
+
+        batch_indices = pending[start:start + batch_size]
+        batch = [jobs[index] for index in batch_indices]
+        try:
+            logger.debug(f"Sending {len(batch)} jobs to LLM for scoring")
+            response = openai_client.chat.completions.create(
+                model=config.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a precise job matching expert. Always return valid JSON."
+                    },
+                    {"role": "user", "content": create_batch_scoring_prompt(batch, preferences)}
+                ],
+                temperature=config.temperature,
+                max_tokens=config.max_tokens * len(batch),
+                response_format={"type": "json_object"}
+            )
+
+            result_data = json.loads(response.choices[0].message.content)
+            tokens_used = response.usage.total_tokens
+            token_tracker.record_usage(tokens_used)
+
+            for item in result_data.get('results', []):
+                index = int(item.get('id', -1))
+                if 0 <= index < len(batch):
+                    job_index = batch_indices[index]
+                    results[job_index] = LLMResult(
+                        score=float(item.get('score', 0.0)),
+                        reasons=item.get('reasons', []),
+                        summary=item.get('summary', ''),
+                        tokens_used=tokens_used // len(batch),
+                        model_used=config.model
+                    )
+                    _cache_result(cache_keys[job_index], results[job_index])
+
+            logger.debug(f"LLM scored {len(batch)} jobs ({tokens_used} tokens)")
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse LLM batch response as JSON: {e}")
+        except Exception as e:
+            logger.error(f"LLM batch scoring failed: {e}")
+
+    return results
+
+
 def create_hybrid_score(rules_score: float, rules_reasons: List[str],
                        llm_result: Optional[LLMResult],
                        rules_weight: float = 0.5) -> Tuple[float, List[str], Dict]:
@@ -298,7 +439,8 @@ def create_hybrid_score(rules_score: float, rules_reasons: List[str],
         "llm_used": True,
         "tokens_used": llm_result.tokens_used,
         "scoring_method": f"hybrid_{int(rules_weight*100)}r_{int(llm_weight*100)}ai",
-        "llm_summary": llm_result.summary
+        "llm_summary": llm_result.summary,
+        "llm_cached": llm_result.cached
     })
 
     return final_score, combined_reasons, metadata
@@ -312,7 +454,8 @@ def get_token_usage_stats() -> Dict:
         "requests_this_minute": token_tracker.requests_this_minute,
         "rpm_limit": token_tracker.max_rpm,
         "llm_enabled": LLM_ENABLED,
-        "can_make_request": token_tracker.can_make_request()
+        "can_make_request": token_tracker.can_make_request(),
+        "cache": llm_cache.get_stats()
     }
 
 
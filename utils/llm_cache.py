@@ -0,0 +1,125 @@
+"""
+Persistent cache of LLM scoring results.
+
+The same posting is often scored more than once: re-listed under a new URL or
+hash, seen on two boards, or scored again after a restart. Results are kept in
+the state store under a key built from what the model actually sees:
+
+- a fingerprint of the normalized posting (title, company, location and the
+  truncated description, case and whitespace folded)
+- a fingerprint of the preferences section of the prompt
+- the model name and the prompt template version
+
+so changing the preferences, the model or the prompt misses the cache instead
+of returning stale scores. Entries expire after a TTL, and the least recently
+used ones are evicted once the cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Optional
+
+from utils.logging import get_logger
+from utils.state import CacheCounters, StateStore, prune_cache_table, state_store
+
+logger = get_logger("llm_cache")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(text: str) -> str:
+    """SHA-256 of text with case and runs of whitespace folded."""
+    normalized = _WHITESPACE.sub(" ", text).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class LLMCache(CacheCounters):
+    """LLM results keyed by content, preferences, model and prompt version, with TTL and LRU eviction."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            result TEXT NOT NULL,
+            tokens INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            stored_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed ON llm_cache (accessed_at);
+    """
+
+    def __init__(self, store: StateStore = None, ttl_seconds: float = None, max_bytes: int = None):
+        super().__init__()
+        self.store = store or state_store
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else \
+            float(os.getenv("LLM_CACHE_TTL_DAYS", "30")) * 86400
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1024 * 1024)
+        self.tokens_saved = 0
+
+    @staticmethod
+    def key(job_text: str, preferences_text: str, model: str, prompt_version: str) -> str:
+        """Cache key for a posting as shown to the model, under given preferences, model and prompt."""
+        return f"{prompt_version}:{model}:{fingerprint(preferences_text)[:16]}:{fingerprint(job_text)}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """The cached result dict for a key, or None on a miss."""
+        result = None
+        try:
+            self.store.ensure_schema("llm_cache", self.SCHEMA)
+            rows = self.store.query("SELECT result, tokens, stored_at FROM llm_cache WHERE key = ?", (key,))
+            if rows and time.time() - rows[0][2] <= self.ttl_seconds:
+                result = json.loads(rows[0][0])
+                tokens = rows[0][1]
+                self.store.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            result = None
+
+        self.count_lookup(result is not None)
+        if result is not None:
+            with self._lock:
+                self.tokens_saved += tokens
+        return result
+
+    def put(self, key: str, result: Dict, tokens: int):
+        """Cache a result dict and the tokens it cost."""
+        data = json.dumps(result)
+        now = time.time()
+        try:
+            self.store.ensure_schema("llm_cache", self.SCHEMA)
+            self.store.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, result, tokens, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, tokens, len(key) + len(data), now, now)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not cache LLM result: {e}")
+
+    def prune(self) -> int:
+        """Drop expired entries, then evict least recently used ones down to the size limit."""
+        try:
+            self.store.ensure_schema("llm_cache", self.SCHEMA)
+            with self.store.transaction() as conn:
+                expired, evicted = prune_cache_table(
+                    conn, "llm_cache", time.time() - self.ttl_seconds, self.max_bytes
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache pruning failed: {e}")
+            return 0
+
+        if expired or evicted:
+            logger.info(f"LLM cache pruned: {expired} expired, {evicted} evicted")
+        return expired + evicted
+
+    def get_stats(self) -> Dict[str, float]:
+        """Hit/miss counters and tokens saved since start."""
+        return dict(super().get_stats(), tokens_saved=self.tokens_saved)
+
+
+# Global LLM result cache instance
+llm_cache = LLMCache()
@@ -14,6 +14,7 @@ from dataclasses import dataclass
 
 from utils.logging import get_logger
 from utils.errors import DatabaseException
+from utils.state import StateStore, state_store
 
 logger = get_logger("resilience")
 
@@ -176,40 +177,99 @@ class DatabaseResilience:
 
 
 class NetworkResilience:
-    """Handles network failures and connectivity issues."""
-
-    def __init__(self):
+    """
+    Handles network failures and connectivity issues.
+
+    Failure counts and backoff windows are persisted in the state store, so a
+    failing domain stays in backoff across cron ticks and concurrent processes
+    instead of being hammered again by every new run.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS network_backoff (
+            domain TEXT PRIMARY KEY,
+            consecutive_failures INTEGER NOT NULL,
+            backoff_until REAL NOT NULL
+        );
+    """
+
+    def __init__(self, store: StateStore = None):
+        self.store = store or state_store
         self.consecutive_failures = {}
         self.backoff_delays = {}
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        """Load persisted backoff state on first use."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            self.store.ensure_schema("network_backoff", self.SCHEMA)
+            for domain, failures, backoff_until in self.store.query(
+                "SELECT domain, consecutive_failures, backoff_until FROM network_backoff"
+            ):
+                self.consecutive_failures[domain] = failures
+                self.backoff_delays[domain] = backoff_until
+            if self.consecutive_failures:
+                logger.debug(f"Loaded backoff state for {len(self.consecutive_failures)} domains")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not load persisted network state: {e}")
 
     def record_failure(self, domain: str):
         """Record a network failure for a domain."""
-        self.consecutive_failures[domain] = self.consecutive_failures.get(domain, 0) + 1
+        self._ensure_loaded()
+        failures = self.consecutive_failures.get(domain, 0) + 1
+
+        try:
+            # Count from the stored value so concurrent processes add up correctly
+            with self.store.transaction() as conn:
+                row = conn.execute(
+                    "SELECT consecutive_failures FROM network_backoff WHERE domain = ?", (domain,)
+                ).fetchone()
+                failures = (row[0] if row else 0) + 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO network_backoff (domain, consecutive_failures, backoff_until) "
+                    "VALUES (?, ?, ?)",
+                    (domain, failures, time.time() + self._backoff_seconds(failures))
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist network failure for {domain}: {e}")
 
         # Calculate exponential backoff
-        failures = self.consecutive_failures[domain]
-        delay = min(300, 30 * (2 ** min(failures - 1, 4)))  # Max 5 minutes
+        delay = self._backoff_seconds(failures)
+        self.consecutive_failures[domain] = failures
         self.backoff_delays[domain] = time.time() + delay
 
         logger.warning(f"Network failure #{failures} for {domain}, backing off {delay}s")
 
+    @staticmethod
+    def _backoff_seconds(failures: int) -> int:
+        return min(300, 30 * (2 ** min(failures - 1, 4)))  # Max 5 minutes
+
     def record_success(self, domain: str):
         """Record a successful connection for a domain."""
-        if domain in self.consecutive_failures:
+        self._ensure_loaded()
+        # pop() rather than check-then-del: polls run this from worker threads
+        if self.consecutive_failures.pop(domain, None) is not None:
             logger.info(f"Network recovered for {domain}")
-            del self.consecutive_failures[domain]
+        self.backoff_delays.pop(domain, None)
 
-        if domain in self.backoff_delays:
-            del self.backoff_delays[domain]
+        try:
+            self.store.execute("DELETE FROM network_backoff WHERE domain = ?", (domain,))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist network recovery for {domain}: {e}")
 
     def should_skip_domain(self, domain: str) -> bool:
         """Check if domain should be skipped due to backoff."""
+        self._ensure_loaded()
         if domain in self.backoff_delays:
             return time.time() < self.backoff_delays[domain]
         return False
 
     def get_failure_count(self, domain: str) -> int:
         """Get consecutive failure count for domain."""
+        self._ensure_loaded()
         return self.consecutive_failures.get(domain, 0)
 
 
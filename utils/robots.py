@@ -0,0 +1,250 @@
+"""
+robots.txt rules, fetched once per domain per day and kept in the state store.
+
+Each domain's robots.txt is parsed down to the group that applies to us (our
+product token, else "*"): its Allow/Disallow patterns and Crawl-delay. The
+parsed rules are stored as JSON, so other runs and worker processes reuse
+them without refetching, and checking a URL is a regex match in memory.
+
+Fetch outcomes follow RFC 9309: a 4xx means there are no rules, while a 5xx
+or an unreachable server means everything is disallowed until the next
+attempt (or the last good copy is kept, if there is one).
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from utils.logging import get_logger
+from utils.state import StateStore, state_store
+
+logger = get_logger("robots")
+
+# Product token matched against User-agent lines
+ROBOTS_AGENT = "JobScraper"
+ROBOTS_TTL_SECONDS = 24 * 3600
+# An unreachable robots.txt blocks the domain only this long before retrying
+ROBOTS_RETRY_SECONDS = 15 * 60
+ROBOTS_TIMEOUT_SECONDS = 10
+# RFC 9309: crawlers must parse at least 500 KiB and may ignore the rest
+ROBOTS_MAX_BYTES = 500 * 1024
+
+
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """robots.txt path pattern to regex: '*' matches anything, a trailing '$' anchors."""
+    anchored = pattern.endswith("$")
+    if anchored:
+        pattern = pattern[:-1]
+    regex = ".*".join(re.escape(part) for part in pattern.split("*"))
+    return re.compile(regex + ("$" if anchored else ""))
+
+
+@dataclass
+class RobotsRules:
+    """The Allow/Disallow patterns and Crawl-delay that apply to us on one domain."""
+    rules: List[Tuple[str, bool]] = field(default_factory=list)
+    crawl_delay: Optional[float] = None
+    _compiled: List[Tuple[re.Pattern, int, bool]] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        self._compiled = [
+            (_compile_pattern(pattern), len(pattern), allow)
+            for pattern, allow in self.rules
+        ]
+
+    def allows(self, url: str) -> bool:
+        """Whether the URL may be fetched: the longest matching rule wins, Allow on ties."""
+        parsed = urlparse(url)
+        path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        if path == "/robots.txt":
+            return True
+
+        best_length, allowed = -1, True
+        for pattern, length, allow in self._compiled:
+            if (length > best_length or (length == best_length and allow)) and pattern.match(path):
+                best_length, allowed = length, allow
+        return allowed
+
+    def to_json(self) -> str:
+        return json.dumps({"rules": self.rules, "crawl_delay": self.crawl_delay})
+
+    @classmethod
+    def from_json(cls, data: str) -> "RobotsRules":
+        parsed = json.loads(data)
+        return cls([tuple(rule) for rule in parsed["rules"]], parsed.get("crawl_delay"))
+
+
+ALLOW_ALL = RobotsRules()
+DISALLOW_ALL = RobotsRules([("/", False)])
+
+
+def parse_robots(text: str, agent: str = ROBOTS_AGENT) -> RobotsRules:
+    """Parse robots.txt and keep the groups for `agent`, falling back to '*'."""
+    groups = []
+    current = None
+    in_agent_lines = False
+
+    for raw_line in text.splitlines():
+        line = raw_line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        key, value = (part.strip() for part in line.split(":", 1))
+        key = key.lower()
+
+        if key == "user-agent":
+            # Consecutive User-agent lines share one group
+            if not in_agent_lines:
+                current = {"agents": [], "rules": [], "crawl_delay": None}
+                groups.append(current)
+            current["agents"].append(value.lower())
+            in_agent_lines = True
+            continue
+
+        if current is None:
+            continue
+        in_agent_lines = False
+        if key in ("allow", "disallow") and value:
+            current["rules"].append((value, key == "allow"))
+        elif key == "crawl-delay":
+            try:
+                current["crawl_delay"] = float(value)
+            except ValueError:
+                pass
+
+    agent = agent.lower()
+    matching = [g for g in groups if any(a != "*" and a in agent for a in g["agents"])]
+    if not matching:
+        matching = [g for g in groups if "*" in g["agents"]]
+
+    delays = [g["crawl_delay"] for g in matching if g["crawl_delay"] is not None]
+    return RobotsRules(
+        rules=[rule for group in matching for rule in group["rules"]],
+        crawl_delay=max(delays) if delays else None
+    )
+
+
+class RobotsCache:
+    """Per-domain robots.txt rules, shared across runs through the state store."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS robots_rules (
+            domain TEXT PRIMARY KEY,
+            rules TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, store: StateStore = None, enabled: bool = True):
+        self.store = store or state_store
+        self.enabled = enabled
+        self.rules: Dict[str, Tuple[RobotsRules, float]] = {}
+        self._lock = threading.Lock()
+        self._domain_locks: Dict[str, threading.Lock] = {}
+        self._client: Optional[httpx.Client] = None
+
+    @staticmethod
+    def _domain(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def cached(self, url: str) -> Optional[RobotsRules]:
+        """In-memory rules for the URL's domain if still fresh, without touching disk or network."""
+        entry = self.rules.get(self._domain(url))
+        if entry and entry[1] > time.time():
+            return entry[0]
+        return None
+
+    def get(self, url: str) -> RobotsRules:
+        """Rules for the URL's domain, loading or fetching them when needed (blocking)."""
+        rules = self.cached(url)
+        if rules is not None:
+            return rules
+
+        domain = self._domain(url)
+        with self._lock:
+            domain_lock = self._domain_locks.setdefault(domain, threading.Lock())
+
+        # One fetch per domain; other threads wait for it and reuse the result
+        with domain_lock:
+            rules = self.cached(url)
+            if rules is not None:
+                return rules
+
+            stored, expires_at = self._load(domain)
+            if stored is None or expires_at <= time.time():
+                stored, expires_at = self._fetch(url, domain, stored)
+
+            self.rules[domain] = (stored, expires_at)
+            return stored
+
+    def _load(self, domain: str) -> Tuple[Optional[RobotsRules], float]:
+        try:
+            self.store.ensure_schema("robots_rules", self.SCHEMA)
+            rows = self.store.query("SELECT rules, expires_at FROM robots_rules WHERE domain = ?", (domain,))
+            if rows:
+                return RobotsRules.from_json(rows[0][0]), rows[0][1]
+        except (sqlite3.Error, ValueError, KeyError) as e:
+            logger.warning(f"Could not load robots.txt rules for {domain}: {e}")
+        return None, 0.0
+
+    def _fetch(self, url: str, domain: str,
+               previous: Optional[RobotsRules]) -> Tuple[RobotsRules, float]:
+        parsed = urlparse(url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        now = time.time()
+
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    follow_redirects=True, timeout=ROBOTS_TIMEOUT_SECONDS,
+                    headers={"User-Agent": f"Mozilla/5.0 (compatible; {ROBOTS_AGENT}/1.0)"}
+                )
+
+        try:
+            response = self._client.get(robots_url)
+        except httpx.HTTPError as e:
+            response = None
+            logger.warning(f"Could not fetch {robots_url}: {e}")
+
+        if response is not None and response.status_code < 400:
+            rules = parse_robots(response.content[:ROBOTS_MAX_BYTES].decode("utf-8", errors="replace"))
+            expires_at = now + ROBOTS_TTL_SECONDS
+        elif response is not None and response.status_code < 500:
+            # No robots.txt (or not ours to read): nothing is restricted
+            rules, expires_at = ALLOW_ALL, now + ROBOTS_TTL_SECONDS
+        else:
+            # Server unreachable: keep the last good rules, else stay out for a while
+            rules = previous or DISALLOW_ALL
+            expires_at = now + ROBOTS_RETRY_SECONDS
+            if previous is None:
+                logger.warning(f"robots.txt for {domain} unavailable; not fetching from it for now")
+
+        try:
+            self.store.ensure_schema("robots_rules", self.SCHEMA)
+            self.store.execute(
+                "INSERT OR REPLACE INTO robots_rules (domain, rules, fetched_at, expires_at) VALUES (?, ?, ?, ?)",
+                (domain, rules.to_json(), now, expires_at)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist robots.txt rules for {domain}: {e}")
+
+        logger.debug(
+            f"robots.txt for {domain}: {len(rules.rules)} rules, crawl-delay {rules.crawl_delay}"
+        )
+        return rules, expires_at
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+# Global robots.txt cache instance
+robots_cache = RobotsCache()
@@ -0,0 +1,77 @@
+"""
+Minimal interval scheduler for the long-running daemon mode.
+"""
+
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List
+
+from utils.logging import get_logger
+
+logger = get_logger("scheduler")
+
+
+@dataclass
+class ScheduledTask:
+    """A callable that runs every `interval_seconds`."""
+    name: str
+    interval_seconds: float
+    func: Callable[[], None]
+    run_immediately: bool = True
+    next_run: float = field(default=0.0)
+    runs: int = 0
+    failures: int = 0
+
+    def __post_init__(self):
+        now = time.monotonic()
+        self.next_run = now if self.run_immediately else now + self.interval_seconds
+
+
+class Scheduler:
+    """Runs interval tasks on the calling thread until stopped."""
+
+    def __init__(self):
+        self.tasks: List[ScheduledTask] = []
+        self.stop_event = threading.Event()
+
+    def add_task(self, name: str, interval_seconds: float, func: Callable[[], None], run_immediately: bool = True):
+        """Register a task to run every `interval_seconds`."""
+        self.tasks.append(ScheduledTask(name, interval_seconds, func, run_immediately))
+        logger.info(f"Scheduled '{name}' every {interval_seconds / 60:.1f} minutes")
+
+    def stop(self):
+        """Ask the run loop to exit after the task in progress finishes."""
+        self.stop_event.set()
+
+    def run_pending(self):
+        """Run every task that is due. A failing task never stops the others."""
+        for task in self.tasks:
+            if self.stop_event.is_set():
+                return
+            if time.monotonic() < task.next_run:
+                continue
+
+            started = time.monotonic()
+            try:
+                task.func()
+                task.runs += 1
+            except Exception as e:
+                task.failures += 1
+                logger.error(f"Scheduled task '{task.name}' failed: {e}")
+
+            # Schedule from the start time so long cycles don't drift
+            task.next_run = started + task.interval_seconds
+            logger.info(f"Task '{task.name}' finished in {time.monotonic() - started:.2f}s")
+
+    def seconds_until_next(self) -> float:
+        """Seconds until the next task is due (0 if one is overdue)."""
+        if not self.tasks:
+            return 60.0
+        return max(0.0, min(task.next_run for task in self.tasks) - time.monotonic())
+
+    def run_forever(self):
+        """Run tasks as they come due until stop() is called."""
+        while not self.stop_event.is_set():
+            self.run_pending()
+            self.stop_event.wait(self.seconds_until_next())
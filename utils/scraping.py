@@ -2,23 +2,63 @@
 Advanced web scraping utilities with rate limiting, retries, and respectful practices.
 """
 
+import os
+import math
 import time
 import hashlib
 import asyncio
-from dataclasses import dataclass, field
+import sqlite3
+import threading
+import weakref
+from dataclasses import dataclass, field, replace
+from email.utils import parsedate_to_datetime
 from typing import Dict, Optional
 from urllib.parse import urlparse
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 
-import requests
-from playwright.async_api import async_playwright, Browser
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import httpx
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 
 from utils.logging import get_logger
-from utils.errors import ScrapingException, RateLimitException
+from utils.errors import ScrapingException, RateLimitException, NotModifiedException, RobotsDisallowedException
+from utils.http_cache import http_validators
+from utils.robots import robots_cache
+from utils.state import StateStore, state_store
 
 logger = get_logger("scraping")
 
+# Adaptive (AIMD) throttling: every healthy response adds a little rate and
+# concurrency, while 429s, 5xx, timeouts and rising latency cut both in half
+RATE_INCREASE_STEP = 0.05
+MIN_RATE_FACTOR = 0.1
+MAX_RATE_FACTOR = 2.0  # Never more than twice the configured rate
+MAX_CONCURRENCY_FACTOR = 2.0  # ...or twice the configured concurrency
+DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN_SECONDS = 5.0  # A burst of errors from in-flight requests counts once
+LATENCY_EWMA_ALPHA = 0.3
+LATENCY_BASELINE_ALPHA = 0.02
+LATENCY_RISE_FACTOR = 2.0
+LATENCY_FLOOR_SECONDS = 0.5
+
+# Longer Retry-After values fail the request instead of parking a worker on it
+MAX_RETRY_AFTER_SECONDS = 120
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
 
 @dataclass
 class RateLimitConfig:
@@ -26,7 +66,15 @@ class RateLimitConfig:
     requests_per_minute: int = 30
     min_delay_seconds: float = 2.0
     max_delay_seconds: float = 10.0
+    max_concurrent: int = 2  # Companies scraped in parallel against this domain
+    burst: int = 1  # Requests allowed back-to-back before spacing kicks in
     respect_robots_txt: bool = True
+    crawl_delay_seconds: float = 0.0  # From robots.txt; a floor adaptive speed-ups never cross
+
+    @property
+    def interval_seconds(self) -> float:
+        """Spacing between requests that satisfies both the per-minute and minimum-delay limits."""
+        return max(60.0 / max(1, self.requests_per_minute), self.min_delay_seconds, self.crawl_delay_seconds)
 
 
 @dataclass
@@ -36,15 +84,92 @@ class DomainStats:
     request_count: int = 0
     failed_requests: int = 0
     rate_limited: bool = False
+    wait_seconds_total: float = 0.0
+    waits: int = 0
+    max_wait_seconds: float = 0.0
 
 
-class RateLimiter:
-    """Intelligent rate limiter that adapts to website responses."""
+@dataclass
+class AdaptiveLimit:
+    """AIMD state for a domain: where its rate and concurrency currently sit."""
+    rate_factor: float = 1.0  # Multiplier on the configured request rate
+    concurrency: float = 0.0  # Seeded from the configured max_concurrent
+    latency_ewma: float = 0.0
+    latency_baseline: float = 0.0
+    blocked_until: float = 0.0  # Wall-clock end of the last Retry-After
+    last_decrease: float = 0.0
+
 
-    def __init__(self):
+@dataclass
+class TokenBucket:
+    """
+    Token bucket in its GCRA form: the whole state is the theoretical arrival
+    time (tat) of the next token, so a reservation is O(1) arithmetic.
+    """
+    tat: float = 0.0
+
+    def reserve(self, now: float, interval: float, burst: int = 1) -> float:
+        """Claim the next slot and return how long the caller must wait for it."""
+        tolerance = (max(1, burst) - 1) * interval
+        start = max(now, self.tat - tolerance)
+        self.tat = max(self.tat, now) + interval
+        return start - now
+
+    def peek(self, now: float, interval: float, burst: int = 1) -> float:
+        """How long a reservation made now would wait, without claiming it."""
+        tolerance = (max(1, burst) - 1) * interval
+        return max(0.0, self.tat - tolerance - now)
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter shared by the requests and Playwright paths.
+
+    Reservations are made under a lock and slept outside it, so concurrent
+    threads and asyncio tasks are handed successive slots instead of all
+    waking at once. In-process buckets run on the monotonic clock. With
+    shared=True (or RATE_LIMIT_SHARED=true) each reservation is made inside
+    a state store transaction on wall-clock time, so several worker
+    processes draw from the same bucket. Either way, bucket positions and
+    failure stats are written to the state store and survive restarts.
+
+    The configured limits are only a starting point. Each domain's rate and
+    concurrency adapt AIMD-style: healthy responses raise them additively (up
+    to twice the configuration), overload signals halve them. A Retry-After
+    header moves the domain's bucket past the requested time, so no request
+    to that domain leaves before it.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+            domain TEXT PRIMARY KEY,
+            tat REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS rate_limit_stats (
+            domain TEXT PRIMARY KEY,
+            last_request_time REAL NOT NULL,
+            request_count INTEGER NOT NULL,
+            failed_requests INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS rate_limit_adaptive (
+            domain TEXT PRIMARY KEY,
+            rate_factor REAL NOT NULL,
+            concurrency REAL NOT NULL,
+            latency_baseline REAL NOT NULL,
+            blocked_until REAL NOT NULL
+        );
+    """
+
+    def __init__(self, store: StateStore = None, shared: bool = None):
+        self.store = store or state_store
+        if shared is None:
+            shared = os.getenv('RATE_LIMIT_SHARED', 'false').lower() == 'true'
+        self.shared = shared
         self.domain_configs: Dict[str, RateLimitConfig] = {}
         self.domain_stats: Dict[str, DomainStats] = {}
-        self.request_history: Dict[str, list] = {}  # domain -> list of request timestamps
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.adaptive: Dict[str, AdaptiveLimit] = {}
+        self._lock = threading.Lock()
 
     def get_domain(self, url: str) -> str:
         """Extract domain from URL."""
@@ -59,204 +184,595 @@ class RateLimiter:
         """Get rate limit config for domain."""
         return self.domain_configs.get(domain, RateLimitConfig())
 
+    def get_concurrency_limit(self, domain: str) -> int:
+        """Get how many companies on this domain may be scraped at once right now."""
+        with self._lock:
+            self._get_bucket(domain)
+            return max(1, int(self._get_adaptive(domain).concurrency))
+
+    def _get_adaptive(self, domain: str) -> AdaptiveLimit:
+        """A domain's AIMD state, clamped to its current configuration. Call under the lock."""
+        config = self.get_config(domain)
+        state = self.adaptive.setdefault(domain, AdaptiveLimit())
+        ceiling = max(1.0, config.max_concurrent * MAX_CONCURRENCY_FACTOR)
+        state.concurrency = min(ceiling, state.concurrency or float(max(1, config.max_concurrent)))
+        return state
+
+    def set_crawl_delay(self, domain: str, crawl_delay: Optional[float]):
+        """Apply a robots.txt Crawl-delay to the domain's rate config."""
+        config = self.get_config(domain)
+        crawl_delay = crawl_delay or 0.0
+        if config.crawl_delay_seconds != crawl_delay:
+            self.domain_configs[domain] = replace(config, crawl_delay_seconds=crawl_delay)
+            logger.info(f"Crawl-delay for {domain} from robots.txt: {crawl_delay}s")
+
+    def _interval(self, domain: str) -> float:
+        """Current spacing for a domain: the configured interval scaled by its adaptive rate."""
+        config = self.get_config(domain)
+        return max(config.interval_seconds / self._get_adaptive(domain).rate_factor, config.crawl_delay_seconds)
+
+    def _get_bucket(self, domain: str) -> TokenBucket:
+        """Get a domain's in-process bucket, seeded from the state store on first use."""
+        bucket = self.buckets.get(domain)
+        if bucket is None:
+            bucket = TokenBucket()
+            try:
+                self.store.ensure_schema("rate_limiter", self.SCHEMA)
+                row = self.store.query("SELECT tat FROM rate_limit_buckets WHERE domain = ?", (domain,))
+                if row:
+                    # Translate the stored wall-clock position onto the monotonic clock
+                    bucket.tat = time.monotonic() + (row[0][0] - time.time())
+                stats_row = self.store.query(
+                    "SELECT last_request_time, request_count, failed_requests FROM rate_limit_stats WHERE domain = ?",
+                    (domain,)
+                )
+                if stats_row:
+                    last_request, request_count, failed_requests = stats_row[0]
+                    self.domain_stats[domain] = DomainStats(
+                        last_request_time=datetime.fromtimestamp(last_request),
+                        request_count=request_count,
+                        failed_requests=failed_requests
+                    )
+                adaptive_row = self.store.query(
+                    "SELECT rate_factor, concurrency, latency_baseline, blocked_until "
+                    "FROM rate_limit_adaptive WHERE domain = ?",
+                    (domain,)
+                )
+                if adaptive_row:
+                    rate_factor, concurrency, latency_baseline, blocked_until = adaptive_row[0]
+                    self.adaptive[domain] = AdaptiveLimit(
+                        rate_factor=rate_factor,
+                        concurrency=concurrency,
+                        latency_ewma=latency_baseline,
+                        latency_baseline=latency_baseline,
+                        blocked_until=blocked_until
+                    )
+            except sqlite3.Error as e:
+                logger.debug(f"Using in-memory rate limit state for {domain}: {e}")
+            self.buckets[domain] = bucket
+        return bucket
+
+    def _reserve(self, domain: str) -> float:
+        """
+        Claim the domain's next request slot and return the wait in seconds.
+
+        Raises RateLimitException instead of waiting when the domain asked us
+        (via Retry-After) to stay away longer than MAX_RETRY_AFTER_SECONDS.
+        """
+        config = self.get_config(domain)
+        with self._lock:
+            bucket = self._get_bucket(domain)
+            interval = self._interval(domain)
+            blocked_for = self.adaptive[domain].blocked_until - time.time()
+
+        if blocked_for > MAX_RETRY_AFTER_SECONDS:
+            raise RateLimitException(domain, math.ceil(blocked_for))
+
+        if self.shared:
+            try:
+                return self._reserve_shared(domain, interval, config.burst)
+            except sqlite3.Error as e:
+                logger.debug(f"Shared rate limit unavailable for {domain}, using local bucket: {e}")
+
+        with self._lock:
+            now = time.monotonic()
+            wait = bucket.reserve(now, interval, config.burst)
+            wall_tat = bucket.tat - now + time.time()
+
+        # Persist outside the lock so other domains never queue behind disk I/O
+        self._save_bucket(domain, wall_tat)
+        return wait
+
+    def _reserve_shared(self, domain: str, interval: float, burst: int) -> float:
+        """Reserve a slot in the bucket stored in the state store (cross-process)."""
+        with self.store.transaction() as conn:
+            row = conn.execute("SELECT tat FROM rate_limit_buckets WHERE domain = ?", (domain,)).fetchone()
+            bucket = TokenBucket(tat=row[0] if row else 0.0)
+            wait = bucket.reserve(time.time(), interval, burst)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (domain, tat) VALUES (?, ?)",
+                (domain, bucket.tat)
+            )
+        return wait
+
+    def _save_bucket(self, domain: str, wall_tat: float):
+        try:
+            self.store.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (domain, tat) VALUES (?, ?)",
+                (domain, wall_tat)
+            )
+        except sqlite3.Error as e:
+            logger.debug(f"Could not persist rate limit bucket for {domain}: {e}")
+
+    def _record_wait(self, domain: str, wait: float):
+        with self._lock:
+            stats = self.domain_stats.setdefault(domain, DomainStats())
+            stats.waits += 1
+            stats.wait_seconds_total += wait
+            stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+
     def should_wait(self, domain: str) -> float:
         """
         Calculate how long to wait before making a request to domain.
         Returns 0 if no wait is needed, otherwise seconds to wait.
+        Does not claim a slot; use acquire()/acquire_sync() before requesting.
         """
         config = self.get_config(domain)
-        stats = self.domain_stats.get(domain, DomainStats())
-
-        # Clean old requests from history (older than 1 minute)
-        now = datetime.now()
-        cutoff = now - timedelta(minutes=1)
-
-        if domain not in self.request_history:
-            self.request_history[domain] = []
-
-        self.request_history[domain] = [
-            ts for ts in self.request_history[domain]
-            if ts > cutoff
-        ]
-
-        # Check if we're within rate limits
-        recent_requests = len(self.request_history[domain])
-        if recent_requests >= config.requests_per_minute:
-            # Need to wait until oldest request ages out
-            oldest_request = min(self.request_history[domain])
-            wait_until = oldest_request + timedelta(minutes=1)
-            wait_seconds = (wait_until - now).total_seconds()
-            return max(0, wait_seconds)
-
-        # Check minimum delay since last request
-        if stats.last_request_time:
-            time_since_last = (now - stats.last_request_time).total_seconds()
-            min_wait = config.min_delay_seconds
-
-            # Adaptive delay based on recent failures
-            if stats.failed_requests > 0:
-                failure_multiplier = min(2.0, 1 + (stats.failed_requests * 0.2))
-                min_wait *= failure_multiplier
-
-            if time_since_last < min_wait:
-                return min_wait - time_since_last
-
-        return 0
+        with self._lock:
+            bucket = self._get_bucket(domain)
+            interval = self._interval(domain)
+
+        if self.shared:
+            try:
+                row = self.store.query("SELECT tat FROM rate_limit_buckets WHERE domain = ?", (domain,))
+                return TokenBucket(tat=row[0][0] if row else 0.0).peek(time.time(), interval, config.burst)
+            except sqlite3.Error:
+                pass
+
+        with self._lock:
+            return bucket.peek(time.monotonic(), interval, config.burst)
+
+    async def acquire(self, domain: str) -> float:
+        """Wait (without blocking the event loop) until a request to domain is allowed."""
+        wait = self._reserve(domain)
+        if wait > 0:
+            logger.debug(f"Rate limiting: waiting {wait:.2f}s for {domain}")
+            await asyncio.sleep(wait)
+        self._record_wait(domain, wait)
+        return wait
+
+    def acquire_sync(self, domain: str) -> float:
+        """Block the calling thread until a request to domain is allowed."""
+        wait = self._reserve(domain)
+        if wait > 0:
+            logger.debug(f"Rate limiting: waiting {wait:.2f}s for {domain}")
+            time.sleep(wait)
+        self._record_wait(domain, wait)
+        return wait
+
+    def record_request(self, domain: str, success: bool = True, latency: float = None,
+                       overloaded: bool = False, retry_after: float = None):
+        """
+        Record a request outcome and adapt the domain's limits.
 
-    def record_request(self, domain: str, success: bool = True):
-        """Record a request for rate limiting tracking."""
+        `overloaded` marks responses that signal an overloaded server (429,
+        5xx, timeouts); they, and a latency well above the domain's baseline,
+        cut the rate and concurrency. Other successes raise them. Failures
+        such as a 404 leave them alone. `retry_after` blocks the domain for
+        that many seconds.
+        """
         now = datetime.now()
+        config = self.get_config(domain)
 
-        if domain not in self.domain_stats:
-            self.domain_stats[domain] = DomainStats()
-
-        stats = self.domain_stats[domain]
-        stats.last_request_time = now
-        stats.request_count += 1
-
-        if not success:
-            stats.failed_requests += 1
-        else:
-            # Reset failure count on success
-            stats.failed_requests = max(0, stats.failed_requests - 1)
+        with self._lock:
+            bucket = self._get_bucket(domain)
+            stats = self.domain_stats.setdefault(domain, DomainStats())
+            stats.last_request_time = now
+            stats.request_count += 1
+
+            if not success:
+                stats.failed_requests += 1
+            else:
+                # Reset failure count on success
+                stats.failed_requests = max(0, stats.failed_requests - 1)
+
+            state = self._get_adaptive(domain)
+            slow = success and latency is not None and self._latency_rising(state, latency)
+            if overloaded or slow:
+                if self._decrease(state):
+                    reason = f"latency {state.latency_ewma:.2f}s" if slow else "server overloaded"
+                    logger.info(
+                        f"Throttling {domain} ({reason}): rate x{state.rate_factor:.2f}, "
+                        f"concurrency {int(state.concurrency)}"
+                    )
+            elif success:
+                state.rate_factor = min(MAX_RATE_FACTOR, state.rate_factor + RATE_INCREASE_STEP)
+                state.concurrency = min(
+                    max(1.0, config.max_concurrent * MAX_CONCURRENCY_FACTOR),
+                    state.concurrency + 1 / state.concurrency
+                )
+
+            wall_tat = None
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, time.time() + retry_after)
+                bucket.tat = max(bucket.tat, time.monotonic() + retry_after)
+                wall_tat = bucket.tat - time.monotonic() + time.time()
+                logger.warning(f"{domain} asked us to retry after {retry_after:.0f}s")
+
+            snapshot = (domain, now.timestamp(), stats.request_count, stats.failed_requests)
+            adaptive_snapshot = (
+                domain, state.rate_factor, state.concurrency, state.latency_baseline, state.blocked_until
+            )
 
-        # Add to request history
-        if domain not in self.request_history:
-            self.request_history[domain] = []
-        self.request_history[domain].append(now)
+        try:
+            self.store.execute(
+                "INSERT OR REPLACE INTO rate_limit_stats "
+                "(domain, last_request_time, request_count, failed_requests) VALUES (?, ?, ?, ?)",
+                snapshot
+            )
+            self.store.execute(
+                "INSERT OR REPLACE INTO rate_limit_adaptive "
+                "(domain, rate_factor, concurrency, latency_baseline, blocked_until) VALUES (?, ?, ?, ?, ?)",
+                adaptive_snapshot
+            )
+        except sqlite3.Error as e:
+            logger.debug(f"Could not persist rate limit stats for {domain}: {e}")
+
+        if wall_tat is not None:
+            self._block_until(domain, wall_tat)
+
+    def _block_until(self, domain: str, wall_tat: float):
+        """Push the stored bucket (shared by other workers) past a Retry-After deadline."""
+        if not self.shared:
+            self._save_bucket(domain, wall_tat)
+            return
+        try:
+            with self.store.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO rate_limit_buckets (domain, tat) VALUES (?, ?) "
+                    "ON CONFLICT(domain) DO UPDATE SET tat = MAX(tat, excluded.tat)",
+                    (domain, wall_tat)
+                )
+        except sqlite3.Error as e:
+            logger.debug(f"Could not persist Retry-After for {domain}: {e}")
+
+    @staticmethod
+    def _latency_rising(state: AdaptiveLimit, latency: float) -> bool:
+        """Fold a response time into the averages; True when it is well above the baseline."""
+        if not state.latency_baseline:
+            state.latency_ewma = state.latency_baseline = latency
+            return False
+        state.latency_ewma += LATENCY_EWMA_ALPHA * (latency - state.latency_ewma)
+        # The baseline follows faster responses at once and slower ones only gradually
+        state.latency_baseline = min(
+            latency, state.latency_baseline + LATENCY_BASELINE_ALPHA * (latency - state.latency_baseline)
+        )
+        return state.latency_ewma > max(LATENCY_FLOOR_SECONDS, LATENCY_RISE_FACTOR * state.latency_baseline)
+
+    @staticmethod
+    def _decrease(state: AdaptiveLimit) -> bool:
+        """Halve rate and concurrency, at most once per cooldown window."""
+        now = time.monotonic()
+        if now - state.last_decrease < DECREASE_COOLDOWN_SECONDS:
+            return False
+        state.rate_factor = max(MIN_RATE_FACTOR, state.rate_factor * DECREASE_FACTOR)
+        state.concurrency = max(1.0, state.concurrency * DECREASE_FACTOR)
+        state.last_decrease = now
+        return True
 
     async def wait_if_needed(self, url: str):
         """Wait if needed before making request to URL."""
-        domain = self.get_domain(url)
-        wait_time = self.should_wait(domain)
+        await self.acquire(self.get_domain(url))
+
+    def get_wait_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Per-domain time spent waiting on the limiter in this process."""
+        with self._lock:
+            return {
+                domain: {
+                    "waits": stats.waits,
+                    "wait_seconds_total": round(stats.wait_seconds_total, 3),
+                    "max_wait_seconds": round(stats.max_wait_seconds, 3)
+                }
+                for domain, stats in self.domain_stats.items()
+                if stats.waits
+            }
+
+    def get_adaptive_limits(self) -> Dict[str, Dict[str, float]]:
+        """Per-domain adapted request rate (req/min) and concurrency."""
+        with self._lock:
+            return {
+                domain: {
+                    "rate_factor": round(state.rate_factor, 2),
+                    "requests_per_minute": round(60.0 / self._interval(domain), 1),
+                    "concurrency": max(1, int(state.concurrency)),
+                    "blocked_seconds": max(0.0, round(state.blocked_until - time.time(), 1))
+                }
+                for domain, state in self.adaptive.items()
+            }
+
+
+class AdaptiveSemaphore:
+    """
+    Async semaphore whose size follows a domain's adaptive concurrency, so a
+    throttled board gets fewer parallel workers without waiting for the next
+    polling cycle.
+    """
+
+    def __init__(self, domain: str, limiter: RateLimiter = None):
+        self.domain = domain
+        self.limiter = limiter or rate_limiter
+        self.active = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self.active < self.limiter.get_concurrency_limit(self.domain)
+            )
+            self.active += 1
+        return self
 
-        if wait_time > 0:
-            logger.info(f"Rate limiting: waiting {wait_time:.2f}s for {domain}")
-            await asyncio.sleep(wait_time)
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        async with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
 
 
 # Global rate limiter instance
 rate_limiter = RateLimiter()
 
 
+def _apply_robots(url: str, domain: str, rules):
+    rate_limiter.set_crawl_delay(domain, rules.crawl_delay)
+    if not rules.allows(url):
+        raise RobotsDisallowedException(url)
+
+
+def check_robots(url: str):
+    """Raise RobotsDisallowedException if robots.txt disallows the URL (blocking on first use per domain)."""
+    domain = rate_limiter.get_domain(url)
+    if robots_cache.enabled and rate_limiter.get_config(domain).respect_robots_txt:
+        _apply_robots(url, domain, robots_cache.get(url))
+
+
+async def check_robots_async(url: str):
+    """check_robots for event loop code; only a robots.txt fetch leaves the loop."""
+    domain = rate_limiter.get_domain(url)
+    if robots_cache.enabled and rate_limiter.get_config(domain).respect_robots_txt:
+        rules = robots_cache.cached(url) or await asyncio.to_thread(robots_cache.get, url)
+        _apply_robots(url, domain, rules)
+
+
+_backoff = wait_exponential(multiplier=1, min=1, max=10)
+
+
+def _retry_wait(retry_state) -> float:
+    """Exponential backoff, except after a Retry-After: the limiter already holds the slot until then."""
+    error = retry_state.outcome.exception()
+    if isinstance(error, RateLimitException) and error.retry_after:
+        return 0
+    return _backoff(retry_state)
+
+
+def _should_retry(error: BaseException) -> bool:
+    if isinstance(error, RateLimitException):
+        return not error.retry_after or error.retry_after <= MAX_RETRY_AFTER_SECONDS
+    return isinstance(error, httpx.HTTPError)
+
+
+def _is_overload(error: httpx.HTTPError) -> bool:
+    """Whether a failed request points at an overloaded server rather than a bad URL."""
+    if isinstance(error, httpx.TimeoutException):
+        return True
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code >= 500
+
+
 class WebScraper:
-    """Advanced web scraper with Playwright support and intelligent retry logic."""
+    """
+    HTTP scraper with rate limiting and intelligent retry logic.
 
-    def __init__(self):
-        self.browser: Optional[Browser] = None
-        self.session = requests.Session()
+    Plain HTTP goes through pooled httpx clients (HTTP/2 where the server
+    offers it): one shared client for worker threads and one per event loop
+    for async callers, so async code never blocks its loop on network I/O.
+    Bodies are streamed and capped at max_response_bytes. Pages that need
+    JavaScript are rendered by utils.browser.browser_pool instead.
+    """
+
+    def __init__(self, timeout_seconds: float = 30, max_response_bytes: int = 10 * 1024 * 1024):
+        self.timeout_seconds = timeout_seconds
+        self.max_response_bytes = max_response_bytes
 
         # Set realistic headers
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
             'DNT': '1',
-            'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
-        })
-
-    async def __aenter__(self):
-        """Async context manager entry."""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(
-            headless=True,
-            args=[
-                '--no-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-gpu',
-                '--disable-features=VizDisplayCompositor'
-            ]
-        )
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.browser:
-            await self.browser.close()
+        }
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+
+    def _client_options(self) -> dict:
+        return {
+            'headers': self.headers,
+            'http2': True,
+            'follow_redirects': True,
+            # Connections are pooled per host; keep-alive lets repeat polls skip the TLS handshake
+            'limits': httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30),
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        """Shared synchronous client, safe to use from any thread."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(**self._client_options())
+        return self._client
+
+    def _async_client(self) -> httpx.AsyncClient:
+        """The AsyncClient for the running event loop (clients cannot be shared across loops)."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(**self._client_options())
+            self._async_clients[loop] = client
+        return client
+
+    async def aclose(self):
+        """Close the running event loop's AsyncClient, if it has one."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        """Close the shared synchronous client."""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _request_headers(self, url: str, conditional: bool) -> tuple:
+        """Conditional request headers for a URL, plus the validators they came from."""
+        headers = {}
+        validators = http_validators.get(url) if conditional else None
+        if validators:
+            if validators["etag"]:
+                headers["If-None-Match"] = validators["etag"]
+            if validators["last_modified"]:
+                headers["If-Modified-Since"] = validators["last_modified"]
+        return headers, validators
+
+    def _check_status(self, domain: str, response: httpx.Response):
+        """Raise for 429 and error statuses before the body is read."""
+        # 304 answers a conditional request; _finish turns it into NotModifiedException
+        if response.status_code == 304:
+            return
+
+        # Check for rate limiting indicators; a 503 with Retry-After means the same
+        retry_after = response.headers.get('Retry-After')
+        if response.status_code == 429 or (response.status_code == 503 and retry_after):
+            retry_seconds = parse_retry_after(retry_after)
+            rate_limiter.record_request(domain, success=False, overloaded=True, retry_after=retry_seconds)
+            raise RateLimitException(domain, retry_seconds)
+
+        response.raise_for_status()
+
+    def _check_size(self, url: str, size: int):
+        if size > self.max_response_bytes:
+            raise ScrapingException(
+                "", url, f"Response exceeds {self.max_response_bytes} bytes, aborting download"
+            )
+
+    def _finish(self, url: str, domain: str, response: httpx.Response, body: bytes,
+                conditional: bool, validators: Optional[dict], latency: float) -> httpx.Response:
+        """Attach the streamed body and apply conditional-fetch bookkeeping."""
+        # Same as httpx's own Response.read(), with the bytes we already streamed
+        response._content = body
+        rate_limiter.record_request(domain, success=True, latency=latency)
+
+        if conditional:
+            if response.status_code == 304 and validators:
+                raise NotModifiedException(url)
+            body_hash = self.get_content_hash(response.text)
+            if validators and validators["body_hash"] == body_hash:
+                raise NotModifiedException(url)
+            http_validators.remember(
+                url, response.headers.get('ETag'), response.headers.get('Last-Modified'), body_hash
+            )
+
+        logger.debug(f"Successfully fetched {url} ({response.status_code}, {response.http_version})")
+        return response
 
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((requests.RequestException, RateLimitException))
+        wait=_retry_wait,
+        retry=retry_if_exception(_should_retry)
     )
-    def fetch_url(self, url: str, timeout: int = 30) -> requests.Response:
+    def fetch_url(self, url: str, timeout: float = None, json_body: Optional[dict] = None,
+                  conditional: bool = False) -> httpx.Response:
         """
-        Fetch URL with requests, respecting rate limits.
+        Fetch URL over HTTP, respecting rate limits.
+        Sends a JSON POST instead of a GET when json_body is given.
+
+        A conditional fetch sends the validators stored for the URL and raises
+        NotModifiedException on a 304 or when the body hash matches the last
+        processed response. URLs disallowed by robots.txt raise
+        RobotsDisallowedException without a request being made.
+
+        A 429 is retried once the server's Retry-After has passed (or raised
+        at once if that is more than MAX_RETRY_AFTER_SECONDS away).
         """
         domain = rate_limiter.get_domain(url)
+        check_robots(url)
 
         # Check rate limiting
-        wait_time = rate_limiter.should_wait(domain)
-        if wait_time > 0:
-            logger.info(f"Rate limiting: waiting {wait_time:.2f}s for {domain}")
-            time.sleep(wait_time)
+        rate_limiter.acquire_sync(domain)
+
+        headers, validators = self._request_headers(url, conditional)
+        method = "POST" if json_body is not None else "GET"
 
         try:
             logger.debug(f"Fetching URL: {url}")
-            response = self.session.get(url, timeout=timeout)
-
-            # Check for rate limiting indicators
-            if response.status_code == 429:
-                retry_after = response.headers.get('Retry-After')
-                retry_seconds = int(retry_after) if retry_after else 60
-                rate_limiter.record_request(domain, success=False)
-                raise RateLimitException(domain, retry_seconds)
-
-            response.raise_for_status()
-            rate_limiter.record_request(domain, success=True)
-
-            logger.debug(f"Successfully fetched {url} ({response.status_code})")
-            return response
-
-        except requests.RequestException as e:
-            rate_limiter.record_request(domain, success=False)
+            started = time.monotonic()
+            with self.client.stream(method, url, json=json_body, headers=headers,
+                                    timeout=timeout or self.timeout_seconds) as response:
+                latency = time.monotonic() - started
+                self._check_status(domain, response)
+                self._check_size(url, int(response.headers.get('Content-Length') or 0))
+                chunks, size = [], 0
+                for chunk in response.iter_bytes():
+                    size += len(chunk)
+                    self._check_size(url, size)
+                    chunks.append(chunk)
+
+            return self._finish(url, domain, response, b"".join(chunks), conditional, validators, latency)
+
+        except httpx.HTTPError as e:
+            rate_limiter.record_request(domain, success=False, overloaded=_is_overload(e))
             logger.warning(f"Failed to fetch {url}: {e}")
             raise
 
-    async def fetch_with_playwright(self, url: str, wait_for_selector: str = None, timeout: int = 30000) -> str:
-        """
-        Fetch URL content using Playwright for JavaScript-heavy sites.
-        """
-        if not self.browser:
-            raise ScrapingException("", url, "Browser not initialized. Use async context manager.")
-
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_retry_wait,
+        retry=retry_if_exception(_should_retry)
+    )
+    async def fetch_url_async(self, url: str, timeout: float = None, json_body: Optional[dict] = None,
+                              conditional: bool = False) -> httpx.Response:
+        """Async counterpart of fetch_url with the same rate limiting, retries and caps."""
         domain = rate_limiter.get_domain(url)
-        await rate_limiter.wait_if_needed(url)
+        await check_robots_async(url)
 
-        try:
-            page = await self.browser.new_page()
-
-            # Set realistic viewport and user agent
-            await page.set_viewport_size({"width": 1920, "height": 1080})
-
-            logger.debug(f"Loading page with Playwright: {url}")
-            response = await page.goto(url, timeout=timeout, wait_until='domcontentloaded')
-
-            if response.status >= 400:
-                rate_limiter.record_request(domain, success=False)
-                raise ScrapingException(domain, url, f"HTTP {response.status}")
-
-            # Wait for specific selector if provided
-            if wait_for_selector:
-                try:
-                    await page.wait_for_selector(wait_for_selector, timeout=10000)
-                except Exception as e:
-                    logger.warning(f"Selector '{wait_for_selector}' not found on {url}: {e}")
+        # Check rate limiting without blocking the event loop
+        await rate_limiter.acquire(domain)
 
-            # Get page content
-            content = await page.content()
-            await page.close()
+        headers, validators = self._request_headers(url, conditional)
+        method = "POST" if json_body is not None else "GET"
 
-            rate_limiter.record_request(domain, success=True)
-            logger.debug(f"Successfully loaded {url} with Playwright")
-            return content
-
-        except Exception as e:
-            rate_limiter.record_request(domain, success=False)
-            logger.error(f"Failed to load {url} with Playwright: {e}")
-            raise ScrapingException(domain, url, str(e), e)
+        try:
+            logger.debug(f"Fetching URL: {url}")
+            started = time.monotonic()
+            async with self._async_client().stream(method, url, json=json_body, headers=headers,
+                                                   timeout=timeout or self.timeout_seconds) as response:
+                latency = time.monotonic() - started
+                self._check_status(domain, response)
+                self._check_size(url, int(response.headers.get('Content-Length') or 0))
+                chunks, size = [], 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    self._check_size(url, size)
+                    chunks.append(chunk)
+
+            return self._finish(url, domain, response, b"".join(chunks), conditional, validators, latency)
+
+        except httpx.HTTPError as e:
+            rate_limiter.record_request(domain, success=False, overloaded=_is_overload(e))
+            logger.warning(f"Failed to fetch {url}: {e}")
+            raise
 
     def get_content_hash(self, content: str) -> str:
         """Generate hash of content for change detection."""
@@ -280,18 +796,28 @@ def configure_domain_rate_limit(domain: str, requests_per_minute: int = 30, min_
 def setup_default_rate_limits():
     """Set up default rate limits for known job boards."""
 
-    # Conservative limits for major job boards
+    # Conservative limits for major job boards. The *-api hosts are the boards'
+    # published job APIs, meant for programmatic use, so robots.txt (which
+    # governs crawling the HTML boards) is not applied to them.
     job_board_configs = {
-        'boards.greenhouse.io': RateLimitConfig(requests_per_minute=20, min_delay_seconds=3.0),
-        'jobs.lever.co': RateLimitConfig(requests_per_minute=15, min_delay_seconds=4.0),
-        'careers.workday.com': RateLimitConfig(requests_per_minute=10, min_delay_seconds=6.0),
-        'jobs.ashbyhq.com': RateLimitConfig(requests_per_minute=20, min_delay_seconds=3.0),
-        'jobs.smartrecruiters.com': RateLimitConfig(requests_per_minute=15, min_delay_seconds=4.0),
+        'boards.greenhouse.io': RateLimitConfig(requests_per_minute=20, min_delay_seconds=3.0, max_concurrent=3),
+        'boards-api.greenhouse.io': RateLimitConfig(requests_per_minute=30, min_delay_seconds=1.0, max_concurrent=4,
+                                                    respect_robots_txt=False),
+        'jobs.lever.co': RateLimitConfig(requests_per_minute=15, min_delay_seconds=4.0, max_concurrent=2),
+        'api.lever.co': RateLimitConfig(requests_per_minute=30, min_delay_seconds=1.0, max_concurrent=3,
+                                        respect_robots_txt=False),
+        'careers.workday.com': RateLimitConfig(requests_per_minute=10, min_delay_seconds=6.0, max_concurrent=1),
+        'jobs.ashbyhq.com': RateLimitConfig(requests_per_minute=20, min_delay_seconds=3.0, max_concurrent=3),
+        'api.ashbyhq.com': RateLimitConfig(requests_per_minute=30, min_delay_seconds=1.0, max_concurrent=3,
+                                           respect_robots_txt=False),
+        'jobs.smartrecruiters.com': RateLimitConfig(requests_per_minute=15, min_delay_seconds=4.0, max_concurrent=2),
+        'api.smartrecruiters.com': RateLimitConfig(requests_per_minute=30, min_delay_seconds=1.0, max_concurrent=3,
+                                                   respect_robots_txt=False),
 
         # More aggressive limits for sites that are known to be strict
-        'linkedin.com': RateLimitConfig(requests_per_minute=5, min_delay_seconds=12.0),
-        'indeed.com': RateLimitConfig(requests_per_minute=8, min_delay_seconds=8.0),
-        'angel.co': RateLimitConfig(requests_per_minute=10, min_delay_seconds=6.0),
+        'linkedin.com': RateLimitConfig(requests_per_minute=5, min_delay_seconds=12.0, max_concurrent=1),
+        'indeed.com': RateLimitConfig(requests_per_minute=8, min_delay_seconds=8.0, max_concurrent=1),
+        'angel.co': RateLimitConfig(requests_per_minute=10, min_delay_seconds=6.0, max_concurrent=1),
     }
 
     for domain, config in job_board_configs.items():
@@ -0,0 +1,124 @@
+"""
+Durable scraper state shared across runs and processes.
+
+Backoff windows, rate-limiter history and similar bookkeeping live in a small
+SQLite file next to the jobs database. It is kept separate from jobs.sqlite so
+that frequent small writes never contend with job inserts and are not part of
+the job database backups.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from utils.logging import get_logger
+
+logger = get_logger("state")
+
+STATE_DB_FILE = "data/scraper_state.sqlite"
+
+
+class StateStore:
+    """Thin wrapper over a WAL-mode SQLite file with one connection per thread."""
+
+    def __init__(self, db_path: str = STATE_DB_FILE):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schemas: set = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit mode; multi-statement updates use explicit transactions
+            conn = sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ensure_schema(self, name: str, ddl: str):
+        """Run a table's CREATE statements once per process."""
+        if name in self._schemas:
+            return
+        with self._schema_lock:
+            if name not in self._schemas:
+                self._connect().executescript(ddl)
+                self._schemas.add(name)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        return self._connect().execute(sql, params)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> sqlite3.Cursor:
+        return self._connect().executemany(sql, rows)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        return self._connect().execute(sql, params).fetchall()
+
+    def transaction(self) -> "_Transaction":
+        """Exclusive write transaction for read-modify-write updates across processes."""
+        return _Transaction(self._connect())
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def prune_cache_table(conn: sqlite3.Connection, table: str, expired_before: float, max_bytes: int) -> Tuple[int, int]:
+    """
+    Inside a transaction, drop a cache table's entries stored before
+    `expired_before`, then evict least recently used ones until their sizes
+    add up to at most `max_bytes`. The table needs key, size, stored_at and
+    accessed_at columns. Returns (expired, evicted).
+    """
+    expired = conn.execute(f"DELETE FROM {table} WHERE stored_at < ?", (expired_before,)).rowcount
+
+    evicted = 0
+    total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+    if total > max_bytes:
+        for key, size in conn.execute(f"SELECT key, size FROM {table} ORDER BY accessed_at").fetchall():
+            if total <= max_bytes:
+                break
+            conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+    return expired, evicted
+
+
+class CacheCounters:
+    """Thread-safe hit/miss counters for caches kept in the state store."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def count_lookup(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_stats(self) -> Dict[str, float]:
+        """Hit/miss counters since start."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+# Global state store instance
+state_store = StateStore()
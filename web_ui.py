@@ -3,6 +3,7 @@ import json
 from flask import Flask, render_template, request, redirect, url_for, flash
 from utils.config import config_manager
 from database import get_database_stats, engine
+from matchers.rules import prefs_version
 from sqlmodel import Session, select, Job
 
 # --- Flask App Initialization ---
@@ -51,11 +52,18 @@ def save_config():
             flash("Invalid JSON format. Please check your syntax.", "danger")
             return redirect(url_for("index"))
         
+        try:
+            previous_version = prefs_version(config_manager.load_config())
+        except Exception:
+            previous_version = None
+
         # Write to file
         with open(config_manager.config_path, "w", encoding='utf-8') as f:
             json.dump(config_data, f, indent=2)
 
         flash("Configuration saved successfully!", "success")
+        if prefs_version(config_data) != previous_version:
+            flash("Scoring preferences changed. Run 'python agent.py --mode rescore' to update stored job scores.", "info")
     except Exception as e:
         flash(f"Error saving configuration: {e}", "danger")
     